@@ -1,3 +1,11 @@
+from .batch import solve_many
+from .history import (
+    RunComparison,
+    compare_runs,
+    compare_runs_menu,
+    list_runs,
+    record_run,
+)
 from .reporting import (
     BENCHMARK_RESULTS_DIR,
     CSV_FIELDS,
@@ -18,12 +26,18 @@ __all__ = [
     "BENCHMARK_RESULTS_DIR",
     "BENCHMARK_SOLVER_TIMEOUT_SECONDS",
     "CSV_FIELDS",
+    "RunComparison",
     "SOLVERS",
     "benchmark_dataset",
     "benchmark_menu",
+    "compare_runs",
+    "compare_runs_menu",
+    "list_runs",
     "print_summary_table",
+    "record_run",
     "result_paths",
     "results_dataframe",
+    "solve_many",
     "solve_with_timeout",
     "summary_dataframe",
     "write_csv",
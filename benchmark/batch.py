@@ -0,0 +1,256 @@
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from functools import partial
+import multiprocessing
+from multiprocessing.connection import wait
+import time
+from typing import Any
+
+from solvers.metrics import SolverResult
+from .runner import SOLVERS
+
+
+SolverFn = Callable[[str | list[int]], SolverResult]
+# Ordered output may run this many puzzles per worker ahead of the oldest
+# unfinished one before dispatch pauses.
+ORDERED_WINDOW_PER_JOB = 4
+# Longest wait between heartbeat calls while workers are busy.
+HEARTBEAT_SECONDS = 1.0
+
+
+def solve_many(
+    puzzles: Iterable[str | list[int]],
+    solver: str | SolverFn = "csp",
+    jobs: int = 1,
+    timeout: float | None = None,
+    ordered: bool = True,
+    with_index: bool = False,
+    heartbeat: Callable[[], None] | None = None,
+) -> Iterator[SolverResult] | Iterator[tuple[int, SolverResult]]:
+    """Solve a stream of puzzles, yielding one SolverResult per puzzle.
+
+    Puzzles are read lazily and only a few per worker are in flight or
+    waiting to be yielded, so memory stays bounded for any input length.
+    Worker processes are started once and reused, which keeps imports and
+    per-size setup (CSP geometry, SAT rule clauses) warm. With `timeout`, a
+    puzzle running longer gets a "timeout" result and its worker is
+    replaced. With jobs=1 and no timeout, puzzles are solved in this process.
+
+    Results come in input order, or in completion order with
+    `ordered=False`; `with_index` yields (input position, result) pairs.
+    When workers are used, `heartbeat` is called at least every
+    HEARTBEAT_SECONDS while they are busy, even if no result arrives.
+    """
+    if isinstance(solver, str):
+        if solver not in SOLVERS:
+            raise ValueError(f"Unknown solver: {solver}")
+        solver = SOLVERS[solver]
+    if jobs < 1:
+        raise ValueError("jobs must be at least 1")
+    if timeout is not None and timeout <= 0:
+        raise ValueError("timeout must be positive")
+
+    if jobs == 1 and timeout is None:
+        results = (
+            (index, _solve(solver, puzzle)) for index, puzzle in enumerate(puzzles)
+        )
+    else:
+        results = _pool_results(puzzles, solver, jobs, timeout, ordered, heartbeat)
+    if with_index:
+        return results
+    return (result for _index, result in results)
+
+
+def _solve(solver_fn: SolverFn, puzzle: str | list[int]) -> SolverResult:
+    start = time.perf_counter()
+    try:
+        return solver_fn(puzzle)
+    except Exception as exc:
+        return SolverResult(
+            solution=None,
+            status="error",
+            runtime_seconds=time.perf_counter() - start,
+            error=str(exc),
+        )
+
+
+def _worker_loop(
+    connection,
+    fn: Callable[[Any], Any],
+    initializer: Callable[[], None] | None,
+) -> None:
+    if initializer is not None:
+        initializer()
+    while True:
+        try:
+            tasks = connection.recv()
+        except EOFError:
+            return
+        if tasks is None:
+            return
+        for index, item in tasks:
+            connection.send((index, fn(item)))
+
+
+class WorkerProcess:
+    """A reusable child process that applies `fn` to tasks sent over a pipe.
+
+    `submit` sends a list of (index, item) pairs and the child answers each
+    with (index, fn(item)) as soon as it is done, so `pending[0]` is the task
+    running now and `started` is when it started. A task that overruns is
+    dealt with by killing the process and starting another.
+    """
+
+    def __init__(
+        self,
+        context,
+        fn: Callable[[Any], Any],
+        initializer: Callable[[], None] | None = None,
+    ):
+        self.connection, child = context.Pipe()
+        self.process = context.Process(
+            target=_worker_loop,
+            args=(child, fn, initializer),
+            daemon=True,
+        )
+        self.process.start()
+        child.close()
+        self.pending: deque[int] = deque()
+        self.started = 0.0
+
+    @property
+    def busy(self) -> bool:
+        return bool(self.pending)
+
+    def submit(self, tasks: list[tuple[int, Any]]) -> None:
+        if not self.pending:
+            self.started = time.perf_counter()
+        self.pending.extend(index for index, _item in tasks)
+        self.connection.send(tasks)
+
+    def receive(self) -> tuple[int, Any]:
+        """The next (index, result), raising EOFError if the process died."""
+        index, result = self.connection.recv()
+        self.pending.popleft()
+        self.started = time.perf_counter()
+        return index, result
+
+    def stop(self, kill: bool = False) -> None:
+        if not kill:
+            try:
+                self.connection.send(None)
+            except OSError:
+                pass
+            self.process.join(1)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+        self.connection.close()
+
+
+def _pool_results(
+    puzzles: Iterable[str | list[int]],
+    solver_fn: SolverFn,
+    jobs: int,
+    timeout: float | None,
+    ordered: bool,
+    heartbeat: Callable[[], None] | None = None,
+) -> Iterator[tuple[int, SolverResult]]:
+    context_name = "fork" if "fork" in multiprocessing.get_all_start_methods() else None
+    context = multiprocessing.get_context(context_name)
+    solve = partial(_solve, solver_fn)
+    workers = [WorkerProcess(context, solve) for _ in range(jobs)]
+    items = enumerate(puzzles)
+    exhausted = False
+    window = ORDERED_WINDOW_PER_JOB * jobs
+    dispatched = 0
+    next_index = 0
+    finished: dict[int, SolverResult] = {}
+
+    try:
+        while True:
+            for worker in workers:
+                if worker.busy or exhausted:
+                    continue
+                if ordered and dispatched - next_index >= window:
+                    break
+                item = next(items, None)
+                if item is None:
+                    exhausted = True
+                    break
+                worker.submit([item])
+                dispatched += 1
+
+            busy = [worker for worker in workers if worker.busy]
+            if not busy:
+                return
+
+            wait_seconds = None
+            if timeout is not None:
+                now = time.perf_counter()
+                wait_seconds = max(0.0, min(w.started for w in busy) + timeout - now)
+            if heartbeat is not None:
+                wait_seconds = (
+                    HEARTBEAT_SECONDS
+                    if wait_seconds is None
+                    else min(HEARTBEAT_SECONDS, wait_seconds)
+                )
+            wait(
+                [w.connection for w in busy] + [w.process.sentinel for w in busy],
+                wait_seconds,
+            )
+            if heartbeat is not None:
+                heartbeat()
+
+            done = []
+            for slot, worker in enumerate(workers):
+                if not worker.busy:
+                    continue
+                index = worker.pending[0]
+                result = _collect(worker, timeout)
+                if result is None:
+                    continue
+                if worker.busy:
+                    # Timed out or died: the task is still pending on it.
+                    worker.stop(kill=True)
+                    workers[slot] = WorkerProcess(context, solve)
+                done.append((index, result))
+
+            for index, result in sorted(done):
+                if not ordered:
+                    yield index, result
+                    continue
+                finished[index] = result
+                while next_index in finished:
+                    yield next_index, finished.pop(next_index)
+                    next_index += 1
+    finally:
+        for worker in workers:
+            worker.stop(kill=worker.busy)
+
+
+def _collect(worker: WorkerProcess, timeout: float | None) -> SolverResult | None:
+    """The worker's result if it has one, a timeout or crash result, or None."""
+    elapsed = time.perf_counter() - worker.started
+    if worker.connection.poll():
+        try:
+            _index, result = worker.receive()
+            return result
+        except EOFError:
+            pass
+    elif worker.process.is_alive():
+        if timeout is None or elapsed < timeout:
+            return None
+        return SolverResult(
+            solution=None,
+            status="timeout",
+            runtime_seconds=elapsed,
+            error=f"Timed out after {timeout} seconds.",
+        )
+
+    return SolverResult(
+        solution=None,
+        status="error",
+        runtime_seconds=elapsed,
+        error=f"Solver process exited with code {worker.process.exitcode} without a result.",
+    )
@@ -0,0 +1,355 @@
+from dataclasses import dataclass
+from datetime import datetime, timezone
+import csv
+import json
+import math
+import os
+from pathlib import Path
+import platform
+import sqlite3
+import statistics
+import subprocess
+
+from config import load_config
+from .reporting import CSV_FIELDS
+
+
+HISTORY_FILENAME = "history.sqlite3"
+# Host fields that must match for two runs' timings to be comparable.
+COMPARABLE_HOST_FIELDS = ("hostname", "machine", "processor", "cpu_count", "contended")
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+@dataclass
+class RunComparison:
+    solver: str
+    size: int
+    baseline_samples: int
+    candidate_samples: int
+    baseline_median_s: float
+    candidate_median_s: float
+    ratio: float
+    p_value: float
+    regressed: bool
+    baseline_timeouts: int = 0
+    candidate_timeouts: int = 0
+
+
+def history_path() -> Path:
+    return Path(load_config()["paths"]["benchmark_results_dir"]) / HISTORY_FILENAME
+
+
+def connect_history(path: str | Path | None = None) -> sqlite3.Connection:
+    db_path = Path(history_path() if path is None else path)
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    connection = sqlite3.connect(db_path)
+    connection.row_factory = sqlite3.Row
+    connection.execute(
+        """
+        CREATE TABLE IF NOT EXISTS runs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            created_at TEXT NOT NULL,
+            dataset TEXT NOT NULL,
+            git_commit TEXT NOT NULL,
+            variant TEXT NOT NULL,
+            solvers TEXT NOT NULL,
+            config TEXT NOT NULL,
+            host TEXT NOT NULL
+        )
+        """
+    )
+    connection.execute("CREATE TABLE IF NOT EXISTS results (run_id INTEGER NOT NULL)")
+    connection.execute(
+        "CREATE INDEX IF NOT EXISTS results_run_id ON results (run_id)"
+    )
+    _ensure_result_columns(connection)
+    return connection
+
+
+def record_run(
+    csv_path: str | Path,
+    dataset_path: str | Path,
+    solver_names: list[str] | None = None,
+    variant: str = "",
+    path: str | Path | None = None,
+    jobs: int = 1,
+) -> int:
+    """Store a results CSV as a new run and return its id.
+
+    The host metadata records `jobs`; runtimes from runs with jobs > 1 were
+    measured while other solves shared the CPU and are marked contended.
+    """
+    host = {**host_info(), "jobs": jobs, "contended": jobs > 1}
+    with connect_history(path) as connection:
+        cursor = connection.execute(
+            "INSERT INTO runs (created_at, dataset, git_commit, variant, solvers, config, host) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                Path(dataset_path).name,
+                git_commit(),
+                variant,
+                ",".join(solver_names or []),
+                json.dumps(load_config(), sort_keys=True),
+                json.dumps(host, sort_keys=True),
+            ),
+        )
+        run_id = cursor.lastrowid
+
+        columns = ", ".join(["run_id", *CSV_FIELDS])
+        placeholders = ", ".join("?" for _ in range(len(CSV_FIELDS) + 1))
+        with open(csv_path, newline="", encoding="utf-8") as f:
+            connection.executemany(
+                f"INSERT INTO results ({columns}) VALUES ({placeholders})",
+                (
+                    (run_id, *(row.get(field, "") for field in CSV_FIELDS))
+                    for row in csv.DictReader(f)
+                ),
+            )
+    connection.close()
+    return run_id
+
+
+def list_runs(limit: int = 20, path: str | Path | None = None) -> list[dict]:
+    connection = connect_history(path)
+    try:
+        rows = connection.execute(
+            "SELECT id, created_at, dataset, git_commit, variant, solvers "
+            "FROM runs ORDER BY id DESC LIMIT ?",
+            (limit,),
+        ).fetchall()
+    finally:
+        connection.close()
+    return [dict(row) for row in rows]
+
+
+def compare_runs(
+    baseline_run: int,
+    candidate_run: int,
+    alpha: float = 0.05,
+    min_slowdown: float = 0.05,
+    path: str | Path | None = None,
+    allow_host_mismatch: bool = False,
+) -> list[RunComparison]:
+    """Compare solved runtimes per (solver, size), testing for a slowdown.
+
+    Only solved results are compared, since a timeout's runtime is just the
+    timeout; timeouts are counted separately. Raises ValueError when the runs
+    were measured on different hosts or one was contended (jobs > 1) and the
+    other not, unless `allow_host_mismatch`.
+    """
+    connection = connect_history(path)
+    try:
+        if not allow_host_mismatch:
+            _check_comparable_hosts(connection, baseline_run, candidate_run)
+        baseline, baseline_timeouts = _runtime_samples(connection, baseline_run)
+        candidate, candidate_timeouts = _runtime_samples(connection, candidate_run)
+    finally:
+        connection.close()
+
+    comparisons = []
+    baseline_keys = baseline.keys() | baseline_timeouts.keys()
+    candidate_keys = candidate.keys() | candidate_timeouts.keys()
+    for key in sorted(baseline_keys & candidate_keys):
+        solver, size = key
+        before, after = baseline.get(key, []), candidate.get(key, [])
+        baseline_median = statistics.median(before) if before else math.nan
+        candidate_median = statistics.median(after) if after else math.nan
+        if not before or not after:
+            ratio = math.nan
+        else:
+            ratio = candidate_median / baseline_median if baseline_median > 0 else math.inf
+        p_value = mann_whitney_greater(after, before)
+        comparisons.append(
+            RunComparison(
+                solver=solver,
+                size=size,
+                baseline_samples=len(before),
+                candidate_samples=len(after),
+                baseline_median_s=baseline_median,
+                candidate_median_s=candidate_median,
+                ratio=ratio,
+                p_value=p_value,
+                regressed=p_value < alpha and ratio >= 1 + min_slowdown,
+                baseline_timeouts=baseline_timeouts.get(key, 0),
+                candidate_timeouts=candidate_timeouts.get(key, 0),
+            )
+        )
+    return comparisons
+
+
+def mann_whitney_greater(xs: list[float], ys: list[float]) -> float:
+    """One-sided Mann-Whitney U p-value for xs tending to be larger than ys.
+
+    Uses the normal approximation with tie correction, which is adequate for
+    the sample sizes a benchmark run produces.
+    """
+    n1, n2 = len(xs), len(ys)
+    if n1 == 0 or n2 == 0:
+        return 1.0
+
+    combined = sorted([(value, 0) for value in xs] + [(value, 1) for value in ys])
+    ranks = [0.0] * len(combined)
+    tie_term = 0.0
+    start = 0
+    while start < len(combined):
+        end = start
+        while end + 1 < len(combined) and combined[end + 1][0] == combined[start][0]:
+            end += 1
+        rank = (start + end) / 2 + 1
+        for index in range(start, end + 1):
+            ranks[index] = rank
+        ties = end - start + 1
+        tie_term += ties**3 - ties
+        start = end + 1
+
+    rank_sum = sum(rank for rank, (_value, group) in zip(ranks, combined) if group == 0)
+    u_statistic = rank_sum - n1 * (n1 + 1) / 2
+    total = n1 + n2
+    variance = n1 * n2 / 12 * ((total + 1) - tie_term / (total * (total - 1)))
+    if variance <= 0:
+        return 1.0
+
+    z_score = (u_statistic - n1 * n2 / 2 - 0.5) / math.sqrt(variance)
+    return 0.5 * math.erfc(z_score / math.sqrt(2))
+
+
+def print_comparison(comparisons: list[RunComparison]) -> None:
+    if not comparisons:
+        print("No solver/size pairs in common between the two runs.")
+        return
+
+    print(
+        f"{'solver':<8} {'size':>4} {'n':>9} {'base_med_s':>12} "
+        f"{'cand_med_s':>12} {'ratio':>7} {'p':>8} {'timeouts':>9}  status"
+    )
+    for item in comparisons:
+        samples = f"{item.baseline_samples}/{item.candidate_samples}"
+        timeouts = f"{item.baseline_timeouts}/{item.candidate_timeouts}"
+        status = "REGRESSION" if item.regressed else "ok"
+        print(
+            f"{item.solver:<8} {item.size:>4} {samples:>9} "
+            f"{item.baseline_median_s:>12.6f} {item.candidate_median_s:>12.6f} "
+            f"{item.ratio:>7.2f} {item.p_value:>8.4f} {timeouts:>9}  {status}"
+        )
+
+
+def git_commit() -> str:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True,
+            timeout=5,
+            check=True,
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True,
+            timeout=5,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ""
+    return f"{commit}-dirty" if dirty else commit
+
+
+def host_info() -> dict[str, str | int | None]:
+    return {
+        "hostname": platform.node(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def compare_runs_menu():
+    runs = list_runs()
+    if len(runs) < 2:
+        print("\nAt least two recorded benchmark runs are needed to compare.")
+        return None
+
+    print("\nRecorded benchmark runs:")
+    for run in runs:
+        commit = run["git_commit"][:12] or "unknown"
+        print(
+            f"{run['id']}. {run['created_at']} {run['dataset']} "
+            f"commit={commit} solvers={run['solvers']} {run['variant']}".rstrip()
+        )
+
+    baseline = input("\nBaseline run id: ").strip()
+    candidate = input("Candidate run id: ").strip()
+    if not baseline.isdigit() or not candidate.isdigit():
+        print("Invalid run id.")
+        return None
+
+    try:
+        comparisons = compare_runs(int(baseline), int(candidate))
+    except ValueError as exc:
+        print(exc)
+        return None
+    print()
+    print_comparison(comparisons)
+    return comparisons
+
+
+def _ensure_result_columns(connection: sqlite3.Connection) -> None:
+    existing = {row[1] for row in connection.execute("PRAGMA table_info(results)")}
+    for field in CSV_FIELDS:
+        if field not in existing:
+            connection.execute(f"ALTER TABLE results ADD COLUMN {field}")
+    connection.commit()
+
+
+def _check_comparable_hosts(
+    connection: sqlite3.Connection,
+    baseline_run: int,
+    candidate_run: int,
+) -> None:
+    hosts = {}
+    for run_id in (baseline_run, candidate_run):
+        row = connection.execute("SELECT host FROM runs WHERE id = ?", (run_id,)).fetchone()
+        if row is None:
+            raise ValueError(f"No benchmark run with id {run_id}")
+        host = json.loads(row["host"])
+        # Runs recorded before jobs existed ran one puzzle at a time.
+        host.setdefault("contended", False)
+        hosts[run_id] = host
+
+    before, after = hosts[baseline_run], hosts[candidate_run]
+    differing = [
+        field for field in COMPARABLE_HOST_FIELDS if before.get(field) != after.get(field)
+    ]
+    if differing:
+        raise ValueError(
+            f"Runs {baseline_run} and {candidate_run} differ in host "
+            f"{', '.join(differing)}; their runtimes are not comparable."
+        )
+
+
+def _runtime_samples(
+    connection: sqlite3.Connection,
+    run_id: int,
+) -> tuple[dict[tuple[str, int], list[float]], dict[tuple[str, int], int]]:
+    """Solved runtimes and timeout counts per (solver, size) for one run."""
+    samples: dict[tuple[str, int], list[float]] = {}
+    timeouts: dict[tuple[str, int], int] = {}
+    rows = connection.execute(
+        "SELECT solver, size, status, runtime_seconds FROM results "
+        "WHERE run_id = ? AND status IN ('solved', 'timeout')",
+        (run_id,),
+    )
+    for row in rows:
+        if row["size"] in (None, ""):
+            continue
+        key = (row["solver"], int(row["size"]))
+        if row["status"] == "timeout":
+            timeouts[key] = timeouts.get(key, 0) + 1
+        elif row["runtime_seconds"] not in (None, ""):
+            samples.setdefault(key, []).append(float(row["runtime_seconds"]))
+    return samples, timeouts
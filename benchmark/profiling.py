@@ -0,0 +1,114 @@
+import marshal
+from pathlib import Path
+import pstats
+
+
+MAX_STACK_DEPTH = 128
+
+
+def profile_dir(csv_path: Path) -> Path:
+    return csv_path.parent / f"{csv_path.stem.removesuffix('_results')}_profiles"
+
+
+def profile_path(directory: Path, solver_name: str, puzzle_index: int) -> Path:
+    return directory / f"{solver_name}_{puzzle_index:06d}.pstats"
+
+
+def clear_profiles(directory: Path, solver_name: str) -> None:
+    """Remove a solver's profiles left by earlier runs, so summaries cover one run."""
+    for pattern in (f"{solver_name}_[0-9]*", f"{solver_name}_combined.*"):
+        for path in directory.glob(pattern):
+            if path.suffix in (".pstats", ".collapsed"):
+                path.unlink()
+
+
+def write_profile(stats: dict, path: Path) -> Path:
+    """Write raw cProfile stats as a .pstats dump and its collapsed stacks."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "wb") as f:
+        marshal.dump(stats, f)
+    write_collapsed_stacks(path, path.with_suffix(".collapsed"))
+    return path
+
+
+def should_profile(
+    puzzle_index: int,
+    solver_name: str,
+    profile_solvers: list[str] | None,
+    profile_every: int = 1,
+) -> bool:
+    if not profile_solvers or solver_name not in profile_solvers:
+        return False
+    return (puzzle_index - 1) % profile_every == 0
+
+
+def write_collapsed_stacks(stats_path: Path, output_path: Path) -> Path:
+    """Write Brendan Gregg collapsed stacks derived from a cProfile dump.
+
+    cProfile only records caller/callee edges, so time below a function that
+    is reached from several callers is split in proportion to each caller's
+    share of that function's cumulative time.
+    """
+    stats = pstats.Stats(str(stats_path)).stats
+    children: dict[tuple, list[tuple[tuple, float]]] = {}
+    for callee, (_cc, _nc, _tt, _ct, callers) in stats.items():
+        for caller, edge in callers.items():
+            children.setdefault(caller, []).append((callee, edge[3]))
+
+    lines: dict[str, int] = {}
+
+    def walk(func: tuple, stack: list[str], fraction: float) -> None:
+        _cc, _nc, tt, ct, _callers = stats[func]
+        stack.append(_frame_name(func))
+        micros = int(tt * fraction * 1_000_000)
+        if micros > 0:
+            key = ";".join(stack)
+            lines[key] = lines.get(key, 0) + micros
+
+        if len(stack) < MAX_STACK_DEPTH:
+            seen = set(stack)
+            for callee, edge_ct in children.get(func, []):
+                callee_ct = stats[callee][3]
+                if _frame_name(callee) in seen or callee_ct <= 0:
+                    continue
+                walk(callee, stack, fraction * edge_ct / callee_ct)
+        stack.pop()
+
+    for func, (_cc, _nc, _tt, _ct, callers) in stats.items():
+        if not callers:
+            walk(func, [], 1.0)
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as f:
+        for stack, micros in sorted(lines.items()):
+            f.write(f"{stack} {micros}\n")
+    return output_path
+
+
+def summarize_profiles(directory: Path, solver_name: str, limit: int = 10) -> Path | None:
+    paths = sorted(directory.glob(f"{solver_name}_[0-9]*.pstats"))
+    if not paths:
+        return None
+
+    combined = pstats.Stats(*(str(path) for path in paths))
+    combined_path = directory / f"{solver_name}_combined.pstats"
+    combined.dump_stats(combined_path)
+    write_collapsed_stacks(combined_path, combined_path.with_suffix(".collapsed"))
+
+    print(f"\nTop {limit} functions for {solver_name} ({len(paths)} profiled solve(s)):")
+    print(f"{'tottime_s':>10} {'cumtime_s':>10} {'calls':>10}  function")
+    hot_spots = sorted(
+        combined.stats.items(),
+        key=lambda item: item[1][2],
+        reverse=True,
+    )
+    for func, (_cc, calls, tt, ct, _callers) in hot_spots[:limit]:
+        print(f"{tt:>10.4f} {ct:>10.4f} {calls:>10}  {_frame_name(func)}")
+    return combined_path
+
+
+def _frame_name(func: tuple) -> str:
+    filename, line, name = func
+    if filename == "~":
+        return name.replace(";", ":")
+    return f"{Path(filename).name}:{line}({name})".replace(";", ":")
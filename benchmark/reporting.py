@@ -1,8 +1,8 @@
+import csv
 from pathlib import Path
 
-import pandas as pd
-
 from config import load_config
+from dataset_paths import dataset_stem
 
 
 CSV_FIELDS = [
@@ -18,22 +18,31 @@ CSV_FIELDS = [
     "backtracks",
     "assignments",
     "recursive_calls",
+    "peak_rss_bytes",
+    "tracemalloc_peak_bytes",
     "solution_found",
     "error",
 ]
+BYTES_PER_MB = 1024 * 1024
 BENCHMARK_RESULTS_DIR = load_config()["paths"]["benchmark_results_dir"]
 
 
-def result_paths(dataset_path):
-    root = Path(load_config()["paths"]["benchmark_results_dir"])
-    dataset_stem = Path(dataset_path).stem
+def result_paths(dataset_path, results_dir=None, shard=None):
+    root = Path(
+        load_config()["paths"]["benchmark_results_dir"]
+        if results_dir is None
+        else results_dir
+    )
+    stem = dataset_stem(dataset_path)
+    if shard is not None:
+        stem = f"{stem}_shard{shard:05d}"
     data_dir = root / "data"
     summary_dir = root / "summary"
     data_dir.mkdir(parents=True, exist_ok=True)
     summary_dir.mkdir(parents=True, exist_ok=True)
 
-    csv_path = data_dir / f"{dataset_stem}_results.csv"
-    summary_path = summary_dir / f"{dataset_stem}_summary.csv"
+    csv_path = data_dir / f"{stem}_results.csv"
+    summary_path = summary_dir / f"{stem}_summary.csv"
     return csv_path, summary_path
 
 
@@ -52,12 +61,63 @@ def _result_row(puzzle_index, solver_name, result, metadata=None):
         "backtracks": result.backtracks,
         "assignments": result.assignments,
         "recursive_calls": result.recursive_calls,
+        "peak_rss_bytes": result.peak_rss_bytes,
+        "tracemalloc_peak_bytes": result.tracemalloc_peak_bytes,
         "solution_found": result.solved,
         "error": result.error or "",
     }
 
 
+def open_results_csv(csv_path, resume=False):
+    csv_path.parent.mkdir(parents=True, exist_ok=True)
+    append = False
+    if resume and csv_path.exists():
+        _trim_partial_row(csv_path)
+        append = csv_path.stat().st_size > 0
+        if append:
+            _check_results_header(csv_path)
+
+    csv_file = open(csv_path, "a" if append else "w", newline="", encoding="utf-8")
+    writer = csv.DictWriter(csv_file, fieldnames=CSV_FIELDS)
+    if not append:
+        writer.writeheader()
+        csv_file.flush()
+    return csv_file, writer
+
+
+def append_result_row(csv_file, writer, row):
+    writer.writerow(_result_row(**row))
+    csv_file.flush()
+
+
+def completed_results(csv_path):
+    if not csv_path.exists() or csv_path.stat().st_size == 0:
+        return set()
+
+    _check_results_header(csv_path)
+    completed = set()
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            if row.get("status") and row["puzzle_index"].isdigit():
+                completed.add((int(row["puzzle_index"]), row["solver"]))
+    return completed
+
+
+def read_results_csv(csv_path):
+    import pandas as pd
+
+    table = pd.read_csv(csv_path, keep_default_na=False, na_values=[""])
+    table = table.reindex(columns=CSV_FIELDS)
+    table["error"] = table["error"].fillna("")
+    table["solution_found"] = (
+        table["solution_found"].astype(str).str.lower().eq("true")
+    )
+    return table
+
+
 def results_dataframe(csv_rows):
+    import pandas as pd
+
     result_rows = [_result_row(**row) for row in csv_rows]
     table = pd.DataFrame(result_rows, columns=CSV_FIELDS)
     table["solution_found"] = table["solution_found"].fillna(False).astype(bool)
@@ -65,6 +125,8 @@ def results_dataframe(csv_rows):
 
 
 def summary_dataframe(table, tested=None):
+    import pandas as pd
+
     if table.empty:
         return pd.DataFrame()
 
@@ -96,6 +158,9 @@ def print_summary_table(table):
                     "backtracks_avg": _format_number,
                     "assignments_avg": _format_number,
                     "recursive_calls_avg": _format_number,
+                    "peak_rss_avg_mb": _format_megabytes,
+                    "peak_rss_max_mb": _format_megabytes,
+                    "tracemalloc_peak_avg_mb": _format_megabytes,
                 },
             )
         )
@@ -107,19 +172,55 @@ def write_csv(table, csv_path):
     return csv_path
 
 
+def _check_results_header(csv_path):
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        header = next(csv.reader(f), [])
+    if header != CSV_FIELDS:
+        raise ValueError(
+            f"Cannot resume {csv_path}: columns do not match the current results format."
+        )
+
+
+def _trim_partial_row(csv_path):
+    # A run killed mid-write can leave a truncated last line; drop it so the
+    # resumed run re-solves that pair instead of appending onto a broken row.
+    with open(csv_path, "rb+") as f:
+        end = f.seek(0, 2)
+        if end == 0:
+            return
+        f.seek(end - 1)
+        if f.read(1) == b"\n":
+            return
+        position = end
+        while position > 0:
+            step = min(4096, position)
+            position -= step
+            f.seek(position)
+            chunk = f.read(step)
+            newline = chunk.rfind(b"\n")
+            if newline != -1:
+                f.truncate(position + newline + 1)
+                return
+        f.truncate(0)
+
+
 def _summary_row(name, table, tested):
+    import pandas as pd
+
     average_fields = [
         "setup_seconds",
         "solve_seconds",
         "backtracks",
         "assignments",
         "recursive_calls",
+        "peak_rss_bytes",
+        "tracemalloc_peak_bytes",
     ]
     solved = int(table["solution_found"].sum()) if not table.empty else 0
     total_runtime = table["runtime_seconds"].sum() if not table.empty else 0.0
     avg_runtime = total_runtime / tested if tested else 0.0
     success_rate = (solved / tested * 100) if tested else 0.0
-    averages = table[average_fields].mean()
+    averages = table[average_fields].apply(pd.to_numeric, errors="coerce").mean()
     solve_average = averages["solve_seconds"]
 
     if pd.isna(solve_average) and (
@@ -139,8 +240,20 @@ def _summary_row(name, table, tested):
         "backtracks_avg": averages["backtracks"],
         "assignments_avg": averages["assignments"],
         "recursive_calls_avg": averages["recursive_calls"],
+        "peak_rss_avg_mb": averages["peak_rss_bytes"] / BYTES_PER_MB,
+        "peak_rss_max_mb": (
+            pd.to_numeric(table["peak_rss_bytes"], errors="coerce").max()
+            / BYTES_PER_MB
+        ),
+        "tracemalloc_peak_avg_mb": averages["tracemalloc_peak_bytes"] / BYTES_PER_MB,
     }
 
 
 def _format_number(value, decimals=6):
+    import pandas as pd
+
     return "-" if pd.isna(value) else f"{value:.{decimals}f}"
+
+
+def _format_megabytes(value):
+    return _format_number(value, decimals=2)
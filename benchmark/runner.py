@@ -1,12 +1,35 @@
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import cProfile
+import itertools
 import multiprocessing
-import queue
+import os
+from pathlib import Path
+import pickle
+import tempfile
 import time
+import tracemalloc
 
 from cli_helpers import prompt_choice
 from config import load_config
-from generator import dataset_size_from_path, read_dataset, select_dataset
+from generator import dataset_size_from_path, iter_dataset, select_dataset
+from generator.shards import iter_sharded_dataset, shard_offset
+from parallel import bounded_map
+from .history import HISTORY_FILENAME, record_run
+from .profiling import (
+    clear_profiles,
+    profile_dir,
+    profile_path as solver_profile_path,
+    should_profile,
+    summarize_profiles,
+    write_profile,
+)
 from .reporting import (
+    append_result_row,
+    completed_results,
+    open_results_csv,
     print_summary_table,
+    read_results_csv,
     result_paths,
     results_dataframe,
     summary_dataframe,
@@ -15,7 +38,7 @@ from .reporting import (
 
 from solvers.csp import solve_csp
 from solvers.dlx import solve_dlx
-from solvers.metrics import SolverResult
+from solvers.metrics import SolverResult, peak_rss_bytes
 from solvers.naive import solve_naive
 from solvers.sat import solve_sudoku as solve_sat
 from solvers.smt import solve_smt
@@ -30,47 +53,219 @@ SOLVERS = {
 }
 
 
-def _run_solver_process(solver_fn, puzzle, result_queue):
-    result_queue.put(solver_fn(puzzle))
+# A spawned memory run first has to start an interpreter and import the
+# solver, which its timeout allows for on top of the solve timeout.
+MEMORY_RUN_STARTUP_SECONDS = 10
+
+
+def _run_solver_process(solver_fn, puzzle, profiled, connection):
+    """Send back (result, raw cProfile stats or None); the parent writes profiles."""
+    profiler = cProfile.Profile() if profiled else None
+    if profiler is not None:
+        profiler.enable()
+
+    try:
+        result = solver_fn(puzzle)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+
+    stats = None
+    if profiler is not None:
+        profiler.create_stats()
+        stats = profiler.stats
+    connection.send((result, stats))
+
+
+def _run_memory_process(solver_fn, puzzle, traced, connection):
+    """Report one untimed solve's tracemalloc peak, or its RSS growth.
+
+    The RSS figure is the high-water mark's growth over the solve, which is
+    only meaningful in a spawned child whose earlier peak is just its own
+    imports; a forked child inherits the parent's.
+    """
+    if traced:
+        tracemalloc.start()
+        solver_fn(puzzle)
+        _current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        connection.send(peak)
+        return
+
+    baseline = peak_rss_bytes()
+    solver_fn(puzzle)
+    peak = peak_rss_bytes()
+    connection.send(None if peak is None or baseline is None else peak - baseline)
+
+
+def _run_child(context, target, args, timeout_seconds):
+    """Run `target(*args, connection)` in a child process.
+
+    Returns (timed_out, value, exit_code), where value is whatever the child
+    sent, or None if it exited without sending. The value is read as soon as
+    it is sent, so a large one never holds the child past its timeout.
+    """
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=target, args=(*args, sender))
+    try:
+        process.start()
+    except BaseException:
+        receiver.close()
+        raise
+    finally:
+        sender.close()
+
+    try:
+        if not receiver.poll(timeout_seconds):
+            process.terminate()
+            process.join()
+            return True, None, process.exitcode
+        try:
+            value = receiver.recv()
+        except EOFError:
+            value = None
+    finally:
+        receiver.close()
+    process.join()
+    return False, value, process.exitcode
+
+
+def _fork_context():
+    context_name = "fork" if "fork" in multiprocessing.get_all_start_methods() else None
+    return multiprocessing.get_context(context_name)
+
+
+def _measure_memory(solver_fn, puzzle, timeout_seconds) -> tuple[int | None, int | None]:
+    """(peak RSS growth, tracemalloc peak) of `puzzle`, each from its own untimed run."""
+    try:
+        _timed_out, rss, _code = _run_child(
+            multiprocessing.get_context("spawn"),
+            _run_memory_process,
+            (solver_fn, puzzle, False),
+            timeout_seconds + MEMORY_RUN_STARTUP_SECONDS,
+        )
+    except (AttributeError, TypeError, pickle.PicklingError):
+        # A spawned child can only run solvers importable by name.
+        rss = None
+    _timed_out, traced, _code = _run_child(
+        _fork_context(),
+        _run_memory_process,
+        (solver_fn, puzzle, True),
+        timeout_seconds,
+    )
+    return rss, traced
 
 
 def solve_with_timeout(
     solver_fn,
     puzzle,
+    measure_memory=False,
+    profile_path=None,
+    timeout_seconds=None,
+    cache=None,
 ) -> SolverResult:
-    timeout_seconds = load_config()["benchmark"]["solver_timeout_seconds"]
-    start = time.perf_counter()
-    context_name = "fork" if "fork" in multiprocessing.get_all_start_methods() else None
-    context = multiprocessing.get_context(context_name)
-    result_queue = context.Queue(maxsize=1)
-    process = context.Process(
-        target=_run_solver_process,
-        args=(solver_fn, puzzle, result_queue),
-    )
+    """Solve `puzzle` in a child process, giving up after `timeout_seconds`.
 
-    process.start()
-    process.join(timeout_seconds)
+    With `measure_memory`, memory comes from separate untimed solves of the
+    same puzzle, so tracing never inflates `runtime_seconds`.
 
-    if process.is_alive():
-        process.terminate()
-        process.join()
-        elapsed = time.perf_counter() - start
+    With a `cache` (a `SolutionCache` or `MemoryCache`), a cached solution
+    from the same solver is returned without starting a process, and new
+    solutions are stored.
+    """
+    if timeout_seconds is None:
+        timeout_seconds = load_config()["benchmark"]["solver_timeout_seconds"]
+    start = time.perf_counter()
+    if cache is not None:
+        solver_name = _solver_name(solver_fn)
+        solution = cache.get(puzzle, solver_name)
+        if solution is not None:
+            return SolverResult(
+                solution=solution,
+                status="solved",
+                runtime_seconds=time.perf_counter() - start,
+                cached=True,
+            )
+        result = solve_with_timeout(
+            solver_fn,
+            puzzle,
+            measure_memory=measure_memory,
+            profile_path=profile_path,
+            timeout_seconds=timeout_seconds,
+        )
+        if result.solved:
+            cache.put(puzzle, result.solution, solver_name)
+        return result
+
+    timed_out, sent, exit_code = _run_child(
+        _fork_context(),
+        _run_solver_process,
+        (solver_fn, puzzle, profile_path is not None),
+        timeout_seconds,
+    )
+    result, stats = sent if sent is not None else (None, None)
+    if stats is not None:
+        write_profile(stats, profile_path)
+    if timed_out:
         return SolverResult(
             solution=None,
             status="timeout",
-            runtime_seconds=elapsed,
+            runtime_seconds=time.perf_counter() - start,
             error=f"Timed out after {timeout_seconds} seconds.",
         )
-
-    try:
-        return result_queue.get_nowait()
-    except queue.Empty:
+    if result is None:
         return SolverResult(
             solution=None,
             status="error",
             runtime_seconds=time.perf_counter() - start,
-            error=f"Solver process exited with code {process.exitcode} without a result.",
+            error=f"Solver process exited with code {exit_code} without a result.",
+        )
+
+    if measure_memory:
+        result.peak_rss_bytes, result.tracemalloc_peak_bytes = _measure_memory(
+            solver_fn,
+            puzzle,
+            timeout_seconds,
+        )
+    return result
+
+
+def _solver_name(solver_fn) -> str:
+    for name, fn in SOLVERS.items():
+        if fn is solver_fn:
+            return name
+    return getattr(solver_fn, "__name__", repr(solver_fn))
+
+
+def _run_puzzle(
+    item,
+    solvers,
+    profiles,
+    profile_solvers,
+    profile_every,
+    measure_memory,
+    timeout_seconds,
+):
+    """Run every solver on one puzzle, skipping the names already recorded."""
+    i, record, done = item
+    results = []
+    for name, fn in solvers.items():
+        if name in done:
+            results.append((name, None))
+            continue
+
+        profile_path = None
+        if should_profile(i, name, profile_solvers, profile_every):
+            profile_path = solver_profile_path(profiles, name, i)
+        result = solve_with_timeout(
+            fn,
+            record["puzzle"],
+            measure_memory=measure_memory,
+            profile_path=profile_path,
+            timeout_seconds=timeout_seconds,
         )
+        results.append((name, result))
+    return results
 
 
 def _csv_row(size, puzzle_index, solver_name, result, record):
@@ -91,11 +286,37 @@ def benchmark_dataset(
     size,
     write_csv=False,
     solver_names=None,
+    resume=False,
+    variant="",
+    measure_memory=False,
+    profile_solvers=None,
+    profile_every=1,
+    jobs=1,
+    timeout_seconds=None,
+    results_dir=None,
+    shard=None,
 ):
-    records = read_dataset(dataset_path, expected_size=size)
-    if not records:
+    if jobs < 1:
+        raise ValueError("jobs must be at least 1")
+    # Solvers parse each puzzle themselves, so only cell counts are checked
+    # here and records are streamed rather than loaded up front.
+    first_index = 1
+    if shard is None:
+        records = iter_dataset(dataset_path, expected_size=size, validate="length")
+    else:
+        # Puzzle indexes stay global so per-shard results can be concatenated.
+        first_index += shard_offset(dataset_path, shard)
+        records = iter_sharded_dataset(
+            dataset_path,
+            shard=shard,
+            expected_size=size,
+            validate="length",
+        )
+    first_record = next(records, None)
+    if first_record is None:
         print("\nDataset has no puzzles.")
         return None
+    records = itertools.chain([first_record], records)
 
     solvers = dict(SOLVERS)
     if solver_names is not None:
@@ -103,39 +324,106 @@ def benchmark_dataset(
             name: solver for name, solver in solvers.items() if name in solver_names
         }
 
-    csv_rows = []
-    tested = 0
+    if profile_every < 1:
+        raise ValueError("profile_every must be at least 1")
+    profiles = None
+    if profile_solvers:
+        profiles = profile_dir(result_paths(dataset_path, results_dir, shard)[0])
+        profiles.mkdir(parents=True, exist_ok=True)
+        if not resume:
+            for name in profile_solvers:
+                clear_profiles(profiles, name)
+
+    # Rows are streamed to disk as each solve finishes, so memory stays flat
+    # and, with CSV output enabled, a crashed run keeps its progress and can
+    # be resumed. Without it they go to a scratch file that is removed once
+    # the results table has been read back.
+    completed = set()
+    if write_csv:
+        csv_path, summary_path = result_paths(dataset_path, results_dir, shard)
+        csv_file, writer = open_results_csv(csv_path, resume=resume)
+        if resume:
+            completed = completed_results(csv_path)
+            if completed:
+                print(f"Resuming: {len(completed)} result(s) already recorded.")
+    else:
+        scratch_fd, scratch_name = tempfile.mkstemp(suffix="_results.csv")
+        os.close(scratch_fd)
+        csv_path = Path(scratch_name)
+        csv_file, writer = open_results_csv(csv_path)
+
+    run_puzzle = partial(
+        _run_puzzle,
+        solvers=solvers,
+        profiles=profiles,
+        profile_solvers=profile_solvers,
+        profile_every=profile_every,
+        measure_memory=measure_memory,
+        timeout_seconds=timeout_seconds,
+    )
+    executor = None
+    if jobs > 1:
+        print(f"Running {jobs} puzzles at a time; runtimes are contended.")
+        # Puzzles run in worker processes that fork their own solver
+        # subprocesses, so no process ever forks while other threads run.
+        executor = ProcessPoolExecutor(max_workers=jobs)
 
-    for i, record in enumerate(records, start=1):
-        puzzle = record["puzzle"]
-        row_parts = [f"{i}:"]
-        for name, fn in solvers.items():
-            result = solve_with_timeout(
-                fn,
-                puzzle,
+    tested = 0
+    try:
+        try:
+            puzzles = (
+                (i, record, {name for name in solvers if (i, name) in completed})
+                for i, record in enumerate(records, start=first_index)
             )
-            csv_rows.append(_csv_row(size, i, name, result, record))
+            ordered = bounded_map(executor, run_puzzle, puzzles, 2 * jobs)
+            for (i, record, _done), results in ordered:
+                row_parts = [f"{i}:"]
+                for name, result in results:
+                    if result is None:
+                        row_parts.append(f"{name}=DONE")
+                        continue
+
+                    append_result_row(csv_file, writer, _csv_row(size, i, name, result, record))
 
-            if result.solved:
-                row_parts.append(f"{name}={result.runtime_seconds:.4f}s")
-            else:
-                row_parts.append(f"{name}={result.status.upper()}")
+                    if result.solved:
+                        row_parts.append(f"{name}={result.runtime_seconds:.4f}s")
+                    else:
+                        row_parts.append(f"{name}={result.status.upper()}")
 
-        tested += 1
-        print(" | ".join(row_parts))
+                tested += 1
+                print(" | ".join(row_parts))
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+            csv_file.close()
+        results_table = read_results_csv(csv_path)
+    finally:
+        if not write_csv:
+            csv_path.unlink(missing_ok=True)
 
-    results_table = results_dataframe(csv_rows)
+    results_table = results_table[results_table["solver"].isin(list(solvers))]
     summary_table = summary_dataframe(results_table, tested)
 
     print("\n-----Results-----")
     print(f"Puzzles Tested: {tested}\n")
     print_summary_table(summary_table)
+    if profiles is not None:
+        for name in solvers:
+            summarize_profiles(profiles, name)
+        print(f"\nProfiles written to: {profiles}")
     if write_csv:
-        csv_path, summary_path = result_paths(dataset_path)
-        csv_file = write_table_csv(results_table, csv_path)
         summary_file = write_table_csv(summary_table, summary_path)
-        print(f"\nCSV written to: {csv_file}")
+        print(f"\nCSV written to: {csv_path}")
         print(f"Summary CSV written to: {summary_file}")
+        run_id = record_run(
+            csv_path,
+            dataset_path,
+            solver_names=list(solvers),
+            variant=variant,
+            path=None if results_dir is None else Path(results_dir) / HISTORY_FILENAME,
+            jobs=jobs,
+        )
+        print(f"Run recorded in benchmark history as #{run_id}")
 
     return results_table
 
@@ -162,12 +450,23 @@ def benchmark_menu():
         input("Save benchmark results and summary to CSV? (y/n): ").strip().lower()
         == "y"
     )
+    resume = False
+    if write_csv and result_paths(dataset_path)[0].exists():
+        resume = (
+            input("Resume from existing benchmark results? (y/n): ").strip().lower()
+            == "y"
+        )
+    measure_memory = (
+        input("Record per-solve memory usage? (y/n): ").strip().lower() == "y"
+    )
     print()
     return benchmark_dataset(
         dataset_path,
         size,
         write_csv=write_csv,
         solver_names=solver_names,
+        resume=resume,
+        measure_memory=measure_memory,
     )
 
 
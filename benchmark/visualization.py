@@ -1,11 +1,5 @@
 import os
 
-import matplotlib
-
-matplotlib.use("TkAgg" if os.environ.get("DISPLAY") else "Agg")
-
-import matplotlib.pyplot as plt
-
 
 def visualization_menu(results_table):
     if results_table is None or results_table.empty:
@@ -28,6 +22,11 @@ def visualization_menu(results_table):
 
 
 def visualize_benchmark(times_by_solver, tested, avgs, show_naive=True):
+    import matplotlib
+
+    matplotlib.use("TkAgg" if os.environ.get("DISPLAY") else "Agg")
+    import matplotlib.pyplot as plt
+
     plt.figure()
     for name, ts in times_by_solver.items():
         if name == "naive" and not show_naive:
@@ -1,3 +1,5 @@
+from dataclasses import dataclass
+import hashlib
 from math import isqrt
 
 
@@ -53,3 +55,289 @@ def board_size(values: list[int]) -> tuple[int, int]:
 
 def format_board(values: list[int]) -> str:
     return " ".join(map(str, values))
+
+
+def is_complete_solution(values: list[int]) -> bool:
+    """True if every row, column and box holds each digit exactly once."""
+    n, box = board_size(values)
+    digits = set(range(1, n + 1))
+    for i in range(n):
+        if set(values[i * n : (i + 1) * n]) != digits:
+            return False
+        if set(values[i::n]) != digits:
+            return False
+        top, left = (i // box) * box, (i % box) * box
+        box_values = set()
+        for row in range(top, top + box):
+            box_values.update(values[row * n + left : row * n + left + box])
+        if box_values != digits:
+            return False
+    return True
+
+
+def solves_puzzle(puzzle: list[int], solution: list[int]) -> bool:
+    """True if `solution` is a complete grid that keeps every given of `puzzle`."""
+    if len(puzzle) != len(solution):
+        return False
+    if any(given and given != value for given, value in zip(puzzle, solution)):
+        return False
+    return is_complete_solution(solution)
+
+
+@dataclass(frozen=True)
+class BoardTransform:
+    """A Sudoku symmetry: optional transpose, then a row and column order, then relabeling.
+
+    `rows[i]` is the source row placed at row i (after transposing), `cols`
+    likewise, and `digits[v]` is the new label of digit v, with 0 kept for
+    empty cells.
+    """
+
+    transpose: bool
+    rows: tuple[int, ...]
+    cols: tuple[int, ...]
+    digits: tuple[int, ...]
+
+    def apply(self, board: str | list[int]) -> list[int]:
+        values = parse_board(board)
+        n = len(self.rows)
+        if self.transpose:
+            values = _transposed(values, n)
+        digits = self.digits
+        return [digits[values[row * n + col]] for row in self.rows for col in self.cols]
+
+    def invert(self, board: str | list[int]) -> list[int]:
+        """Map a board in transformed coordinates, e.g. a solution, back to the source."""
+        values = parse_board(board)
+        n = len(self.rows)
+        labels = [0] * (n + 1)
+        for digit, label in enumerate(self.digits):
+            labels[label] = digit
+        source = [0] * (n * n)
+        for i, row in enumerate(self.rows):
+            for j, col in enumerate(self.cols):
+                source[row * n + col] = labels[values[i * n + j]]
+        return _transposed(source, n) if self.transpose else source
+
+
+def canonical_form(board: str | list[int]) -> tuple[list[int], BoardTransform]:
+    """Representative of `board` under all Sudoku symmetries, and the transform to it.
+
+    The symmetries are band and stack permutations, row and column
+    permutations inside them, transposition and digit relabeling. Boards
+    that are equal under these get the same representative, the smallest
+    of the candidates below.
+
+    Trying every transform is out of reach (about 3.4 million geometric ones
+    for 9x9 before relabeling), so rows, columns, bands, stacks and digits
+    are first told apart by refining invariant colours: a row's colour comes
+    from the colours of its columns and digits, a digit's from where it
+    appears, and so on until nothing splits further. Only classes that are
+    still tied are branched on. Empty rows and columns and unused digits can
+    be put in any order, so ties among them are never branched on.
+    """
+    values = parse_board(board)
+    n, box = board_size(values)
+    best: tuple[list[int], BoardTransform] | None = None
+    for transpose in (False, True):
+        grid = _transposed(values, n) if transpose else values
+        candidate = _canonical_search(grid, n, box, transpose)
+        if best is None or candidate[0] < best[0]:
+            best = candidate
+    if best is None:
+        raise RuntimeError("Canonical search produced no candidate")
+    return best
+
+
+def canonical_hash(board: str | list[int]) -> str:
+    """Stable hex digest of the canonical form, equal for symmetric boards."""
+    canonical, _transform = canonical_form(board)
+    return hashlib.blake2b(bytes(canonical), digest_size=16).hexdigest()
+
+
+def _transposed(values: list[int], n: int) -> list[int]:
+    return [values[col * n + row] for row in range(n) for col in range(n)]
+
+
+def _ranks(signatures: list) -> list[int]:
+    order = {signature: rank for rank, signature in enumerate(sorted(set(signatures)))}
+    return [order[signature] for signature in signatures]
+
+
+def _canonical_search(
+    values: list[int],
+    n: int,
+    box: int,
+    transpose: bool,
+) -> tuple[list[int], BoardTransform]:
+    """Smallest leaf of the refine-and-branch search over one orientation of `values`."""
+    row_cells: list[list[tuple[int, int]]] = [[] for _ in range(n)]
+    col_cells: list[list[tuple[int, int]]] = [[] for _ in range(n)]
+    digit_cells: list[list[tuple[int, int]]] = [[] for _ in range(n + 1)]
+    for cell, value in enumerate(values):
+        row, col = divmod(cell, n)
+        row_cells[row].append((col, value))
+        col_cells[col].append((row, value))
+        if value:
+            digit_cells[value].append((row, col))
+
+    row_used = [any(value for _col, value in cells) for cells in row_cells]
+    col_used = [any(value for _row, value in cells) for cells in col_cells]
+    band_used = [any(row_used[band * box : band * box + box]) for band in range(box)]
+    stack_used = [any(col_used[stack * box : stack * box + box]) for stack in range(box)]
+    digits = [digit for digit in range(1, n + 1) if digit_cells[digit]]
+    unused = [digit for digit in range(1, n + 1) if not digit_cells[digit]]
+    members = range(box)
+
+    def refine(colors):
+        bands, stacks, rows, cols, digit_colors = colors
+        while True:
+            before = tuple(len(set(part)) for part in (bands, stacks, rows, cols, digit_colors))
+            bands = _ranks([
+                (bands[band], tuple(sorted(rows[band * box + i] for i in members)))
+                for band in range(box)
+            ])
+            stacks = _ranks([
+                (stacks[stack], tuple(sorted(cols[stack * box + i] for i in members)))
+                for stack in range(box)
+            ])
+            rows = _ranks([
+                (
+                    rows[row],
+                    bands[row // box],
+                    tuple(sorted((cols[col], digit_colors[value]) for col, value in row_cells[row])),
+                )
+                for row in range(n)
+            ])
+            cols = _ranks([
+                (
+                    cols[col],
+                    stacks[col // box],
+                    tuple(sorted((rows[row], digit_colors[value]) for row, value in col_cells[col])),
+                )
+                for col in range(n)
+            ])
+            # Slot 0 stands for empty cells and keeps a colour of its own.
+            digit_colors = [-1] + _ranks([
+                (digit_colors[digit], tuple(sorted((rows[row], cols[col]) for row, col in digit_cells[digit])))
+                for digit in range(1, n + 1)
+            ])
+            colors = (bands, stacks, rows, cols, digit_colors)
+            if tuple(len(set(part)) for part in colors) == before:
+                return colors
+
+    def tied_class(colors):
+        """Colour list index and members of the first class worth branching on."""
+        bands, stacks, rows, cols, digit_colors = colors
+        lines = (
+            (0, bands, range(box), band_used),
+            (1, stacks, range(box), stack_used),
+            (2, rows, range(n), row_used),
+            (3, cols, range(n), col_used),
+            (4, digit_colors, digits, [True] * (n + 1)),
+        )
+        for part, part_colors, indexes, used in lines:
+            classes: dict[int, list[int]] = {}
+            for index in indexes:
+                if used[index]:
+                    classes.setdefault(part_colors[index], []).append(index)
+            for color in sorted(classes):
+                if len(classes[color]) > 1:
+                    return part, classes[color]
+        return None
+
+    def leaf(colors):
+        bands, stacks, rows, cols, digit_colors = colors
+        row_order = tuple(
+            band * box + i
+            for band in sorted(range(box), key=lambda band: (bands[band], band))
+            for i in sorted(members, key=lambda i: (rows[band * box + i], i))
+        )
+        col_order = tuple(
+            stack * box + i
+            for stack in sorted(range(box), key=lambda stack: (stacks[stack], stack))
+            for i in sorted(members, key=lambda i: (cols[stack * box + i], i))
+        )
+        labels = [0] * (n + 1)
+        ordered = sorted(digits, key=lambda digit: digit_colors[digit])
+        for label, digit in enumerate(ordered + unused, start=1):
+            labels[digit] = label
+        board = [labels[values[row * n + col]] for row in row_order for col in col_order]
+        return board, BoardTransform(transpose, row_order, col_order, tuple(labels))
+
+    def automorphism(first: BoardTransform, other: BoardTransform) -> tuple:
+        """Symmetry of `values` taking `other`'s leaf onto `first`'s, per colour list."""
+        rows = [0] * n
+        cols = [0] * n
+        for source, target in zip(other.rows, first.rows):
+            rows[source] = target
+        for source, target in zip(other.cols, first.cols):
+            cols[source] = target
+        bands = [rows[band * box] // box for band in range(box)]
+        stacks = [cols[stack * box] // box for stack in range(box)]
+        labels = [0] * (n + 1)
+        for digit, label in enumerate(first.digits):
+            labels[label] = digit
+        digit_map = [labels[label] for label in other.digits]
+        return bands, stacks, rows, cols, digit_map
+
+    # Leaves with equal boards reveal symmetries of the board itself. A symmetry
+    # that fixes everything individualized so far maps one child's subtree
+    # onto another's, so only one child per orbit needs searching.
+    found: dict[tuple[int, ...], BoardTransform] = {}
+    symmetries: list[tuple] = []
+    best: list = []
+
+    def explore(colors, path):
+        colors = refine(colors)
+        tied = tied_class(colors)
+        if tied is None:
+            board, transform = leaf(colors)
+            key = tuple(board)
+            if key in found:
+                symmetries.append(automorphism(found[key], transform))
+            else:
+                found[key] = transform
+            if not best or board < best[0]:
+                best[:] = [board, transform]
+            return
+
+        part, indexes = tied
+        searched: list[int] = []
+        for index in indexes:
+            if searched and _same_orbit(index, searched, part, path, symmetries, n):
+                continue
+            searched.append(index)
+            split = [
+                (color, position != index) for position, color in enumerate(colors[part])
+            ]
+            split = [-1] + _ranks(split[1:]) if part == 4 else _ranks(split)
+            explore(colors[:part] + (split,) + colors[part + 1 :], path + [(part, index)])
+
+    explore(([0] * box, [0] * box, [0] * n, [0] * n, [-1] + [0] * n), [])
+    return best[0], best[1]
+
+
+def _same_orbit(
+    index: int,
+    searched: list[int],
+    part: int,
+    path: list[tuple[int, int]],
+    symmetries: list[tuple],
+    n: int,
+) -> bool:
+    """True if a symmetry fixing `path` links `index` to an already searched sibling."""
+    parent = list(range(n + 1))
+
+    def find(item: int) -> int:
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    for symmetry in symmetries:
+        if all(symmetry[fixed_part][fixed] == fixed for fixed_part, fixed in path):
+            for source, target in enumerate(symmetry[part]):
+                parent[find(source)] = find(target)
+    root = find(index)
+    return any(find(other) == root for other in searched)
@@ -0,0 +1,517 @@
+import argparse
+from dataclasses import asdict
+import json
+from pathlib import Path
+import sys
+import time
+
+import board_utils
+
+
+STREAM_REPORT_SECONDS = 10.0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    from benchmark import SOLVERS
+    from generator import DIFFICULTIES, EFFORT_METRICS, VERIFICATION_BACKENDS
+
+    parser = argparse.ArgumentParser(
+        prog="main.py",
+        description="Solve, generate, verify and benchmark Sudoku puzzles.",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    solve = commands.add_parser("solve", help="Solve a single puzzle.")
+    solve.add_argument("puzzle", help="Puzzle as one line, or '-' to read it from stdin.")
+    solve.add_argument("--solver", choices=list(SOLVERS), default="csp")
+    solve.add_argument("--timeout", type=_positive_float, help="Solver timeout in seconds.")
+    solve.add_argument("--json", action="store_true", help="Print the result as JSON.")
+    solve.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always run the solver instead of reusing a cached solution.",
+    )
+
+    stream = commands.add_parser(
+        "stream",
+        help="Solve puzzles read line by line from stdin, writing JSON lines to stdout.",
+    )
+    stream.add_argument("--solver", choices=list(SOLVERS), default="csp")
+    stream.add_argument("--jobs", type=_positive_int, default=1)
+    stream.add_argument(
+        "--timeout",
+        type=_positive_float,
+        help="Per-solve timeout in seconds (default: benchmark.solver_timeout_seconds).",
+    )
+    stream.add_argument(
+        "--ordered",
+        action="store_true",
+        help="Write results in input order instead of as they complete.",
+    )
+
+    serve = commands.add_parser("serve", help="Run the local HTTP/JSON solve service.")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8080)
+    serve.add_argument("--jobs", type=_positive_int, default=1)
+    serve.add_argument("--batch-size", type=_positive_int, default=16)
+    serve.add_argument(
+        "--batch-wait-ms",
+        type=float,
+        default=2.0,
+        help="How long to gather requests into one batch.",
+    )
+    serve.add_argument(
+        "--timeout",
+        type=_positive_float,
+        default=10.0,
+        help="Default per-request deadline in seconds.",
+    )
+    serve.add_argument("--queue-limit", type=_positive_int, default=1024)
+    serve.add_argument("--cache-size", type=_positive_int, default=4096)
+    serve.add_argument("--cache-ttl", type=_positive_float, help="Cache entry lifetime in seconds.")
+
+    generate = commands.add_parser("generate", help="Generate a dataset.")
+    generate.add_argument("--size", type=_board_size, required=True)
+    generate.add_argument("--difficulty", choices=list(DIFFICULTIES), required=True)
+    generate.add_argument("--count", type=_positive_int, required=True)
+    generate.add_argument("--seed", type=int)
+    checks = generate.add_mutually_exclusive_group()
+    checks.add_argument(
+        "--verify",
+        action="store_true",
+        help="Verify each generated puzzle is solvable.",
+    )
+    checks.add_argument(
+        "--unique",
+        action="store_true",
+        help="Dig clues only while the puzzle keeps a unique solution.",
+    )
+    generate.add_argument(
+        "--dedupe",
+        action="store_true",
+        help="Replace puzzles that are symmetric to an earlier one.",
+    )
+    generate.add_argument(
+        "--grid",
+        choices=["pattern", "random"],
+        default="pattern",
+        help="Solved-grid source: pattern shuffle or randomized search.",
+    )
+    generate.add_argument(
+        "--effort-band",
+        nargs=2,
+        type=float,
+        metavar=("LOW", "HIGH"),
+        help="Keep only puzzles whose solver effort falls in this range.",
+    )
+    generate.add_argument(
+        "--effort-metric",
+        choices=list(EFFORT_METRICS),
+        default="csp_backtracks",
+        help="Effort measure used by --effort-band.",
+    )
+    generate.add_argument("--output", type=Path, help="Dataset file to write.")
+    generate.add_argument(
+        "--shards",
+        type=_positive_int,
+        help="Write a sharded dataset directory with this many shards.",
+    )
+    generate.add_argument(
+        "--compression",
+        choices=["gz", "bz2", "xz"],
+        help="Compress the JSONL output with this codec.",
+    )
+    generate.add_argument(
+        "--jobs",
+        type=_positive_int,
+        default=1,
+        help="Worker processes; output is identical for any value.",
+    )
+
+    convert = commands.add_parser(
+        "convert",
+        help="Convert a dataset between JSONL and the binary .sdkb format.",
+    )
+    convert.add_argument("source", type=Path)
+    convert.add_argument("destination", type=Path, nargs="?")
+
+    dedupe = commands.add_parser(
+        "dedupe",
+        help="Drop puzzles that are equal to an earlier one under Sudoku symmetries.",
+    )
+    dedupe.add_argument("source", type=Path)
+    dedupe.add_argument("destination", type=Path, nargs="?")
+    dedupe.add_argument("--jobs", type=_positive_int, default=1)
+
+    verify = commands.add_parser("verify", help="Verify a dataset.")
+    verify.add_argument("dataset", type=Path)
+    verify.add_argument("--size", type=_board_size, help="Expected puzzle size.")
+    verify.add_argument("--mode", choices=["solvable", "unique"], default="solvable")
+    verify.add_argument("--max-failures", type=_positive_int, default=10)
+    verify.add_argument("--output", type=Path, help="Write the summary as JSON.")
+    verify.add_argument("--jobs", type=_positive_int, default=1)
+    verify.add_argument("--backend", choices=list(VERIFICATION_BACKENDS), default="z3")
+    verify.add_argument(
+        "--cross-check",
+        choices=list(VERIFICATION_BACKENDS),
+        help="Also verify with this backend and fail on any disagreement.",
+    )
+    verify.add_argument(
+        "--cache",
+        action="store_true",
+        help="Reuse and store solutions in the on-disk solution cache.",
+    )
+    verify.add_argument(
+        "--stop-early",
+        action="store_true",
+        help="Stop once --max-failures invalid puzzles have been found.",
+    )
+    verify.add_argument(
+        "--progress",
+        action="store_true",
+        help="Report progress and throughput on stderr.",
+    )
+
+    bench = commands.add_parser("bench", help="Benchmark solvers on a dataset.")
+    bench.add_argument("dataset", type=Path)
+    bench.add_argument("--size", type=_board_size, help="Expected puzzle size.")
+    bench.add_argument(
+        "--solver",
+        action="append",
+        choices=list(SOLVERS),
+        help="Solver to run; repeat for several. Defaults to all solvers.",
+    )
+    bench.add_argument("--jobs", type=_positive_int, default=1)
+    bench.add_argument("--timeout", type=_positive_float, help="Per-solve timeout in seconds.")
+    bench.add_argument("--csv", action="store_true", help="Save results and summary CSVs.")
+    bench.add_argument("--results-dir", type=Path, help="Override benchmark_results_dir.")
+    bench.add_argument("--resume", action="store_true", help="Resume a partial CSV run.")
+    bench.add_argument("--variant", default="", help="Label recorded in the run history.")
+    bench.add_argument("--memory", action="store_true", help="Record per-solve memory.")
+    bench.add_argument(
+        "--profile",
+        action="append",
+        choices=list(SOLVERS),
+        help="Profile this solver; repeat for several.",
+    )
+    bench.add_argument("--profile-every", type=_positive_int, default=1)
+    bench.add_argument(
+        "--shard",
+        type=int,
+        help="Benchmark only this shard of a sharded dataset.",
+    )
+
+    compare = commands.add_parser("compare", help="Compare two recorded benchmark runs.")
+    compare.add_argument("baseline", type=int)
+    compare.add_argument("candidate", type=int)
+    compare.add_argument("--alpha", type=float, default=0.05)
+    compare.add_argument("--min-slowdown", type=float, default=0.05)
+    compare.add_argument(
+        "--allow-host-mismatch",
+        action="store_true",
+        help="Compare runs recorded on different hosts or with different contention.",
+    )
+    compare.add_argument("--results-dir", type=Path, help="Override benchmark_results_dir.")
+
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    handlers = {
+        "solve": run_solve,
+        "stream": run_stream,
+        "serve": run_serve,
+        "generate": run_generate,
+        "convert": run_convert,
+        "dedupe": run_dedupe,
+        "verify": run_verify,
+        "bench": run_bench,
+        "compare": run_compare,
+    }
+    try:
+        return handlers[args.command](args)
+    except (OSError, ValueError) as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 2
+
+
+def run_solve(args: argparse.Namespace) -> int:
+    from benchmark import SOLVERS, solve_with_timeout
+    from solvers.cache import SolutionCache
+
+    puzzle = sys.stdin.readline() if args.puzzle == "-" else args.puzzle
+    cache = None if args.no_cache else SolutionCache()
+    try:
+        result = solve_with_timeout(
+            SOLVERS[args.solver],
+            puzzle.strip(),
+            timeout_seconds=args.timeout,
+            cache=cache,
+        )
+    finally:
+        if cache is not None:
+            cache.close()
+    if args.json:
+        print(json.dumps(asdict(result), sort_keys=True))
+    elif result.solved:
+        board_utils.print_board(result.solution)
+        print(f"Time Elapsed: {result.runtime_seconds:.4f}s")
+    else:
+        print(f"Puzzle is not solvable: {result.error or result.status}", file=sys.stderr)
+    return 0 if result.solved else 1
+
+
+def run_stream(args: argparse.Namespace) -> int:
+    from benchmark import solve_many
+    from config import load_config
+
+    # Input is read lazily by solve_many, so only ids of puzzles still in
+    # flight are held here.
+    ids: dict[int, object] = {}
+
+    def puzzles():
+        index = 0
+        for line in iter(sys.stdin.readline, ""):
+            line = line.strip()
+            if not line:
+                continue
+            puzzle = line
+            if line.startswith("{"):
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    record = {}
+                if isinstance(record, dict) and "puzzle" in record:
+                    puzzle = record["puzzle"]
+                    ids[index] = record.get("id")
+            yield puzzle
+            index += 1
+
+    start = time.perf_counter()
+    counts = {"total": 0, "solved": 0, "reported": start}
+
+    def report_if_due():
+        # Also called from solve_many's wait loop, so a long solve still reports.
+        now = time.perf_counter()
+        if now - counts["reported"] >= STREAM_REPORT_SECONDS:
+            _report_throughput(counts["total"], counts["solved"], now - start)
+            counts["reported"] = now
+
+    # A timeout is always set, as for `solve`, so one bad line cannot hang
+    # the filter; it also means solves run in worker processes.
+    timeout = args.timeout
+    if timeout is None:
+        timeout = load_config()["benchmark"]["solver_timeout_seconds"]
+    results = solve_many(
+        puzzles(),
+        solver=args.solver,
+        jobs=args.jobs,
+        timeout=timeout,
+        ordered=args.ordered,
+        with_index=True,
+        heartbeat=report_if_due,
+    )
+    for index, result in results:
+        line = {"index": index, "id": ids.pop(index, None), **asdict(result)}
+        sys.stdout.write(json.dumps(line, sort_keys=True) + "\n")
+        sys.stdout.flush()
+        counts["total"] += 1
+        counts["solved"] += result.solved
+        report_if_due()
+    _report_throughput(counts["total"], counts["solved"], time.perf_counter() - start)
+    return 0 if counts["solved"] == counts["total"] else 1
+
+
+def _report_throughput(total: int, solved: int, elapsed: float) -> None:
+    rate = total / elapsed if elapsed > 0 else 0.0
+    print(
+        f"{total} puzzles ({solved} solved) in {elapsed:.2f}s, {rate:.1f} puzzles/s",
+        file=sys.stderr,
+        flush=True,
+    )
+
+
+def run_serve(args: argparse.Namespace) -> int:
+    from service import serve
+    from solvers.cache import MemoryCache
+
+    serve(
+        args.host,
+        args.port,
+        jobs=args.jobs,
+        batch_size=args.batch_size,
+        batch_wait=args.batch_wait_ms / 1000,
+        default_timeout=args.timeout,
+        queue_limit=args.queue_limit,
+        cache=MemoryCache(capacity=args.cache_size, ttl_seconds=args.cache_ttl),
+    )
+    return 0
+
+
+def run_generate(args: argparse.Namespace) -> int:
+    from generator import generate_dataset
+
+    start = time.perf_counter()
+    path = generate_dataset(
+        args.size,
+        args.difficulty,
+        args.count,
+        seed=args.seed,
+        verify=args.verify,
+        path=args.output,
+        shards=args.shards,
+        compression=args.compression,
+        jobs=args.jobs,
+        unique=args.unique,
+        solution_method=args.grid,
+        effort_band=None if args.effort_band is None else tuple(args.effort_band),
+        effort_metric=args.effort_metric,
+        dedupe=args.dedupe,
+    )
+    print(f"Dataset written to: {path}")
+    print(f"Generation time: {time.perf_counter() - start:.4f}s")
+    return 0
+
+
+def run_convert(args: argparse.Namespace) -> int:
+    from generator import BINARY_SUFFIX, binary_to_jsonl, jsonl_to_binary
+
+    if args.source.suffix == BINARY_SUFFIX:
+        path = binary_to_jsonl(args.source, args.destination)
+    else:
+        path = jsonl_to_binary(args.source, args.destination)
+    print(f"Dataset written to: {path}")
+    return 0
+
+
+def run_dedupe(args: argparse.Namespace) -> int:
+    from generator import dedupe_dataset
+
+    summary = dedupe_dataset(args.source, args.destination, jobs=args.jobs)
+    print(f"Kept {summary.kept} puzzles, dropped {summary.dropped} symmetric duplicates.")
+    print(f"Dataset written to: {summary.path}")
+    return 0
+
+
+def run_verify(args: argparse.Namespace) -> int:
+    from generator import (
+        is_sharded_dataset,
+        print_verification_progress,
+        verify_dataset,
+        verify_manifest,
+    )
+    from solvers.cache import cache_path
+
+    size = args.size or _dataset_size(args.dataset)
+    if is_sharded_dataset(args.dataset):
+        mismatches = verify_manifest(args.dataset)
+        for mismatch in mismatches:
+            print(f"Shard check failed: {mismatch}", file=sys.stderr)
+        if mismatches:
+            return 1
+    summary = verify_dataset(
+        args.dataset,
+        expected_size=size,
+        mode=args.mode,
+        max_failures=args.max_failures,
+        jobs=args.jobs,
+        stop_early=args.stop_early,
+        progress=print_verification_progress if args.progress else None,
+        backend=args.backend,
+        cross_check=args.cross_check,
+        solution_cache=cache_path() if args.cache else None,
+    )
+    print(f"Mode: {summary.mode}")
+    print(f"Puzzles Checked: {summary.total}")
+    print(f"Valid: {summary.valid_count}")
+    print(f"Invalid: {summary.invalid_count}")
+    print(f"Verification time: {summary.runtime_seconds:.4f}s")
+    print(f"Throughput: {summary.puzzles_per_second:.1f} puzzles/s")
+    for backend, seconds in summary.backend_seconds.items():
+        print(f"Backend {backend}: {seconds:.4f}s")
+    if summary.stopped_early:
+        print("Stopped early after reaching --max-failures.")
+    for failure in summary.failures:
+        print(
+            f"{failure.record_number}: "
+            f"id={failure.record_id} error={failure.error or 'verification failed'}"
+        )
+    if args.output is not None:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        written = {**asdict(summary), "puzzles_per_second": summary.puzzles_per_second}
+        args.output.write_text(json.dumps(written, indent=2), encoding="utf-8")
+        print(f"Summary written to: {args.output}")
+    return 0 if summary.invalid_count == 0 else 1
+
+
+def run_bench(args: argparse.Namespace) -> int:
+    from benchmark import benchmark_dataset
+
+    size = args.size or _dataset_size(args.dataset)
+    results_table = benchmark_dataset(
+        args.dataset,
+        size,
+        write_csv=args.csv,
+        solver_names=args.solver,
+        resume=args.resume,
+        variant=args.variant,
+        measure_memory=args.memory,
+        profile_solvers=args.profile,
+        profile_every=args.profile_every,
+        jobs=args.jobs,
+        timeout_seconds=args.timeout,
+        results_dir=args.results_dir,
+        shard=args.shard,
+    )
+    return 1 if results_table is None else 0
+
+
+def run_compare(args: argparse.Namespace) -> int:
+    from benchmark.history import HISTORY_FILENAME, compare_runs, print_comparison
+
+    comparisons = compare_runs(
+        args.baseline,
+        args.candidate,
+        alpha=args.alpha,
+        min_slowdown=args.min_slowdown,
+        path=None if args.results_dir is None else args.results_dir / HISTORY_FILENAME,
+        allow_host_mismatch=args.allow_host_mismatch,
+    )
+    print_comparison(comparisons)
+    return 1 if any(item.regressed for item in comparisons) else 0
+
+
+def _dataset_size(path: Path) -> int:
+    from generator import dataset_size_from_path
+
+    return dataset_size_from_path(path)
+
+
+def _board_size(value: str) -> int:
+    try:
+        size = int(value)
+        board_utils.validate_size(size)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid Sudoku size: {value}") from None
+    return size
+
+
+def _positive_int(value: str) -> int:
+    if not value.isdigit() or int(value) <= 0:
+        raise argparse.ArgumentTypeError(f"expected a positive integer: {value}")
+    return int(value)
+
+
+def _positive_float(value: str) -> float:
+    try:
+        number = float(value)
+    except ValueError:
+        number = 0.0
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"expected a positive number: {value}")
+    return number
+
+
+if __name__ == "__main__":
+    sys.exit(main())
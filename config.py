@@ -1,3 +1,5 @@
+from collections.abc import Iterator
+from contextlib import contextmanager
 from pathlib import Path
 from typing import Any
 import tomllib
@@ -5,12 +7,55 @@ import tomllib
 
 CONFIG_PATH = Path("config.toml")
 
+# Validated configs keyed by path, each stored with the (mtime_ns, size) it was
+# read at. Callers must treat the returned dicts as read-only.
+_CACHE: dict[Path, tuple[tuple[int, int], dict[str, Any]]] = {}
+
 
 def load_config(path: str | Path | None = None) -> dict[str, Any]:
-    config_path = Path(CONFIG_PATH if path is None else path)
-    if not config_path.exists():
-        raise FileNotFoundError(f"Required config file not found: {config_path}")
+    config_path = Path(CONFIG_PATH if path is None else path).absolute()
+    try:
+        stat = config_path.stat()
+    except FileNotFoundError:
+        raise FileNotFoundError(
+            f"Required config file not found: {config_path}"
+        ) from None
+
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    cached = _CACHE.get(config_path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
+    config = _read_config(config_path)
+    _CACHE[config_path] = (stamp, config)
+    return config
+
+
+def reload_config(path: str | Path | None = None) -> dict[str, Any]:
+    _CACHE.pop(Path(CONFIG_PATH if path is None else path).absolute(), None)
+    return load_config(path)
+
+
+def clear_config_cache() -> None:
+    _CACHE.clear()
+
+
+@contextmanager
+def override_config(path: str | Path) -> Iterator[Path]:
+    """Point the default config at `path` for the duration of the block."""
+    global CONFIG_PATH
+
+    previous = CONFIG_PATH
+    CONFIG_PATH = Path(path)
+    clear_config_cache()
+    try:
+        yield CONFIG_PATH
+    finally:
+        CONFIG_PATH = previous
+        clear_config_cache()
+
 
+def _read_config(config_path: Path) -> dict[str, Any]:
     with open(config_path, "rb") as config_file:
         config = tomllib.load(config_file)
 
@@ -0,0 +1,19 @@
+from pathlib import Path
+
+
+# Shared by the generator, which writes datasets, and the benchmark, which
+# names its results after them.
+JSONL_SUFFIX = ".jsonl"
+BINARY_SUFFIX = ".sdkb"
+COMPRESSION_SUFFIXES = (".gz", ".bz2", ".xz")
+
+
+def dataset_stem(path: str | Path) -> str:
+    """Dataset name without its format and compression extensions."""
+    path = Path(path)
+    name = path.name
+    if path.suffix in COMPRESSION_SUFFIXES:
+        name = name.removesuffix(path.suffix)
+    for suffix in (JSONL_SUFFIX, BINARY_SUFFIX):
+        name = name.removesuffix(suffix)
+    return name
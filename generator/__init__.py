@@ -1,9 +1,27 @@
+from dataset_paths import dataset_stem
+from .binary import (
+    BINARY_SUFFIX,
+    BinaryDataset,
+    binary_to_jsonl,
+    jsonl_to_binary,
+    write_binary_dataset,
+)
+from .dedup import DedupeSummary, dedupe_dataset, dedupe_records
+from .effort import (
+    EFFORT_METRICS,
+    EffortMetric,
+    generate_effort_records,
+    puzzle_effort,
+)
 from .generation import (
     DATASETS_DIR,
+    COMPRESSION_OPENERS,
     DIFFICULTIES,
     DIFFICULTY_PERCENT_RANGES,
     REQUIRED_RECORD_FIELDS,
+    DatasetValidation,
     GeneratedPuzzle,
+    SolutionMethod,
     clue_count,
     dataset_path,
     dataset_size_from_path,
@@ -13,20 +31,40 @@ from .generation import (
     generate_dataset_records,
     generate_pattern_solution,
     generate_puzzle,
+    generate_random_solution,
+    generate_record,
+    iter_dataset,
     list_datasets,
+    open_dataset_file,
     prompt_difficulty,
     random_clue_percent,
     read_dataset,
+    record_seed,
     select_dataset,
     write_dataset_records,
 )
+from .shards import (
+    MANIFEST_NAME,
+    is_sharded_dataset,
+    read_manifest,
+    shard_offset,
+    shard_paths,
+    sharded_dataset_path,
+    verify_manifest,
+    write_manifest,
+    write_shard,
+    write_sharded_dataset,
+)
 from .verification import (
     DatasetVerificationFailure,
     DatasetVerificationSummary,
+    VERIFICATION_BACKENDS,
     ValidityMode,
+    VerificationBackend,
     VerificationMode,
     VerificationResult,
     build_z3_sudoku_solver,
+    print_verification_progress,
     verify_dataset,
     verify_dataset_menu,
     verify_dataset_records,
@@ -34,34 +72,68 @@ from .verification import (
 )
 
 __all__ = [
+    "BINARY_SUFFIX",
+    "BinaryDataset",
+    "COMPRESSION_OPENERS",
     "DATASETS_DIR",
     "DIFFICULTIES",
     "DIFFICULTY_PERCENT_RANGES",
     "REQUIRED_RECORD_FIELDS",
+    "DatasetValidation",
     "DatasetVerificationFailure",
     "DatasetVerificationSummary",
+    "DedupeSummary",
+    "EFFORT_METRICS",
+    "EffortMetric",
     "GeneratedPuzzle",
+    "MANIFEST_NAME",
+    "SolutionMethod",
+    "VERIFICATION_BACKENDS",
     "ValidityMode",
+    "VerificationBackend",
     "VerificationMode",
     "VerificationResult",
+    "binary_to_jsonl",
     "build_z3_sudoku_solver",
     "clue_count",
     "dataset_path",
     "dataset_size_from_path",
+    "dataset_stem",
+    "dedupe_dataset",
+    "dedupe_records",
     "expand_difficulties",
     "generate_dataset",
     "generate_dataset_menu",
     "generate_dataset_records",
+    "generate_effort_records",
     "generate_pattern_solution",
     "generate_puzzle",
+    "generate_random_solution",
+    "generate_record",
+    "is_sharded_dataset",
+    "iter_dataset",
+    "jsonl_to_binary",
     "list_datasets",
+    "open_dataset_file",
+    "print_verification_progress",
     "prompt_difficulty",
+    "puzzle_effort",
     "random_clue_percent",
     "read_dataset",
+    "read_manifest",
+    "record_seed",
     "select_dataset",
+    "shard_offset",
+    "shard_paths",
+    "sharded_dataset_path",
     "verify_dataset",
     "verify_dataset_records",
     "verify_dataset_menu",
+    "verify_manifest",
     "verify_puzzle",
+    "write_binary_dataset",
     "write_dataset_records",
+    "write_manifest",
+    "write_shard",
+    "write_sharded_dataset",
 ]
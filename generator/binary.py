@@ -0,0 +1,272 @@
+from array import array
+from collections.abc import Iterable, Iterator
+import itertools
+import json
+import mmap
+from pathlib import Path
+import shutil
+import struct
+import sys
+import tempfile
+from typing import Any
+
+from board_utils import format_board, parse_board, validate_size
+from dataset_paths import BINARY_SUFFIX, dataset_stem
+
+
+MAGIC = b"SDKB"
+VERSION = 1
+# magic, version, size, bits per cell, reserved, record count,
+# metadata offset, metadata index offset
+HEADER = struct.Struct("<4sHHHHQQQ")
+BOARD_FIELDS = ("puzzle", "solution")
+
+_NIBBLES = [(byte >> 4, byte & 0x0F) for byte in range(256)]
+
+
+def cell_bits(size: int) -> int:
+    validate_size(size)
+    if size <= 15:
+        return 4
+    if size <= 255:
+        return 8
+    raise ValueError(f"Binary datasets support sizes up to 255, got {size}")
+
+
+def board_bytes(size: int) -> int:
+    return (size * size * cell_bits(size) + 7) // 8
+
+
+def pack_board(values: list[int], size: int) -> bytes:
+    if cell_bits(size) == 8:
+        return bytes(values)
+    if len(values) % 2:
+        values = [*values, 0]
+    return bytes((values[i] << 4) | values[i + 1] for i in range(0, len(values), 2))
+
+
+def unpack_board(data: bytes, size: int) -> list[int]:
+    if cell_bits(size) == 8:
+        return list(data)
+    nibbles = _NIBBLES
+    values = [value for byte in data for value in nibbles[byte]]
+    del values[size * size :]
+    return values
+
+
+def write_binary_dataset(
+    records: Iterable[dict[str, Any]],
+    path: str | Path,
+    size: int,
+) -> Path:
+    """Write records as fixed-width packed boards followed by a metadata table.
+
+    Record i's boards live at a fixed offset, and its remaining fields are
+    JSON in a metadata blob addressed through an offset index, so readers can
+    fetch any record in O(1).
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    bits = cell_bits(size)
+    cells = size * size
+    count = 0
+    offsets = array("Q", [0])
+
+    with open(path, "wb") as f, tempfile.TemporaryFile() as metadata:
+        f.write(bytes(HEADER.size))
+        for record in records:
+            count += 1
+            if int(record["size"]) != size:
+                raise ValueError(
+                    f"Record {count} has size {record['size']}, expected {size}"
+                )
+            for field in BOARD_FIELDS:
+                values = parse_board(record[field])
+                if len(values) != cells:
+                    raise ValueError(
+                        f"Record {count} {field} length does not match size {size}"
+                    )
+                f.write(pack_board(values, size))
+
+            metadata_fields = {
+                key: value for key, value in record.items() if key not in BOARD_FIELDS
+            }
+            encoded = json.dumps(
+                metadata_fields,
+                sort_keys=True,
+                separators=(",", ":"),
+            ).encode("utf-8")
+            metadata.write(encoded)
+            offsets.append(offsets[-1] + len(encoded))
+
+        metadata_offset = f.tell()
+        metadata.seek(0)
+        shutil.copyfileobj(metadata, f)
+        index_offset = f.tell()
+        if sys.byteorder != "little":
+            offsets.byteswap()
+        offsets.tofile(f)
+
+        f.seek(0)
+        header = HEADER.pack(
+            MAGIC,
+            VERSION,
+            size,
+            bits,
+            0,
+            count,
+            metadata_offset,
+            index_offset,
+        )
+        f.write(header)
+
+    return path
+
+
+class BinaryDataset:
+    """Memory-mapped, random-access view of a binary dataset file."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._file = open(self.path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"Not a binary dataset: {self.path}") from None
+
+        if len(self._map) < HEADER.size:
+            self.close()
+            raise ValueError(f"Not a binary dataset: {self.path}")
+        (
+            magic,
+            version,
+            self.size,
+            bits,
+            _reserved,
+            self.count,
+            self._metadata_offset,
+            index_offset,
+        ) = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION or bits != _header_bits(self.size):
+            self.close()
+            raise ValueError(f"Not a binary dataset: {self.path}")
+
+        self._board_bytes = board_bytes(self.size)
+        self._record_bytes = 2 * self._board_bytes
+        self._index = memoryview(self._map)[
+            index_offset : index_offset + 8 * (self.count + 1)
+        ].cast("Q")
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, index: int) -> dict[str, Any]:
+        return self.record(index)
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        for index in range(self.count):
+            yield self.record(index)
+
+    def __enter__(self) -> "BinaryDataset":
+        return self
+
+    def __exit__(self, *_exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if getattr(self, "_index", None) is not None:
+            self._index.release()
+            self._index = None
+        if not self._map.closed:
+            self._map.close()
+        self._file.close()
+
+    def puzzle_values(self, index: int) -> list[int]:
+        return self._board(index, 0)
+
+    def solution_values(self, index: int) -> list[int]:
+        return self._board(index, 1)
+
+    def metadata(self, index: int) -> dict[str, Any]:
+        index = self._check_index(index)
+        start = self._metadata_offset + self._offset(index)
+        end = self._metadata_offset + self._offset(index + 1)
+        return json.loads(self._map[start:end])
+
+    def record(self, index: int, parse_boards: bool = False) -> dict[str, Any]:
+        record = self.metadata(index)
+        puzzle = self.puzzle_values(index)
+        solution = self.solution_values(index)
+        record["puzzle"] = puzzle if parse_boards else format_board(puzzle)
+        record["solution"] = solution if parse_boards else format_board(solution)
+        return record
+
+    def _board(self, index: int, board: int) -> list[int]:
+        index = self._check_index(index)
+        start = HEADER.size + index * self._record_bytes + board * self._board_bytes
+        return unpack_board(self._map[start : start + self._board_bytes], self.size)
+
+    def _offset(self, index: int) -> int:
+        offset = self._index[index]
+        if sys.byteorder != "little":
+            offset = int.from_bytes(offset.to_bytes(8, sys.byteorder), "little")
+        return offset
+
+    def _check_index(self, index: int) -> int:
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("Binary dataset index out of range")
+        return index
+
+
+def _header_bits(size: int) -> int | None:
+    try:
+        return cell_bits(size)
+    except ValueError:
+        return None
+
+
+def iter_binary_dataset(
+    path: str | Path,
+    expected_size: int | None = None,
+    parse_boards: bool = False,
+) -> Iterator[dict[str, Any]]:
+    with BinaryDataset(path) as dataset:
+        if expected_size is not None and dataset.size != expected_size:
+            raise ValueError(
+                f"Binary dataset has size {dataset.size}, expected {expected_size}"
+            )
+        for index in range(len(dataset)):
+            yield dataset.record(index, parse_boards=parse_boards)
+
+
+def jsonl_to_binary(source: str | Path, destination: str | Path | None = None) -> Path:
+    from .generation import iter_dataset
+
+    source = Path(source)
+    destination = Path(
+        destination or source.with_name(dataset_stem(source) + BINARY_SUFFIX)
+    )
+    records = iter_dataset(source, validate="none")
+    first = next(records, None)
+    if first is None:
+        raise ValueError(f"Dataset has no puzzles: {source}")
+
+    return write_binary_dataset(
+        itertools.chain([first], records),
+        destination,
+        int(first["size"]),
+    )
+
+
+def binary_to_jsonl(source: str | Path, destination: str | Path | None = None) -> Path:
+    source = Path(source)
+    destination = Path(destination or source.with_suffix(".jsonl"))
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    with BinaryDataset(source) as dataset, open(destination, "w", encoding="utf-8") as f:
+        for record in dataset:
+            f.write(json.dumps(record, sort_keys=True))
+            f.write("\n")
+    return destination
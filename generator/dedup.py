@@ -0,0 +1,109 @@
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+import itertools
+from pathlib import Path
+from typing import Any
+
+from board_utils import canonical_hash
+from dataset_paths import dataset_stem
+from parallel import bounded_map
+from .generation import (
+    iter_dataset,
+    write_dataset_records,
+)
+
+
+DEDUPE_CHUNK_SIZE = 256
+
+
+@dataclass
+class DedupeSummary:
+    path: Path
+    kept: int
+    dropped: int
+
+
+def dedupe_records(
+    records: Iterable[dict[str, Any]],
+    seen: set[str] | None = None,
+    jobs: int = 1,
+) -> Iterator[dict[str, Any]]:
+    """Yield records whose puzzle is not equal under symmetry to an earlier one.
+
+    The first record of each symmetry class is kept. Pass `seen` to carry
+    the canonical hashes across several calls. With jobs > 1, hashes are
+    computed in worker processes, a bounded number of chunks at a time.
+    """
+    if seen is None:
+        seen = set()
+    if jobs < 1:
+        raise ValueError("Jobs must be at least 1")
+
+    for chunk, hashes in _hashed_chunks(records, jobs):
+        for record, puzzle_hash in zip(chunk, hashes):
+            if puzzle_hash not in seen:
+                seen.add(puzzle_hash)
+                yield record
+
+
+def dedupe_dataset(
+    source: str | Path,
+    destination: str | Path | None = None,
+    jobs: int = 1,
+) -> DedupeSummary:
+    """Write `source` without symmetric duplicates, renumbering ids from 1.
+
+    The default destination is `<stem>_dedup` next to the source, with the
+    source's suffixes, or `.jsonl` for a sharded dataset directory.
+    """
+    source = Path(source)
+    if destination is None:
+        stem = dataset_stem(source)
+        suffixes = ".jsonl" if source.is_dir() else source.name[len(stem) :]
+        destination = source.with_name(stem + "_dedup" + suffixes)
+
+    records = iter_dataset(source)
+    first = next(records, None)
+    if first is None:
+        raise ValueError(f"Dataset has no records: {source}")
+    counts = {"read": 0, "kept": 0}
+
+    def counted(records):
+        for record in records:
+            counts["read"] += 1
+            yield record
+
+    def renumbered(records):
+        for record in records:
+            counts["kept"] += 1
+            record["id"] = counts["kept"]
+            yield record
+
+    # Records stream from the source through the writer; "mixed" only
+    # satisfies the writer's difficulty check, the records keep their own.
+    kept = renumbered(dedupe_records(counted(itertools.chain([first], records)), jobs=jobs))
+    path = write_dataset_records(kept, int(first["size"]), "mixed", path=destination)
+    return DedupeSummary(
+        path=path,
+        kept=counts["kept"],
+        dropped=counts["read"] - counts["kept"],
+    )
+
+
+def _hashed_chunks(
+    records: Iterable[dict[str, Any]],
+    jobs: int,
+) -> Iterator[tuple[list[dict[str, Any]], list[str]]]:
+    records = iter(records)
+    chunks = iter(lambda: list(itertools.islice(records, DEDUPE_CHUNK_SIZE)), [])
+    if jobs == 1:
+        yield from bounded_map(None, _hash_records, chunks, 1)
+        return
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        yield from bounded_map(executor, _hash_records, chunks, 2 * jobs)
+
+
+def _hash_records(records: list[dict[str, Any]]) -> list[str]:
+    return [canonical_hash(record["puzzle"]) for record in records]
@@ -0,0 +1,176 @@
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+import itertools
+import random
+from typing import Any, Literal, get_args
+
+from board_utils import canonical_hash, parse_board, validate_size
+from parallel import bounded_map
+from solvers.bitmask import search
+from solvers.csp import solve_csp
+from solvers.dlx import solve_dlx
+from .generation import (
+    SolutionMethod,
+    _difficulties,
+    _difficulty_percent_ranges,
+    generate_record,
+)
+
+
+EffortMetric = Literal["csp_backtracks", "dlx_nodes", "bitmask_backtracks"]
+EFFORT_METRICS: tuple[EffortMetric, ...] = get_args(EffortMetric)
+EFFORT_BATCH_SIZE = 64
+
+
+def puzzle_effort(puzzle: str | list[int], metric: EffortMetric = "csp_backtracks") -> int:
+    """Search effort one solver spends on `puzzle`.
+
+    csp_backtracks counts CSPSolver backtracks after its propagation pass,
+    dlx_nodes counts DLX search calls and bitmask_backtracks counts
+    backtracks of the bitmask search.
+    """
+    if metric == "csp_backtracks":
+        result = solve_csp(puzzle)
+        effort = result.backtracks
+    elif metric == "dlx_nodes":
+        result = solve_dlx(puzzle)
+        effort = result.recursive_calls
+    elif metric == "bitmask_backtracks":
+        searched = search(parse_board(puzzle))
+        if searched.solution is None:
+            raise ValueError("Puzzle has no solution")
+        return searched.backtracks
+    else:
+        raise ValueError(f"Unsupported effort metric: {metric}")
+
+    if not result.solved:
+        raise ValueError(f"Puzzle could not be scored: {result.error or result.status}")
+    return effort
+
+
+def score_candidates(
+    size: int,
+    labels: list[tuple[int, str]],
+    base_seed: int,
+    metric: EffortMetric,
+    options: dict[str, Any],
+) -> list[dict[str, Any]]:
+    """Generate the candidates for (index, difficulty) pairs and attach their effort."""
+    records = []
+    for index, difficulty in labels:
+        record = generate_record(size, difficulty, index, base_seed, **options)
+        record["effort_metric"] = metric
+        record["effort"] = puzzle_effort(record["puzzle"], metric)
+        records.append(record)
+    return records
+
+
+def generate_effort_records(
+    size: int,
+    difficulty: str,
+    count: int,
+    effort_band: tuple[float, float],
+    metric: EffortMetric = "csp_backtracks",
+    seed: int | None = None,
+    verify: bool = False,
+    unique: bool = False,
+    solution_method: SolutionMethod = "pattern",
+    batch_size: int = EFFORT_BATCH_SIZE,
+    max_candidates: int | None = None,
+    jobs: int = 1,
+    dedupe: bool = False,
+) -> list[dict[str, Any]]:
+    """Keep generating candidates until `count` of them score inside `effort_band`.
+
+    Candidates are generated and scored in batches, across `jobs` worker
+    processes when jobs > 1. Batches are consumed in candidate order and each
+    candidate seeds from its own index, so the kept records do not depend on
+    the worker count. Kept records are renumbered from 1 and carry their
+    `effort` and `effort_metric`; `seed` still reproduces each one. With
+    `dedupe`, candidates symmetric to an already kept puzzle are skipped.
+    """
+    validate_size(size)
+    if difficulty not in _difficulties():
+        raise ValueError(f"Unsupported difficulty: {difficulty}")
+    if metric not in EFFORT_METRICS:
+        raise ValueError(f"Unsupported effort metric: {metric}")
+    low, high = effort_band
+    if low > high:
+        raise ValueError("Effort band must be given as (low, high)")
+    if count <= 0:
+        raise ValueError("Count must be positive")
+    if batch_size < 1 or jobs < 1:
+        raise ValueError("Batch size and jobs must be at least 1")
+    if max_candidates is None:
+        max_candidates = 1000 * count
+
+    base_seed = random.randrange(2**63) if seed is None else seed
+    options = {"verify": verify, "unique": unique, "solution_method": solution_method}
+    batches = _candidate_batches(difficulty, batch_size, max_candidates)
+    records: list[dict[str, Any]] = []
+    seen: set[str] | None = set() if dedupe else None
+
+    if jobs == 1:
+        scored = (
+            score_candidates(size, batch, base_seed, metric, options)
+            for batch in batches
+        )
+        records = _keep_in_band(scored, low, high, count, seen)
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            arguments = ((size, batch, base_seed, metric, options) for batch in batches)
+            scored = (
+                batch_records
+                for _args, batch_records in bounded_map(
+                    executor, _score_candidates_args, arguments, 2 * jobs
+                )
+            )
+            records = _keep_in_band(scored, low, high, count, seen)
+
+    if len(records) < count:
+        raise RuntimeError(
+            f"Only {len(records)} of {count} puzzles fell in effort band "
+            f"{low}..{high} after {max_candidates} candidates"
+        )
+    return records
+
+
+def _candidate_batches(
+    difficulty: str,
+    batch_size: int,
+    max_candidates: int,
+) -> Iterator[list[tuple[int, str]]]:
+    names = list(_difficulty_percent_ranges()) if difficulty == "mixed" else [difficulty]
+    labels = (
+        (index, names[(index - 1) % len(names)])
+        for index in range(1, max_candidates + 1)
+    )
+    while batch := list(itertools.islice(labels, batch_size)):
+        yield batch
+
+
+def _keep_in_band(
+    scored: Iterator[list[dict[str, Any]]],
+    low: float,
+    high: float,
+    count: int,
+    seen: set[str] | None = None,
+) -> list[dict[str, Any]]:
+    kept = []
+    for batch in scored:
+        for record in batch:
+            if low <= record["effort"] <= high:
+                if seen is not None:
+                    puzzle_hash = canonical_hash(record["puzzle"])
+                    if puzzle_hash in seen:
+                        continue
+                    seen.add(puzzle_hash)
+                record["id"] = len(kept) + 1
+                kept.append(record)
+                if len(kept) == count:
+                    return kept
+    return kept
+
+
+def _score_candidates_args(args: tuple) -> list[dict[str, Any]]:
+    return score_candidates(*args)
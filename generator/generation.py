@@ -1,20 +1,42 @@
+import bz2
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
 from dataclasses import dataclass
+import gzip
+import hashlib
+import io
 import json
+import lzma
 from pathlib import Path
 import random
 import re
 import time
-from typing import Any
+from typing import TYPE_CHECKING, Any, Literal
 
 from board_utils import format_board, parse_board, validate_size
 from cli_helpers import prompt_choice, prompt_positive_int, prompt_size
 from config import load_config
+from solvers.bitmask import dig_unique_puzzle, random_solution
+from .binary import BINARY_SUFFIX, iter_binary_dataset, write_binary_dataset
+from .shards import is_sharded_dataset, iter_sharded_dataset, write_sharded_dataset
 from .verification import VerificationResult, verify_puzzle
 
+if TYPE_CHECKING:
+    from .effort import EffortMetric
+
 
 DATASETS_DIR = load_config()["paths"]["datasets_dir"]
 DIFFICULTY_PERCENT_RANGES = load_config()["generation"]["clue_percent_ranges"]
 DIFFICULTIES = tuple(DIFFICULTY_PERCENT_RANGES) + ("mixed",)
+GENERATION_CHUNK_SIZE = 256
+DatasetValidation = Literal["none", "length", "full"]
+SolutionMethod = Literal["pattern", "random"]
+COMPRESSION_OPENERS = {
+    ".gz": gzip.open,
+    ".bz2": bz2.open,
+    ".xz": lzma.open,
+}
 REQUIRED_RECORD_FIELDS = {
     "id",
     "size",
@@ -79,37 +101,74 @@ def generate_pattern_solution(size: int = 9, seed: int | None = None) -> str:
     return format_board(values)
 
 
+def generate_random_solution(size: int = 9, seed: int | None = None) -> str:
+    """Solved grid filled by a randomized search instead of the pattern shuffle."""
+    return format_board(random_solution(size, random.Random(seed)))
+
+
 def generate_puzzle(
     size: int = 9,
     clues: int | None = None,
     seed: int | None = None,
     verify: bool = False,
+    unique: bool = False,
+    solution_method: SolutionMethod = "pattern",
 ) -> GeneratedPuzzle:
+    """Dig `clues` givens out of a seeded solved grid.
+
+    With `unique`, clues are only removed while the puzzle keeps a unique
+    solution, which is its own verification; `verify` checks that a
+    randomly dug puzzle is solvable, so the two cannot be combined.
+    """
     n, box = validate_size(size)
+    if unique and verify:
+        raise ValueError("verify and unique cannot be combined; unique digging checks itself")
 
     if clues is None:
         clues = max(n, round(n * n * 0.4))
     if not (0 <= clues <= n * n):
         raise ValueError(f"Clues must be in range 0..{n * n}")
 
-    solution = generate_pattern_solution(n, seed=seed)
+    if solution_method == "pattern":
+        solution = generate_pattern_solution(n, seed=seed)
+    elif solution_method == "random":
+        solution = generate_random_solution(n, seed=seed)
+    else:
+        raise ValueError(f"Unsupported solution method: {solution_method}")
     puzzle_values = parse_board(solution)
-    indexes = list(range(n * n))
-    random.Random(seed).shuffle(indexes)
 
-    for index in indexes[: n * n - clues]:
-        puzzle_values[index] = 0
-
-    if verify:
-        verification = verify_puzzle(puzzle_values, mode="solvable")
-    else:
+    if unique:
+        dig_start = time.perf_counter()
+        dig_rng = random.Random(_sub_seed(seed, "dig"))
+        puzzle_values = dig_unique_puzzle(puzzle_values, clues, dig_rng)
         verification = VerificationResult(
             valid=True,
-            mode="derived",
+            mode="unique",
             solution=solution,
-            solution_count=None,
-            runtime_seconds=0.0,
+            solution_count=1,
+            runtime_seconds=time.perf_counter() - dig_start,
         )
+    else:
+        indexes = list(range(n * n))
+        random.Random(_sub_seed(seed, "dig")).shuffle(indexes)
+
+        for index in indexes[: n * n - clues]:
+            puzzle_values[index] = 0
+
+        if verify:
+            verification = verify_puzzle(
+                puzzle_values,
+                mode="solvable",
+                solution=solution,
+            )
+        else:
+            verification = VerificationResult(
+                valid=True,
+                mode="derived",
+                solution=solution,
+                solution_count=None,
+                runtime_seconds=0.0,
+            )
 
     return GeneratedPuzzle(
         puzzle=format_board(puzzle_values),
@@ -156,13 +215,56 @@ def dataset_path(
     size: int,
     difficulty: str,
     count: int,
+    compression: str | None = None,
 ) -> Path:
     validate_size(size)
     if difficulty not in _difficulties():
         raise ValueError(f"Unsupported difficulty: {difficulty}")
     if count < 0:
         raise ValueError("Count cannot be negative")
-    return Path(load_config()["paths"]["datasets_dir"]) / f"{size}x{size}_{difficulty}_{count}.jsonl"
+    suffix = ".jsonl"
+    if compression is not None:
+        suffix += _compression_suffix(compression)
+    directory = Path(load_config()["paths"]["datasets_dir"])
+    return directory / f"{size}x{size}_{difficulty}_{count}{suffix}"
+
+
+def open_dataset_file(path: str | Path, mode: str = "r"):
+    """Open a JSONL dataset in text mode, streaming through gzip/bz2/xz by extension."""
+    opener = COMPRESSION_OPENERS.get(Path(path).suffix)
+    if opener is None:
+        return open(path, mode, encoding="utf-8")
+    return opener(path, mode + "t", encoding="utf-8")
+
+
+class _HashingWriter(io.RawIOBase):
+    """Binary sink that feeds every byte to `digest` before writing it on."""
+
+    def __init__(self, raw, digest) -> None:
+        super().__init__()
+        self._raw = raw
+        self._digest = digest
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._digest.update(data)
+        return self._raw.write(data)
+
+
+def _open_text_writer(path: Path, fileobj):
+    opener = COMPRESSION_OPENERS.get(path.suffix)
+    if opener is None:
+        return io.TextIOWrapper(fileobj, encoding="utf-8")
+    return opener(fileobj, "wt", encoding="utf-8")
+
+
+def _compression_suffix(compression: str) -> str:
+    suffix = compression if compression.startswith(".") else f".{compression}"
+    if suffix not in COMPRESSION_OPENERS:
+        raise ValueError(f"Unsupported dataset compression: {compression}")
+    return suffix
 
 
 def list_datasets(size: int | None = None) -> list[Path]:
@@ -171,8 +273,21 @@ def list_datasets(size: int | None = None) -> list[Path]:
     directory = Path(load_config()["paths"]["datasets_dir"])
     if not directory.exists():
         return []
-    pattern = f"{size}x{size}_*.jsonl" if size is not None else "*.jsonl"
-    return sorted(directory.glob(pattern))
+    prefix = f"{size}x{size}_" if size is not None else ""
+    suffixes = [
+        ".jsonl",
+        BINARY_SUFFIX,
+        *(f".jsonl{suffix}" for suffix in COMPRESSION_OPENERS),
+    ]
+    files = [
+        path
+        for suffix in suffixes
+        for path in directory.glob(f"{prefix}*{suffix}")
+    ]
+    sharded = [
+        path for path in directory.glob(f"{prefix}*") if is_sharded_dataset(path)
+    ]
+    return sorted(files + sharded)
 
 
 def dataset_size_from_path(path: str | Path) -> int:
@@ -183,18 +298,41 @@ def dataset_size_from_path(path: str | Path) -> int:
 
 
 def write_dataset_records(
-    records: list[dict[str, Any]],
+    records: Iterable[dict[str, Any]],
     size: int,
     difficulty: str,
+    path: str | Path | None = None,
+    compression: str | None = None,
+    digest: Any | None = None,
 ) -> Path:
+    """Write records as JSONL (optionally compressed) or binary, by suffix.
+
+    Records are written as they are read, so any iterable works when `path`
+    is given; the default path needs a list to count them. A hashlib
+    `digest` is updated with the bytes of the file as written.
+    """
     validate_size(size)
-    directory = Path(load_config()["paths"]["datasets_dir"])
-    directory.mkdir(parents=True, exist_ok=True)
     if difficulty not in _difficulties():
         raise ValueError(f"Unsupported difficulty: {difficulty}")
-    path = dataset_path(size, difficulty, len(records))
-
-    with open(path, "w", encoding="utf-8") as f:
+    if path is None:
+        path = dataset_path(size, difficulty, len(records), compression=compression)
+    path = Path(path)
+    if path.suffix == BINARY_SUFFIX:
+        write_binary_dataset(records, path, size)
+        if digest is not None:
+            # The header is filled in last, so hash the finished file.
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(chunk)
+        return path
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    with ExitStack() as stack:
+        if digest is None:
+            f = stack.enter_context(open_dataset_file(path, "w"))
+        else:
+            raw = stack.enter_context(open(path, "wb"))
+            f = stack.enter_context(_open_text_writer(path, _HashingWriter(raw, digest)))
         for record in records:
             f.write(json.dumps(record, sort_keys=True))
             f.write("\n")
@@ -202,36 +340,167 @@ def write_dataset_records(
     return path
 
 
-def read_dataset(path: str | Path, expected_size: int | None = None) -> list[dict[str, Any]]:
-    records: list[dict[str, Any]] = []
-    with open(path, encoding="utf-8") as f:
+def iter_dataset(
+    path: str | Path,
+    expected_size: int | None = None,
+    validate: DatasetValidation = "full",
+    parse_boards: bool = False,
+) -> Iterator[dict[str, Any]]:
+    """Yield dataset records one at a time.
+
+    `validate="full"` parses both boards, `"length"` only counts cells and
+    `"none"` skips all checks. With `parse_boards=True` the `puzzle` and
+    `solution` fields are handed back as lists of ints. Binary (`.sdkb`)
+    datasets are fixed-width and checked when written, so for them only the
+    size is validated. A sharded dataset directory yields its shards in
+    manifest order.
+    """
+    if validate not in ("none", "length", "full"):
+        raise ValueError(f"Unsupported dataset validation: {validate}")
+
+    if Path(path).is_dir():
+        yield from iter_sharded_dataset(
+            path,
+            expected_size=expected_size,
+            validate=validate,
+            parse_boards=parse_boards,
+        )
+        return
+
+    if Path(path).suffix == BINARY_SUFFIX:
+        yield from iter_binary_dataset(
+            path,
+            expected_size=None if validate == "none" else expected_size,
+            parse_boards=parse_boards,
+        )
+        return
+
+    with open_dataset_file(path) as f:
         for line_number, line in enumerate(f, start=1):
             line = line.strip()
             if not line:
                 continue
             record = json.loads(line)
-            missing = REQUIRED_RECORD_FIELDS - set(record)
-            if missing:
-                raise ValueError(
-                    f"Record {line_number} is missing fields: {', '.join(sorted(missing))}"
-                )
-            size = int(record["size"])
-            if expected_size is not None and size != expected_size:
-                raise ValueError(
-                    f"Record {line_number} has size {size}, expected {expected_size}"
+            if validate != "none":
+                _validate_record(
+                    record,
+                    line_number,
+                    expected_size,
+                    validate,
+                    parse_boards,
                 )
-            values = parse_board(record["puzzle"])
-            if len(values) != size * size:
-                raise ValueError(
-                    f"Record {line_number} puzzle length does not match size {size}"
-                )
-            solution_values = parse_board(record["solution"])
-            if len(solution_values) != size * size:
-                raise ValueError(
-                    f"Record {line_number} solution length does not match size {size}"
-                )
-            records.append(record)
-    return records
+            elif parse_boards:
+                record["puzzle"] = parse_board(record["puzzle"])
+                record["solution"] = parse_board(record["solution"])
+            yield record
+
+
+def read_dataset(path: str | Path, expected_size: int | None = None) -> list[dict[str, Any]]:
+    return list(iter_dataset(path, expected_size=expected_size))
+
+
+def _validate_record(
+    record: dict[str, Any],
+    line_number: int,
+    expected_size: int | None,
+    validate: DatasetValidation,
+    parse_boards: bool,
+) -> None:
+    missing = REQUIRED_RECORD_FIELDS - set(record)
+    if missing:
+        raise ValueError(
+            f"Record {line_number} is missing fields: {', '.join(sorted(missing))}"
+        )
+    size = int(record["size"])
+    if expected_size is not None and size != expected_size:
+        raise ValueError(
+            f"Record {line_number} has size {size}, expected {expected_size}"
+        )
+
+    for field in ("puzzle", "solution"):
+        if validate == "full" or parse_boards:
+            values = parse_board(record[field])
+            length = len(values)
+            if parse_boards:
+                record[field] = values
+        else:
+            length = _board_length(record[field])
+        if length != size * size:
+            raise ValueError(
+                f"Record {line_number} {field} length does not match size {size}"
+            )
+
+
+def _board_length(board: str | list[int]) -> int:
+    if not isinstance(board, str):
+        return len(board)
+    tokens = board.split()
+    # A single token is the legacy one-character-per-cell 9x9 layout.
+    return len(tokens) if len(tokens) != 1 else len(tokens[0])
+
+
+def record_seed(base_seed: int, index: int) -> int:
+    """Seed for record `index`, derived from the base seed and the index alone.
+
+    Records never share a random stream, so they can be generated in any
+    order or process and still come out identical.
+    """
+    digest = hashlib.blake2b(f"{base_seed}:{index}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big") >> 1
+
+
+def _sub_seed(seed: int | None, purpose: str) -> int | None:
+    """Seed for the "clues" or "dig" draws of a puzzle seeded with `seed`.
+
+    The clue count, the grid and the dig order each get their own random
+    stream instead of sharing one; the grid uses `seed` itself.
+    """
+    if seed is None:
+        return None
+    digest = hashlib.blake2b(f"{seed}:{purpose}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big") >> 1
+
+
+def generate_record(
+    size: int,
+    difficulty: str,
+    index: int,
+    base_seed: int,
+    verify: bool = False,
+    unique: bool = False,
+    solution_method: SolutionMethod = "pattern",
+) -> dict[str, Any]:
+    puzzle_seed = record_seed(base_seed, index)
+    rng = random.Random(_sub_seed(puzzle_seed, "clues"))
+    target_clues, clue_percent = clue_count(size, difficulty, rng)
+
+    generated = generate_puzzle(
+        size=size,
+        clues=target_clues,
+        seed=puzzle_seed,
+        verify=verify,
+        unique=unique,
+        solution_method=solution_method,
+    )
+    if not generated.verification.valid:
+        raise RuntimeError(
+            f"Generated puzzle {index} failed verification: "
+            f"{generated.verification.error}"
+        )
+
+    return {
+        "id": index,
+        "size": size,
+        "difficulty": difficulty,
+        "clue_percent": clue_percent,
+        "target_clues": target_clues,
+        "actual_clues": generated.actual_clues,
+        "puzzle": generated.puzzle,
+        "solution": generated.solution,
+        "seed": puzzle_seed,
+        "verification_mode": generated.verification.mode,
+        "unique": unique,
+    }
 
 
 def generate_dataset_records(
@@ -240,56 +509,167 @@ def generate_dataset_records(
     count: int,
     seed: int | None = None,
     verify: bool = False,
+    jobs: int = 1,
+    unique: bool = False,
+    solution_method: SolutionMethod = "pattern",
+    dedupe: bool = False,
 ) -> list[dict[str, Any]]:
-    validate_size(size)
-    rng = random.Random(seed)
-    records = []
-
-    for index, actual_difficulty in enumerate(expand_difficulties(difficulty, count), start=1):
-        puzzle_seed = rng.randrange(2**63)
-        target_clues, clue_percent = clue_count(size, actual_difficulty, rng)
+    """Generate `count` records; `unique=True` digs clues with a uniqueness check.
 
-        generated = generate_puzzle(
-            size=size,
-            clues=target_clues,
-            seed=puzzle_seed,
-            verify=verify,
-        )
-        if not generated.verification.valid:
+    With `dedupe`, puzzles equal under symmetry to an earlier one are dropped
+    and replaced by records generated from the following indexes. The kept
+    records are renumbered from 1.
+    """
+    validate_size(size)
+    if jobs < 1:
+        raise ValueError("Jobs must be at least 1")
+    base_seed = random.randrange(2**63) if seed is None else seed
+    difficulties = expand_difficulties(difficulty, count)
+    options = {"verify": verify, "unique": unique, "solution_method": solution_method}
+    records = _generate_records(size, difficulties, 1, base_seed, options, jobs)
+    if not dedupe:
+        return records
+
+    from .dedup import dedupe_records
+
+    seen: set[str] = set()
+    kept = list(dedupe_records(records, seen=seen))
+    next_index = count + 1
+    max_index = 1000 * count
+    while len(kept) < count:
+        if next_index > max_index:
             raise RuntimeError(
-                f"Generated puzzle {index} failed verification: "
-                f"{generated.verification.error}"
+                f"Only {len(kept)} of {count} puzzles were distinct "
+                f"after {max_index} candidates"
             )
-        verification_mode = generated.verification.mode
-        unique = False
-
-        records.append(
-            {
-                "id": index,
-                "size": size,
-                "difficulty": actual_difficulty,
-                "clue_percent": clue_percent,
-                "target_clues": target_clues,
-                "actual_clues": generated.actual_clues,
-                "puzzle": generated.puzzle,
-                "solution": generated.solution,
-                "seed": puzzle_seed,
-                "verification_mode": verification_mode,
-                "unique": unique,
-            }
+        missing = min(count - len(kept), max_index - next_index + 1)
+        extra = _generate_records(
+            size,
+            _refill_difficulties(difficulty, next_index, missing),
+            next_index,
+            base_seed,
+            options,
+            jobs,
         )
+        next_index += missing
+        kept.extend(dedupe_records(extra, seen=seen))
+    for index, record in enumerate(kept, start=1):
+        record["id"] = index
+    return kept
+
+
+def _refill_difficulties(difficulty: str, first_index: int, count: int) -> list[str]:
+    """Difficulties for refill indexes, continuing the "mixed" cycle from `first_index`."""
+    if difficulty != "mixed":
+        return expand_difficulties(difficulty, count)
+    names = list(_difficulty_percent_ranges())
+    return [names[(index - 1) % len(names)] for index in range(first_index, first_index + count)]
 
+
+def _generate_records(
+    size: int,
+    difficulties: list[str],
+    first_index: int,
+    base_seed: int,
+    options: dict[str, Any],
+    jobs: int,
+) -> list[dict[str, Any]]:
+    if jobs == 1:
+        return [
+            generate_record(size, actual_difficulty, index, base_seed, **options)
+            for index, actual_difficulty in enumerate(difficulties, start=first_index)
+        ]
+
+    count = len(difficulties)
+    chunk_size = max(1, min(GENERATION_CHUNK_SIZE, count // (jobs * 4)))
+    chunks = [
+        (
+            size,
+            difficulties[start : start + chunk_size],
+            first_index + start,
+            base_seed,
+            options,
+        )
+        for start in range(0, count, chunk_size)
+    ]
+    records = []
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        for chunk in executor.map(_generate_record_chunk, chunks):
+            records.extend(chunk)
     return records
 
 
+def _generate_record_chunk(args: tuple) -> list[dict[str, Any]]:
+    size, difficulties, first_index, base_seed, options = args
+    return [
+        generate_record(size, difficulty, index, base_seed, **options)
+        for index, difficulty in enumerate(difficulties, start=first_index)
+    ]
+
+
 def generate_dataset(
     size: int,
     difficulty: str,
     count: int,
     seed: int | None = None,
+    verify: bool = False,
+    path: str | Path | None = None,
+    shards: int | None = None,
+    compression: str | None = None,
+    jobs: int = 1,
+    unique: bool = False,
+    solution_method: SolutionMethod = "pattern",
+    effort_band: tuple[float, float] | None = None,
+    effort_metric: "EffortMetric" = "csp_backtracks",
+    dedupe: bool = False,
 ) -> Path:
-    records = generate_dataset_records(size, difficulty, count, seed=seed, verify=False)
-    return write_dataset_records(records, size, difficulty)
+    if effort_band is None:
+        records = generate_dataset_records(
+            size,
+            difficulty,
+            count,
+            seed=seed,
+            verify=verify,
+            jobs=jobs,
+            unique=unique,
+            solution_method=solution_method,
+            dedupe=dedupe,
+        )
+    else:
+        from .effort import generate_effort_records
+
+        records = generate_effort_records(
+            size,
+            difficulty,
+            count,
+            effort_band,
+            metric=effort_metric,
+            seed=seed,
+            verify=verify,
+            unique=unique,
+            solution_method=solution_method,
+            jobs=jobs,
+            dedupe=dedupe,
+        )
+    if shards is not None:
+        suffix = ".jsonl"
+        if compression is not None:
+            suffix += _compression_suffix(compression)
+        return write_sharded_dataset(
+            records,
+            size,
+            difficulty,
+            shards,
+            path=path,
+            suffix=suffix,
+        )
+    return write_dataset_records(
+        records,
+        size,
+        difficulty,
+        path=path,
+        compression=compression,
+    )
 
 
 def prompt_difficulty():
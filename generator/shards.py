@@ -0,0 +1,185 @@
+from collections.abc import Iterable, Iterator
+import hashlib
+from itertools import islice
+import json
+from pathlib import Path
+from typing import Any
+
+from board_utils import validate_size
+from config import load_config
+
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+SHARD_PREFIX = "shard-"
+
+
+def sharded_dataset_path(size: int, difficulty: str, count: int) -> Path:
+    validate_size(size)
+    if count < 0:
+        raise ValueError("Count cannot be negative")
+    directory = Path(load_config()["paths"]["datasets_dir"])
+    return directory / f"{size}x{size}_{difficulty}_{count}"
+
+
+def shard_file_name(index: int, suffix: str = ".jsonl") -> str:
+    return f"{SHARD_PREFIX}{index:05d}{suffix}"
+
+
+def is_sharded_dataset(path: str | Path) -> bool:
+    return (Path(path) / MANIFEST_NAME).is_file()
+
+
+def write_shard(
+    directory: str | Path,
+    index: int,
+    records: Iterable[dict[str, Any]],
+    size: int,
+    difficulty: str,
+    suffix: str = ".jsonl",
+) -> dict[str, Any]:
+    """Write one shard and return its manifest entry.
+
+    The records are counted and the file hashed as it is written, so the
+    shard is never read back. Shards are independent files, so they can be
+    written separately and collected into a manifest afterwards.
+    """
+    from .generation import write_dataset_records
+
+    path = Path(directory) / shard_file_name(index, suffix)
+    digest = hashlib.sha256()
+    count = 0
+
+    def counted() -> Iterator[dict[str, Any]]:
+        nonlocal count
+        for record in records:
+            count += 1
+            yield record
+
+    write_dataset_records(counted(), size, difficulty, path=path, digest=digest)
+    return {"file": path.name, "count": count, "sha256": digest.hexdigest()}
+
+
+def write_manifest(
+    directory: str | Path,
+    size: int,
+    difficulty: str,
+    shards: list[dict[str, Any]],
+) -> Path:
+    directory = Path(directory)
+    shards = sorted(shards, key=lambda entry: entry["file"])
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "size": size,
+        "difficulty": difficulty,
+        "count": sum(entry["count"] for entry in shards),
+        "shards": shards,
+    }
+    path = directory / MANIFEST_NAME
+    path.write_text(
+        json.dumps(manifest, indent=2, sort_keys=True) + "\n",
+        encoding="utf-8",
+    )
+    return path
+
+
+def write_sharded_dataset(
+    records: Iterable[dict[str, Any]],
+    size: int,
+    difficulty: str,
+    shards: int,
+    path: str | Path | None = None,
+    suffix: str = ".jsonl",
+    count: int | None = None,
+) -> Path:
+    """Split `records` evenly over `shards` files and write their manifest.
+
+    Shards are written one after another as the records are read, so any
+    iterable works; `count` is needed unless `records` has a length.
+    """
+    if shards < 1:
+        raise ValueError("Shard count must be at least 1")
+    if count is None:
+        count = len(records)
+    directory = Path(path or sharded_dataset_path(size, difficulty, count))
+    directory.mkdir(parents=True, exist_ok=True)
+
+    remaining = iter(records)
+    base, remainder = divmod(count, shards)
+    entries = [
+        write_shard(
+            directory,
+            index,
+            islice(remaining, base + (1 if index < remainder else 0)),
+            size,
+            difficulty,
+            suffix,
+        )
+        for index in range(shards)
+    ]
+    if next(remaining, None) is not None:
+        raise ValueError(f"More than {count} records given for the sharded dataset")
+
+    write_manifest(directory, size, difficulty, entries)
+    return directory
+
+
+def read_manifest(path: str | Path) -> dict[str, Any]:
+    manifest_path = Path(path) / MANIFEST_NAME
+    with open(manifest_path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("version") != MANIFEST_VERSION or not isinstance(
+        manifest.get("shards"), list
+    ):
+        raise ValueError(f"Unsupported dataset manifest: {manifest_path}")
+    return manifest
+
+
+def shard_paths(path: str | Path) -> list[Path]:
+    directory = Path(path)
+    return [directory / entry["file"] for entry in read_manifest(directory)["shards"]]
+
+
+def shard_offset(path: str | Path, shard: int) -> int:
+    """Number of records stored in the shards before `shard`."""
+    entries = read_manifest(path)["shards"]
+    if not 0 <= shard < len(entries):
+        raise ValueError(f"Shard {shard} out of range 0..{len(entries) - 1}")
+    return sum(entry["count"] for entry in entries[:shard])
+
+
+def verify_manifest(path: str | Path) -> list[str]:
+    """Return a description of every shard whose checksum does not match."""
+    directory = Path(path)
+    mismatches = []
+    for entry in read_manifest(directory)["shards"]:
+        shard_path = directory / entry["file"]
+        if not shard_path.exists():
+            mismatches.append(f"{entry['file']}: missing")
+        elif file_sha256(shard_path) != entry["sha256"]:
+            mismatches.append(f"{entry['file']}: checksum mismatch")
+    return mismatches
+
+
+def iter_sharded_dataset(
+    path: str | Path,
+    shard: int | None = None,
+    **read_options: Any,
+) -> Iterator[dict[str, Any]]:
+    from .generation import iter_dataset
+
+    paths = shard_paths(path)
+    if shard is not None:
+        if not 0 <= shard < len(paths):
+            raise ValueError(f"Shard {shard} out of range 0..{len(paths) - 1}")
+        paths = [paths[shard]]
+    for shard_path in paths:
+        yield from iter_dataset(shard_path, **read_options)
+
+
+def file_sha256(path: str | Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
@@ -1,15 +1,32 @@
-from dataclasses import dataclass
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache, partial
+import itertools
+import sys
 from pathlib import Path
 import time
-from typing import Any, Literal
+from typing import TYPE_CHECKING, Any, Literal
 
-from z3 import And, Distinct, Int, Or, Solver, sat
+from board_utils import board_size, format_board, parse_board, solves_puzzle
+from parallel import bounded_map
+from solvers.bitmask import search
+from solvers.dlx import count_dlx_solutions
+from solvers.sat import count_sat_solutions
 
-from board_utils import board_size, format_board, parse_board
+if TYPE_CHECKING:
+    from z3 import Int, Solver
+
+    from solvers.cache import SolutionCache
 
 # Redundant
 ValidityMode = Literal["solvable", "unique"]
 VerificationMode = Literal["solvable", "unique", "derived"]
+VerificationBackend = Literal["z3", "sat", "dlx", "bitmask"]
+VERIFICATION_BACKENDS = ("z3", "sat", "dlx", "bitmask")
+VERIFY_CHUNK_SIZE = 64
+# progress(checked, invalid, elapsed_seconds)
+VerificationProgress = Callable[[int, int, float], None]
 
 
 @dataclass
@@ -22,6 +39,8 @@ class VerificationResult:
     setup_seconds: float | None = None
     solve_seconds: float | None = None
     error: str | None = None
+    backend: str = "z3"
+    backend_seconds: dict[str, float] = field(default_factory=dict)
 
 
 @dataclass
@@ -39,11 +58,21 @@ class DatasetVerificationSummary:
     invalid_count: int
     runtime_seconds: float
     failures: list[DatasetVerificationFailure]
+    stopped_early: bool = False
+    backend: str = "z3"
+    cross_check: str | None = None
+    backend_seconds: dict[str, float] = field(default_factory=dict)
+
+    @property
+    def puzzles_per_second(self) -> float:
+        return self.total / self.runtime_seconds if self.runtime_seconds > 0 else 0.0
 
 
 def build_z3_sudoku_solver(
     board: str | list[int],
-) -> tuple[Solver, list[list[Int]], list[int], int, int]:
+) -> tuple["Solver", list[list["Int"]], list[int], int, int]:
+    from z3 import And, Distinct, Int, Solver
+
     values = parse_board(board)
     n, box = board_size(values)
 
@@ -83,49 +112,208 @@ def build_z3_sudoku_solver(
     return solver, cells, values, n, box
 
 
-def _solution_from_model(cells: list[list[Int]], n: int, model) -> list[int]:
+def _solution_from_model(cells: list[list["Int"]], n: int, model) -> list[int]:
     return [model[cells[r][c]].as_long() for r in range(n) for c in range(n)]
 
 
+def stored_solution(
+    board: str | list[int],
+    solution: str | list[int] | None,
+) -> list[int] | None:
+    """Parsed `solution` if it is a valid grid agreeing with every given, else None.
+
+    A matching stored solution proves the puzzle solvable without a solver.
+    """
+    if solution is None:
+        return None
+    try:
+        values = parse_board(solution)
+        if not solves_puzzle(parse_board(board), values):
+            return None
+    except ValueError:
+        return None
+    return values
+
+
 def verify_puzzle(
-    board: str | list[int], mode: ValidityMode = "solvable"
+    board: str | list[int],
+    mode: ValidityMode = "solvable",
+    solution: str | list[int] | None = None,
+    backend: VerificationBackend = "z3",
+    cross_check: VerificationBackend | None = None,
+    cache: "SolutionCache | None" = None,
 ) -> VerificationResult:
+    """Check `board` with `backend`, trusting a matching stored `solution` first.
+
+    When `solution` passes `stored_solution`, solvable mode needs no solver
+    unless `cross_check` is set.
+    Without one, a solution from `cache` serves the same purpose, and
+    solutions the backend finds are added to it. With `cross_check`, a second
+    backend checks the same board and any disagreement makes the result
+    invalid. `backend_seconds` records how long each backend took.
+    """
     start = time.perf_counter()
-    setup_seconds = None
-    solve_seconds = None
 
     if mode not in ("solvable", "unique"):
+        error = f"Unsupported verification mode: {mode}"
+    elif backend not in VERIFICATION_BACKENDS:
+        error = f"Unsupported verification backend: {backend}"
+    elif cross_check is not None and cross_check not in VERIFICATION_BACKENDS:
+        error = f"Unsupported verification backend: {cross_check}"
+    else:
+        error = None
+    if error is not None:
         return VerificationResult(
             valid=False,
             mode=mode,
             solution=None,
             solution_count=0,
             runtime_seconds=time.perf_counter() - start,
-            error=f"Unsupported verification mode: {mode}",
+            error=error,
+            backend=backend,
         )
 
+    known = stored_solution(board, solution)
+    if known is None and cache is not None:
+        known = stored_solution(board, cache.get(board))
+    # A requested cross-check always runs both backends.
+    if known is not None and mode == "solvable" and cross_check is None:
+        return VerificationResult(
+            valid=True,
+            mode=mode,
+            solution=format_board(known),
+            solution_count=1,
+            runtime_seconds=time.perf_counter() - start,
+            backend=backend,
+        )
+
+    result = _run_backend(backend, board, mode, known)
+    if cross_check is not None:
+        # z3 and sat would otherwise just count the stored solution, so the
+        # second opinion always searches from the puzzle alone.
+        other = _run_backend(cross_check, board, mode, None)
+        result.backend_seconds.update(other.backend_seconds)
+        if (result.valid, result.solution_count) != (other.valid, other.solution_count):
+            result.valid = False
+            result.error = (
+                f"Backends disagree: {backend} found {result.solution_count} "
+                f"solution(s), {cross_check} found {other.solution_count}."
+            )
+    if cache is not None and known is None and result.valid and result.solution:
+        cache.put(board, result.solution, backend)
+    result.runtime_seconds = time.perf_counter() - start
+    return result
+
+
+def _run_backend(
+    backend: VerificationBackend,
+    board: str | list[int],
+    mode: ValidityMode,
+    known: list[int] | None,
+) -> VerificationResult:
+    if backend == "z3":
+        result = _verify_z3(board, mode, known)
+    else:
+        result = _verify_with_counter(backend, board, mode, known)
+    result.backend_seconds = {backend: result.runtime_seconds}
+    return result
+
+
+def _verify_with_counter(
+    backend: VerificationBackend,
+    board: str | list[int],
+    mode: ValidityMode,
+    known: list[int] | None = None,
+) -> VerificationResult:
+    """Verify by counting solutions: one is enough to be solvable, two break uniqueness."""
+    start = time.perf_counter()
+    limit = 2 if mode == "unique" else 1
+    try:
+        if backend == "sat" and known is not None:
+            # The incremental SAT counter starts from the stored solution.
+            count, solved = count_sat_solutions(board, limit, known=known)
+        else:
+            count, solved = SOLUTION_COUNTERS[backend](board, limit)
+    except Exception as exc:
+        return VerificationResult(
+            valid=False,
+            mode=mode,
+            solution=None,
+            solution_count=0,
+            runtime_seconds=time.perf_counter() - start,
+            error=str(exc),
+            backend=backend,
+        )
+
+    if count == 0:
+        error = "Sudoku is UNSAT."
+    elif mode == "unique" and count > 1:
+        error = "Sudoku has multiple solutions."
+    else:
+        error = None
+    return VerificationResult(
+        valid=error is None,
+        mode=mode,
+        solution=None if solved is None else format_board(solved),
+        solution_count=count,
+        runtime_seconds=time.perf_counter() - start,
+        solve_seconds=time.perf_counter() - start,
+        error=error,
+        backend=backend,
+    )
+
+
+def _count_bitmask_solutions(
+    board: str | list[int],
+    limit: int,
+) -> tuple[int, list[int] | None]:
+    result = search(parse_board(board), limit=limit)
+    return result.count, result.solution
+
+
+SOLUTION_COUNTERS = {
+    "sat": count_sat_solutions,
+    "dlx": count_dlx_solutions,
+    "bitmask": _count_bitmask_solutions,
+}
+
+
+def _verify_z3(
+    board: str | list[int],
+    mode: ValidityMode,
+    known: list[int] | None,
+) -> VerificationResult:
+    start = time.perf_counter()
+    setup_seconds = None
+    solve_seconds = None
+
     try:
+        from z3 import Or, sat
+
         setup_start = time.perf_counter()
         solver, cells, _values, n, _box = build_z3_sudoku_solver(board)
         setup_seconds = time.perf_counter() - setup_start
 
         solve_start = time.perf_counter()
-        check_result = solver.check()
-        if check_result != sat:
-            solve_seconds = time.perf_counter() - solve_start
-            return VerificationResult(
-                valid=False,
-                mode=mode,
-                solution=None,
-                solution_count=0,
-                runtime_seconds=time.perf_counter() - start,
-                setup_seconds=setup_seconds,
-                solve_seconds=solve_seconds,
-                error="Sudoku is UNSAT.",
-            )
+        if known is not None:
+            solved = known
+        else:
+            check_result = solver.check()
+            if check_result != sat:
+                solve_seconds = time.perf_counter() - solve_start
+                return VerificationResult(
+                    valid=False,
+                    mode=mode,
+                    solution=None,
+                    solution_count=0,
+                    runtime_seconds=time.perf_counter() - start,
+                    setup_seconds=setup_seconds,
+                    solve_seconds=solve_seconds,
+                    error="Sudoku is UNSAT.",
+                )
 
-        model = solver.model()
-        solved = _solution_from_model(cells, n, model)
+            model = solver.model()
+            solved = _solution_from_model(cells, n, model)
         solution = format_board(solved)
 
         if mode == "solvable":
@@ -187,36 +375,152 @@ def verify_puzzle(
 
 
 def verify_dataset_records(
-    records: list[dict[str, Any]],
+    records: Iterable[dict[str, Any]],
     mode: str = "solvable",
     max_failures: int = 10,
+    jobs: int = 1,
+    stop_early: bool = False,
+    progress: VerificationProgress | None = None,
+    chunk_size: int = VERIFY_CHUNK_SIZE,
+    use_stored_solution: bool = True,
+    backend: VerificationBackend = "z3",
+    cross_check: VerificationBackend | None = None,
+    solution_cache: str | Path | None = None,
 ) -> DatasetVerificationSummary:
+    """Verify every record, on `jobs` worker processes when jobs > 1.
+
+    Results are consumed in record order, so the summary is the same for any
+    worker count. With `stop_early`, verification ends once `max_failures`
+    invalid records have been seen. `progress` is called after every
+    `chunk_size` records. Each record's stored `solution` is handed to
+    `verify_puzzle` unless `use_stored_solution` is False. With
+    `solution_cache`, each process consults and fills the `SolutionCache` at
+    that path. The summary sums the time spent in each backend.
+    """
+    if jobs < 1 or chunk_size < 1:
+        raise ValueError("Jobs and chunk size must be at least 1")
     start = time.perf_counter()
+    total = 0
     valid_count = 0
     failures: list[DatasetVerificationFailure] = []
+    stopped_early = False
+    backend_seconds: dict[str, float] = {}
+    options = {
+        "mode": mode,
+        "backend": backend,
+        "cross_check": cross_check,
+        "solution_cache": solution_cache,
+    }
+
+    chunks = _record_chunks(records, chunk_size, use_stored_solution)
+    if jobs == 1:
+        # Lazy per record, so stopping early skips the rest of the chunk.
+        results = (
+            (_verify_item(item, options) for item in chunk) for chunk in chunks
+        )
+        executor = None
+    else:
+        executor = ProcessPoolExecutor(max_workers=jobs)
+        verify_chunk = partial(_verify_chunk, options=options)
+        results = (
+            chunk_results
+            for _chunk, chunk_results in bounded_map(executor, verify_chunk, chunks, 2 * jobs)
+        )
 
-    for record_number, record in enumerate(records, start=1):
-        result = verify_puzzle(record["puzzle"], mode=mode)
-        if result.valid:
-            valid_count += 1
-            continue
-
-        if len(failures) < max_failures:
-            failures.append(
-                DatasetVerificationFailure(
-                    record_number=record_number,
-                    record_id=record.get("id"),
-                    error=result.error,
-                )
-            )
+    try:
+        for chunk_results in results:
+            for record_number, record_id, valid, error, seconds in chunk_results:
+                total += 1
+                for name, elapsed in seconds.items():
+                    backend_seconds[name] = backend_seconds.get(name, 0.0) + elapsed
+                if valid:
+                    valid_count += 1
+                    continue
+
+                if len(failures) < max_failures:
+                    failures.append(
+                        DatasetVerificationFailure(
+                            record_number=record_number,
+                            record_id=record_id,
+                            error=error,
+                        )
+                    )
+                if stop_early and total - valid_count >= max_failures:
+                    stopped_early = True
+                    break
+            if progress is not None:
+                progress(total, total - valid_count, time.perf_counter() - start)
+            if stopped_early:
+                break
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
 
     return DatasetVerificationSummary(
         mode=mode,
-        total=len(records),
+        total=total,
         valid_count=valid_count,
-        invalid_count=len(records) - valid_count,
+        invalid_count=total - valid_count,
         runtime_seconds=time.perf_counter() - start,
         failures=failures,
+        stopped_early=stopped_early,
+        backend=backend,
+        cross_check=cross_check,
+        backend_seconds=backend_seconds,
+    )
+
+
+def _record_chunks(
+    records: Iterable[dict[str, Any]],
+    chunk_size: int,
+    use_stored_solution: bool,
+) -> Iterator[list[tuple[int, Any, Any, Any]]]:
+    """Strip records down to (number, id, puzzle, solution) so chunks pickle cheaply."""
+    items = (
+        (
+            record_number,
+            record.get("id"),
+            record["puzzle"],
+            record.get("solution") if use_stored_solution else None,
+        )
+        for record_number, record in enumerate(records, start=1)
+    )
+    while chunk := list(itertools.islice(items, chunk_size)):
+        yield chunk
+
+
+def _verify_chunk(
+    chunk: list[tuple[int, Any, Any, Any]],
+    options: dict[str, Any],
+) -> list[tuple[int, Any, bool, str | None, dict[str, float]]]:
+    return [_verify_item(item, options) for item in chunk]
+
+
+def _verify_item(
+    item: tuple[int, Any, Any, Any],
+    options: dict[str, Any],
+) -> tuple[int, Any, bool, str | None, dict[str, float]]:
+    record_number, record_id, puzzle, solution = item
+    options = dict(options)
+    cache_path = options.pop("solution_cache")
+    cache = None if cache_path is None else _open_cache(str(cache_path))
+    result = verify_puzzle(puzzle, solution=solution, cache=cache, **options)
+    return record_number, record_id, result.valid, result.error, result.backend_seconds
+
+
+@lru_cache(maxsize=None)
+def _open_cache(path: str) -> "SolutionCache":
+    """One cache connection per process and path, kept open between records."""
+    from solvers.cache import SolutionCache
+
+    return SolutionCache(path)
+
+
+def print_verification_progress(checked: int, invalid: int, elapsed: float) -> None:
+    rate = checked / elapsed if elapsed > 0 else 0.0
+    print(
+        f"Verified {checked} puzzle(s), {invalid} invalid, {rate:.1f}/s",
+        file=sys.stderr,
     )
 
 
@@ -225,11 +529,17 @@ def verify_dataset(
     expected_size: int | None = None,
     mode: str = "solvable",
     max_failures: int = 10,
+    **options: Any,
 ) -> DatasetVerificationSummary:
-    from .generation import read_dataset
+    from .generation import iter_dataset
 
-    records = read_dataset(path, expected_size=expected_size)
-    return verify_dataset_records(records, mode=mode, max_failures=max_failures)
+    records = iter_dataset(path, expected_size=expected_size, validate="length")
+    return verify_dataset_records(
+        records,
+        mode=mode,
+        max_failures=max_failures,
+        **options,
+    )
 
 
 def verify_dataset_menu():
@@ -1,8 +1,11 @@
+from contextlib import ExitStack
 import os
+import sys
 
 import board_utils
 from benchmark import (
     benchmark_menu,
+    compare_runs_menu,
     solve_with_timeout,
 )
 from benchmark.visualization import visualization_menu
@@ -10,18 +13,27 @@ from generator import (
     generate_dataset_menu,
     verify_dataset_menu,
 )
+from solvers.cache import MemoryCache, SolutionCache
 from solvers.csp import solve_csp
 
 
 def main():
+    # Closes the solution cache's database, if one was opened, on any exit.
+    with ExitStack() as resources:
+        _menu(resources)
+
+
+def _menu(resources: ExitStack):
     print("Sudoku Solver:")
+    cache = None
     while True:
         print("\n-----Menu-----")
         print("1. Enter Puzzle")
         print("2. Generate Dataset")
         print("3. Verify Dataset")
         print("4. Benchmark")
-        print("5. Quit")
+        print("5. Compare Benchmark Runs")
+        print("6. Quit")
         user_input = input().strip()
 
         if user_input == "1":
@@ -32,7 +44,9 @@ def main():
             )
             puzzle = input().strip()
             print()
-            result = solve_with_timeout(solve_csp, puzzle)
+            if cache is None:
+                cache = MemoryCache(backing=resources.enter_context(SolutionCache()))
+            result = solve_with_timeout(solve_csp, puzzle, cache=cache)
             if result.solved:
                 print("\nSolved Board: ")
                 board_utils.print_board(result.solution)
@@ -54,6 +68,10 @@ def main():
             visualization_menu(results_table)
 
         elif user_input == "5":
+            os.system("clear")
+            compare_runs_menu()
+
+        elif user_input == "6":
             return
 
         else:
@@ -63,4 +81,8 @@ def main():
 
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        import cli
+
+        sys.exit(cli.main())
     main()
@@ -0,0 +1,33 @@
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Executor
+from typing import Any
+
+
+def bounded_map(
+    executor: Executor | None,
+    fn: Callable[[Any], Any],
+    items: Iterable[Any],
+    in_flight: int,
+) -> Iterator[tuple[Any, Any]]:
+    """Yield (item, fn(item)) in input order, with at most `in_flight` submitted.
+
+    Items are read lazily, so a long input never piles up in the executor.
+    Without an executor, `fn` runs inline one item at a time.
+    """
+    if in_flight < 1:
+        raise ValueError("in_flight must be at least 1")
+    if executor is None:
+        for item in items:
+            yield item, fn(item)
+        return
+
+    pending: deque[tuple[Any, Any]] = deque()
+    for item in items:
+        pending.append((item, executor.submit(fn, item)))
+        if len(pending) >= in_flight:
+            done_item, future = pending.popleft()
+            yield done_item, future.result()
+    while pending:
+        done_item, future = pending.popleft()
+        yield done_item, future.result()
@@ -0,0 +1,559 @@
+import asyncio
+from collections import deque
+from contextlib import suppress
+from dataclasses import asdict, dataclass
+import itertools
+import json
+import math
+import multiprocessing
+import time
+from typing import Any
+from urllib.parse import urlsplit
+
+from benchmark import SOLVERS
+from board_utils import format_board, parse_board
+from benchmark.batch import WorkerProcess
+from generator.verification import SOLUTION_COUNTERS, VERIFICATION_BACKENDS, verify_puzzle
+from solvers.cache import MemoryCache
+from solvers.metrics import SolverResult
+
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+DEFAULT_BATCH_SIZE = 16
+DEFAULT_BATCH_WAIT_SECONDS = 0.002
+DEFAULT_TIMEOUT_SECONDS = 10.0
+DEFAULT_QUEUE_LIMIT = 1024
+DEFAULT_COUNT_BACKEND = "bitmask"
+MAX_BODY_BYTES = 1 << 20
+# Lines are also capped by the StreamReader limit (64 KiB by default).
+MAX_HEADERS = 100
+# A worker still busy this long after the running request's deadline is
+# killed; the slack lets it answer requests it skipped for being expired.
+OVERRUN_GRACE_SECONDS = 0.05
+# Latency percentiles are taken over this many most recent requests per endpoint.
+LATENCY_WINDOW = 1024
+ENDPOINTS = {"/solve": "solve", "/verify": "verify", "/count-solutions": "count"}
+REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    431: "Request Header Fields Too Large",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+    504: "Gateway Timeout",
+}
+
+Response = tuple[int, dict[str, Any]]
+
+
+@dataclass
+class _Job:
+    kind: str
+    request: dict[str, Any]
+    deadline: float
+    future: asyncio.Future
+
+
+class SolveService:
+    """Asyncio HTTP/JSON front end to a warm process pool of solvers.
+
+    POST /solve, /verify and /count-solutions take a JSON object with a
+    "puzzle" and an optional "timeout" in seconds. Requests wait on a bounded
+    queue and are sent to the pool in micro-batches of up to `batch_size`,
+    gathered for at most `batch_wait` seconds, one batch per idle worker.
+    A request past its deadline gets a 504, and a worker still running it is
+    killed and replaced, so one slow puzzle cannot hold a worker. Solutions
+    are kept in a `MemoryCache`, so repeated puzzles skip the pool.
+    GET /metrics reports queue depth, latency percentiles and cache hit rate.
+    """
+
+    def __init__(
+        self,
+        jobs: int = 1,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        batch_wait: float = DEFAULT_BATCH_WAIT_SECONDS,
+        default_timeout: float = DEFAULT_TIMEOUT_SECONDS,
+        queue_limit: int = DEFAULT_QUEUE_LIMIT,
+        cache: MemoryCache | None = None,
+    ):
+        if jobs < 1 or batch_size < 1 or queue_limit < 1:
+            raise ValueError("jobs, batch_size and queue_limit must be at least 1")
+        if batch_wait < 0:
+            raise ValueError("batch_wait must not be negative")
+        if default_timeout <= 0:
+            raise ValueError("default_timeout must be positive")
+        self.jobs = jobs
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.default_timeout = default_timeout
+        self.queue_limit = queue_limit
+        self.cache = MemoryCache() if cache is None else cache
+        self.requests: dict[str, int] = {}
+        self.batches = 0
+        self.batched_jobs = 0
+        self.deadline_exceeded = 0
+        self.rejected = 0
+        self.workers_replaced = 0
+        self._latencies: dict[str, deque[float]] = {}
+        self._queue: asyncio.Queue[_Job] | None = None
+        self._idle: asyncio.Queue[WorkerProcess] | None = None
+        self._server: asyncio.Server | None = None
+        self._workers: set[WorkerProcess] = set()
+        self._running: dict[int, _Job] = {}
+        self._timers: dict[WorkerProcess, asyncio.TimerHandle] = {}
+        self._job_ids = itertools.count()
+        self._tasks: set[asyncio.Task] = set()
+        self._writers: set[asyncio.StreamWriter] = set()
+
+    async def start(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> tuple[str, int]:
+        """Start the workers and listener, returning the bound address; port 0 picks one."""
+        self._queue = asyncio.Queue(self.queue_limit)
+        self._idle = asyncio.Queue()
+        # Workers come from a forkserver (or spawn), never a fork of this
+        # process, so they cannot inherit the listening or client sockets.
+        self._context = _worker_context()
+        for _ in range(self.jobs):
+            self._idle.put_nowait(self._start_worker())
+        self._spawn(self._dispatch())
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            for writer in list(self._writers):
+                writer.close()
+            await self._server.wait_closed()
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        for worker in list(self._workers):
+            self._retire(worker)
+            worker.stop(kill=worker.busy)
+
+    def metrics(self) -> dict[str, Any]:
+        stats = self.cache.stats()
+        return {
+            "queue_depth": 0 if self._queue is None else self._queue.qsize(),
+            "requests": dict(self.requests),
+            "batches": self.batches,
+            "mean_batch_size": self.batched_jobs / self.batches if self.batches else 0.0,
+            "deadline_exceeded": self.deadline_exceeded,
+            "rejected": self.rejected,
+            "workers_replaced": self.workers_replaced,
+            "latency_seconds": {
+                endpoint: _latency_summary(latencies)
+                for endpoint, latencies in self._latencies.items()
+            },
+            "cache": {**asdict(stats), "hit_rate": stats.hit_rate},
+        }
+
+    def _start_worker(self) -> WorkerProcess:
+        worker = WorkerProcess(self._context, _run_job, initializer=_warm_worker)
+        self._workers.add(worker)
+        loop = asyncio.get_running_loop()
+        loop.add_reader(worker.connection.fileno(), self._on_readable, worker)
+        return worker
+
+    def _retire(self, worker: WorkerProcess) -> None:
+        self._workers.discard(worker)
+        timer = self._timers.pop(worker, None)
+        if timer is not None:
+            timer.cancel()
+        asyncio.get_running_loop().remove_reader(worker.connection.fileno())
+
+    def _spawn(self, coroutine) -> None:
+        task = asyncio.create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _handle_connection(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+    ) -> None:
+        self._writers.add(writer)
+        try:
+            while True:
+                try:
+                    head = await _read_head(reader)
+                except (ValueError, asyncio.LimitOverrunError):
+                    error = {"error": "Request header fields are too large."}
+                    await _send(writer, 431, error, False)
+                    break
+                if head is None:
+                    break
+                request_line, headers = head
+                parts = request_line.decode("latin-1").split()
+                if len(parts) != 3:
+                    await _send(writer, 400, {"error": "Malformed request line."}, False)
+                    break
+                method, target, version = parts
+
+                try:
+                    length = int(headers.get("content-length") or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    await _send(writer, 400, {"error": "Invalid Content-Length."}, False)
+                    break
+                if length > MAX_BODY_BYTES:
+                    await _send(writer, 413, {"error": "Request body is too large."}, False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                keep_alive = (
+                    version == "HTTP/1.1"
+                    and headers.get("connection", "").lower() != "close"
+                )
+                try:
+                    status, payload = await self._route(method, urlsplit(target).path, body)
+                except Exception as exc:
+                    status, payload = 500, {"error": f"Internal error: {exc}"}
+                await _send(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+            with suppress(ConnectionError):
+                await writer.wait_closed()
+
+    async def _route(self, method: str, path: str, body: bytes) -> Response:
+        if path == "/health":
+            return (200, {"status": "ok"}) if method == "GET" else _not_allowed("GET")
+        if path == "/metrics":
+            return (200, self.metrics()) if method == "GET" else _not_allowed("GET")
+        kind = ENDPOINTS.get(path)
+        if kind is None:
+            return 404, {"error": f"Unknown endpoint: {path}"}
+        if method != "POST":
+            return _not_allowed("POST")
+
+        start = time.perf_counter()
+        self.requests[kind] = self.requests.get(kind, 0) + 1
+        try:
+            request = json.loads(body or b"{}")
+            timeout = _validate(kind, request, self.default_timeout)
+        except ValueError as exc:
+            return 400, {"error": str(exc)}
+
+        response = await self._submit(kind, request, timeout)
+        latencies = self._latencies.setdefault(kind, deque(maxlen=LATENCY_WINDOW))
+        latencies.append(time.perf_counter() - start)
+        return response
+
+    async def _submit(self, kind: str, request: dict[str, Any], timeout: float) -> Response:
+        start = time.perf_counter()
+        puzzle = request["puzzle"]
+        if kind == "solve":
+            solution = self.cache.get(puzzle, request["solver"])
+            if solution is not None:
+                return 200, asdict(
+                    SolverResult(
+                        solution=solution,
+                        status="solved",
+                        runtime_seconds=time.perf_counter() - start,
+                        cached=True,
+                    )
+                )
+        elif kind == "verify" and request.get("solution") is None:
+            request["solution"] = self.cache.get(puzzle)
+
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait(_Job(kind, request, time.time() + timeout, future))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            return 503, {"error": "Request queue is full."}
+        try:
+            status, payload = await asyncio.wait_for(future, timeout)
+        except TimeoutError:
+            self.deadline_exceeded += 1
+            return 504, {"error": f"Deadline of {timeout} seconds exceeded."}
+
+        if status == 200 and payload.get("solution"):
+            if kind == "solve" and payload["status"] == "solved":
+                self.cache.put(puzzle, payload["solution"], request["solver"])
+            elif kind == "verify" and payload["valid"]:
+                self.cache.put(puzzle, payload["solution"], payload["backend"])
+        return status, payload
+
+    async def _dispatch(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            worker = await self._idle.get()
+            batch = [await self._queue.get()]
+            flush_at = loop.time() + self.batch_wait
+            while len(batch) < self.batch_size:
+                remaining = flush_at - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except TimeoutError:
+                    break
+
+            # Requests whose deadline already passed were answered with a 504.
+            batch = [job for job in batch if not job.future.done()]
+            if not batch:
+                self._idle.put_nowait(worker)
+                continue
+            while worker not in self._workers:
+                # It died while idle, and its replacement is queued.
+                worker = await self._idle.get()
+            self.batches += 1
+            self.batched_jobs += len(batch)
+            tasks = []
+            for job in batch:
+                job_id = next(self._job_ids)
+                self._running[job_id] = job
+                tasks.append((job_id, (job.kind, job.request, job.deadline)))
+            # A failed send means the process just died; the pipe's EOF then
+            # hands the batch to a replacement.
+            with suppress(OSError):
+                worker.submit(tasks)
+            self._watch(worker)
+
+    def _watch(self, worker: WorkerProcess) -> None:
+        """Arm a timer that kills `worker` if its running request overruns."""
+        timer = self._timers.pop(worker, None)
+        if timer is not None:
+            timer.cancel()
+        if not worker.busy:
+            return
+        deadline = self._running[worker.pending[0]].deadline
+        delay = max(0.0, deadline - time.time()) + OVERRUN_GRACE_SECONDS
+        loop = asyncio.get_running_loop()
+        self._timers[worker] = loop.call_later(delay, self._overrun, worker)
+
+    def _on_readable(self, worker: WorkerProcess) -> None:
+        try:
+            # An idle worker only becomes readable when its process has died.
+            while worker.connection.poll():
+                job_id, response = worker.receive()
+                self._finish(job_id, response)
+        except (EOFError, OSError):
+            worker.process.join(1)
+            code = worker.process.exitcode
+            error = f"Solver process exited with code {code} without a result."
+            self._replace(worker, (500, {"error": error}))
+            return
+        self._watch(worker)
+        if not worker.busy:
+            self._idle.put_nowait(worker)
+
+    def _overrun(self, worker: WorkerProcess) -> None:
+        self._timers.pop(worker, None)
+        self._replace(worker, (504, {"error": "Deadline exceeded while the request ran."}))
+
+    def _replace(self, worker: WorkerProcess, response: Response) -> None:
+        """Kill `worker`, answer its running request, and move the rest to a new one."""
+        self._retire(worker)
+        worker.stop(kill=True)
+        self.workers_replaced += 1
+        waiting = list(worker.pending)
+        if waiting:
+            self._finish(waiting.pop(0), response)
+
+        fresh = self._start_worker()
+        if not waiting:
+            self._idle.put_nowait(fresh)
+            return
+        tasks = []
+        for job_id in waiting:
+            job = self._running[job_id]
+            tasks.append((job_id, (job.kind, job.request, job.deadline)))
+        fresh.submit(tasks)
+        self._watch(fresh)
+
+    def _finish(self, job_id: int, response: Response) -> None:
+        job = self._running.pop(job_id)
+        if not job.future.done():
+            job.future.set_result(response)
+
+
+def serve(
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    **options: Any,
+) -> None:
+    """Run a `SolveService` until interrupted; `options` go to its constructor."""
+
+    async def run() -> None:
+        service = SolveService(**options)
+        bound_host, bound_port = await service.start(host, port)
+        print(f"Serving on http://{bound_host}:{bound_port}", flush=True)
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await service.close()
+
+    with suppress(KeyboardInterrupt):
+        asyncio.run(run())
+
+
+def _validate(kind: str, request: Any, default_timeout: float) -> float:
+    """Check and fill in request defaults, returning the deadline in seconds."""
+    if not isinstance(request, dict):
+        raise ValueError("Request body must be a JSON object.")
+    if "puzzle" not in request:
+        raise ValueError("Request needs a puzzle.")
+    _check_board("puzzle", request["puzzle"])
+
+    timeout = request.pop("timeout", default_timeout)
+    if (
+        isinstance(timeout, bool)
+        or not isinstance(timeout, (int, float))
+        or not math.isfinite(timeout)
+        or timeout <= 0
+    ):
+        raise ValueError("timeout must be a positive number of seconds.")
+
+    if kind == "solve":
+        request.setdefault("solver", "csp")
+        if not isinstance(request["solver"], str) or request["solver"] not in SOLVERS:
+            raise ValueError(f"Unknown solver: {request['solver']}")
+    elif kind == "verify":
+        request.setdefault("mode", "solvable")
+        request.setdefault("backend", "z3")
+        if not isinstance(request["mode"], str) or request["mode"] not in ("solvable", "unique"):
+            raise ValueError(f"Unsupported verification mode: {request['mode']}")
+        backend = request["backend"]
+        if not isinstance(backend, str) or backend not in VERIFICATION_BACKENDS:
+            raise ValueError(f"Unsupported verification backend: {backend}")
+        if request.get("solution") is not None:
+            _check_board("solution", request["solution"])
+    else:
+        request.setdefault("backend", DEFAULT_COUNT_BACKEND)
+        request.setdefault("limit", 2)
+        backend = request["backend"]
+        if not isinstance(backend, str) or backend not in SOLUTION_COUNTERS:
+            raise ValueError(f"Unsupported counting backend: {backend}")
+        limit = request["limit"]
+        if isinstance(limit, bool) or not isinstance(limit, int) or limit < 1:
+            raise ValueError("limit must be a positive integer.")
+    return float(timeout)
+
+
+def _check_board(field: str, board: Any) -> None:
+    if not isinstance(board, (str, list)):
+        raise ValueError(f"{field} must be a string or list.")
+    try:
+        values = parse_board(board)
+    except (TypeError, ValueError) as exc:
+        raise ValueError(f"Invalid {field}: {exc}") from None
+    if not values:
+        raise ValueError(f"{field} is empty.")
+
+
+def _worker_context():
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("spawn")
+    context = multiprocessing.get_context("forkserver")
+    # Workers fork from a server that already imported the solvers.
+    context.set_forkserver_preload(["service"])
+    return context
+
+
+def _warm_worker() -> None:
+    # Build the usual 9x9 setup once per worker rather than on its first request.
+    from solvers.csp import board_geometry
+    from solvers.sat import sudoku_rules_cnf
+
+    board_geometry(9)
+    sudoku_rules_cnf(9)
+
+
+def _run_job(task: tuple[str, dict[str, Any], float]) -> Response:
+    kind, request, deadline = task
+    if time.time() >= deadline:
+        return 504, {"error": "Deadline exceeded before the request ran."}
+    try:
+        return 200, _job_payload(kind, request)
+    except ValueError as exc:
+        return 400, {"error": str(exc)}
+    except Exception as exc:
+        return 500, {"error": str(exc)}
+
+
+def _job_payload(kind: str, request: dict[str, Any]) -> dict[str, Any]:
+    puzzle = request["puzzle"]
+    if kind == "solve":
+        return asdict(SOLVERS[request["solver"]](puzzle))
+    if kind == "verify":
+        result = verify_puzzle(
+            puzzle,
+            mode=request["mode"],
+            solution=request.get("solution"),
+            backend=request["backend"],
+        )
+        return asdict(result)
+
+    start = time.perf_counter()
+    count, solution = SOLUTION_COUNTERS[request["backend"]](puzzle, request["limit"])
+    return {
+        "count": count,
+        "limit": request["limit"],
+        "solution": None if solution is None else format_board(solution),
+        "backend": request["backend"],
+        "runtime_seconds": time.perf_counter() - start,
+    }
+
+
+async def _read_head(
+    reader: asyncio.StreamReader,
+) -> tuple[bytes, dict[str, str]] | None:
+    """The request line and headers, or None at EOF.
+
+    Raises ValueError for a line over the reader's limit (as readline does)
+    or for more than MAX_HEADERS headers.
+    """
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            return request_line, headers
+        if len(headers) >= MAX_HEADERS:
+            raise ValueError("Too many headers")
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+
+async def _send(
+    writer: asyncio.StreamWriter,
+    status: int,
+    payload: dict[str, Any],
+    keep_alive: bool,
+) -> None:
+    body = json.dumps(payload, sort_keys=True).encode()
+    head = (
+        f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    writer.write(head.encode("latin-1") + body)
+    await writer.drain()
+
+
+def _not_allowed(method: str) -> Response:
+    return 405, {"error": f"Method not allowed; use {method}."}
+
+
+def _latency_summary(latencies: deque[float]) -> dict[str, float | int]:
+    ordered = sorted(latencies)
+    summary: dict[str, float | int] = {"count": len(ordered)}
+    for name, fraction in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99)):
+        # Nearest-rank percentile over the recent window.
+        rank = max(1, math.ceil(fraction * len(ordered)))
+        summary[name] = ordered[rank - 1] if ordered else 0.0
+    return summary
@@ -0,0 +1,272 @@
+from dataclasses import dataclass
+from functools import lru_cache
+import random
+import time
+
+from board_utils import board_size, format_board, parse_board, validate_size
+from solvers.metrics import SolverResult
+
+
+@dataclass
+class SearchResult:
+    count: int
+    solution: list[int] | None
+    assignments: int
+    backtracks: int
+    aborted: bool = False
+
+
+@lru_cache(maxsize=None)
+def cell_houses(size: int) -> tuple[tuple[int, ...], tuple[int, ...], tuple[int, ...]]:
+    """Row, column and box index of every cell, shared by all searches of a size."""
+    n, box = validate_size(size)
+    rows = tuple(cell // n for cell in range(n * n))
+    cols = tuple(cell % n for cell in range(n * n))
+    boxes = tuple(
+        (row // box) * box + col // box for row, col in zip(rows, cols)
+    )
+    return rows, cols, boxes
+
+
+@lru_cache(maxsize=None)
+def house_cells(size: int) -> tuple[tuple[int, ...], ...]:
+    """Cells of every row, column and box."""
+    rows, cols, boxes = cell_houses(size)
+    houses: list[list[int]] = [[] for _ in range(3 * size)]
+    for cell in range(size * size):
+        houses[rows[cell]].append(cell)
+        houses[size + cols[cell]].append(cell)
+        houses[2 * size + boxes[cell]].append(cell)
+    return tuple(tuple(house) for house in houses)
+
+
+def search(
+    values: list[int],
+    limit: int = 1,
+    banned: list[int] | None = None,
+    rng: random.Random | None = None,
+    max_assignments: int | None = None,
+    hidden_singles: bool = False,
+) -> SearchResult:
+    """Depth-first search over bitmask candidates, stopping after `limit` solutions.
+
+    Value v is bit 1 << v in the row, column and box masks. Each step fills the
+    empty cell with the fewest candidates. `banned[cell]` removes extra
+    candidate bits, and `rng` shuffles the value order at each cell. The search
+    uses an explicit stack, so 36x36 boards do not hit the recursion limit.
+    When no cell is down to one candidate, `hidden_singles` also looks for a
+    digit with only one place left in some house. Past `max_assignments` it
+    gives up and returns an aborted result.
+    """
+    values = list(values)
+    n, _box = board_size(values)
+    rows, cols, boxes = cell_houses(n)
+    houses = house_cells(n)
+    full = ((1 << n) - 1) << 1
+    row_used = [0] * n
+    col_used = [0] * n
+    box_used = [0] * n
+    empties = []
+
+    for cell, value in enumerate(values):
+        if not value:
+            empties.append(cell)
+            continue
+        bit = 1 << value
+        row, col, box = rows[cell], cols[cell], boxes[cell]
+        if (row_used[row] | col_used[col] | box_used[box]) & bit:
+            return SearchResult(0, None, 0, 0)
+        row_used[row] |= bit
+        col_used[col] |= bit
+        box_used[box] |= bit
+
+    total = len(empties)
+    count = 0
+    solution = None
+    assignments = 0
+    backtracks = 0
+    stack: list[tuple[int, list[int]]] = []
+    masks = [0] * (n * n)
+
+    while True:
+        depth = len(stack)
+        if depth == total:
+            count += 1
+            if solution is None:
+                solution = list(values)
+            if count >= limit:
+                break
+        else:
+            best_index = depth
+            best_mask = 0
+            best_count = n + 1
+            for index in range(depth, total):
+                cell = empties[index]
+                mask = full & ~(
+                    row_used[rows[cell]] | col_used[cols[cell]] | box_used[boxes[cell]]
+                )
+                if banned is not None:
+                    mask &= ~banned[cell]
+                masks[cell] = mask
+                candidates = mask.bit_count()
+                if candidates < best_count:
+                    best_index = index
+                    best_mask = mask
+                    best_count = candidates
+                    if candidates <= 1:
+                        break
+
+            if best_count > 1 and hidden_singles:
+                # No naked single: look for a digit with only one place in a
+                # house, or a digit with no place at all (a dead end).
+                for house in houses:
+                    once = twice = placed = 0
+                    for cell in house:
+                        value = values[cell]
+                        if value:
+                            placed |= 1 << value
+                            continue
+                        mask = masks[cell]
+                        twice |= once & mask
+                        once |= mask
+                    if full & ~(placed | once):
+                        best_count = 0
+                        break
+                    single = once & ~twice
+                    if single:
+                        bit = single & -single
+                        for cell in house:
+                            if not values[cell] and masks[cell] & bit:
+                                break
+                        best_index = empties.index(cell, depth)
+                        best_mask = bit
+                        best_count = 1
+                        break
+
+            if best_count:
+                empties[depth], empties[best_index] = empties[best_index], empties[depth]
+                bits = []
+                while best_mask:
+                    low = best_mask & -best_mask
+                    bits.append(low)
+                    best_mask ^= low
+                if rng is not None:
+                    rng.shuffle(bits)
+                stack.append((empties[depth], bits))
+
+        # Move the top frame on to its next value, popping exhausted frames.
+        while stack:
+            cell, bits = stack[-1]
+            row, col, box = rows[cell], cols[cell], boxes[cell]
+            if values[cell]:
+                bit = 1 << values[cell]
+                row_used[row] ^= bit
+                col_used[col] ^= bit
+                box_used[box] ^= bit
+                values[cell] = 0
+                backtracks += 1
+            if bits:
+                bit = bits.pop()
+                values[cell] = bit.bit_length() - 1
+                row_used[row] |= bit
+                col_used[col] |= bit
+                box_used[box] |= bit
+                assignments += 1
+                break
+            stack.pop()
+        else:
+            break
+
+        if max_assignments is not None and assignments > max_assignments:
+            return SearchResult(count, solution, assignments, backtracks, aborted=True)
+
+    return SearchResult(count, solution, assignments, backtracks)
+
+
+def count_solutions(board: str | list[int], limit: int = 2) -> int:
+    """Number of solutions of `board`, counting no further than `limit`."""
+    return search(parse_board(board), limit=limit).count
+
+
+def has_unique_solution(board: str | list[int]) -> bool:
+    return count_solutions(board, limit=2) == 1
+
+
+def solve_bitmask(board: str | list[int]) -> SolverResult:
+    start = time.perf_counter()
+    try:
+        values = parse_board(board)
+        board_size(values)
+    except ValueError as exc:
+        return SolverResult(
+            solution=None,
+            status="failed",
+            runtime_seconds=time.perf_counter() - start,
+            error=str(exc),
+        )
+
+    result = search(values)
+    return SolverResult(
+        solution=None if result.solution is None else format_board(result.solution),
+        status="solved" if result.solution is not None else "failed",
+        runtime_seconds=time.perf_counter() - start,
+        backtracks=result.backtracks,
+        assignments=result.assignments,
+        error=None if result.solution is not None else "Puzzle has no solution.",
+    )
+
+
+def random_solution(size: int, rng: random.Random) -> list[int]:
+    """Fill an empty grid by randomized search, restarting runs that stall.
+
+    Random value order makes an occasional run wander into a huge dead
+    subtree, so each attempt gets an assignment budget that doubles on every
+    restart. Hidden-single checks cost more than they save until 25x25, where
+    plain candidate-count ordering stalls on most attempts.
+    """
+    n, _box = validate_size(size)
+    budget = 2 * n * n
+    while True:
+        result = search(
+            [0] * (n * n),
+            rng=rng,
+            max_assignments=budget,
+            hidden_singles=n >= 25,
+        )
+        if result.solution is not None:
+            return result.solution
+        budget *= 2
+
+
+def dig_unique_puzzle(
+    solution: list[int],
+    target_clues: int,
+    rng: random.Random,
+) -> list[int]:
+    """Remove clues from a solved grid while the puzzle stays uniquely solvable.
+
+    Cells are tried in random order. A removal is kept only if the grid has
+    no solution with that cell set to something other than its original
+    value, which is a uniqueness check against a puzzle already known to be
+    unique. Removals that break uniqueness are undone. Digging stops at
+    `target_clues`, or earlier if no more cells can be removed.
+    """
+    puzzle = list(solution)
+    banned = [0] * len(puzzle)
+    clues = len(puzzle)
+    cells = list(range(len(puzzle)))
+    rng.shuffle(cells)
+
+    for cell in cells:
+        if clues <= target_clues:
+            break
+        value = puzzle[cell]
+        puzzle[cell] = 0
+        banned[cell] = 1 << value
+        if search(puzzle, limit=1, banned=banned).count:
+            puzzle[cell] = value
+        else:
+            clues -= 1
+        banned[cell] = 0
+
+    return puzzle
@@ -0,0 +1,368 @@
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass, replace
+from functools import lru_cache, wraps
+import hashlib
+from pathlib import Path
+import sqlite3
+import threading
+import time
+
+from board_utils import (
+    BoardTransform,
+    canonical_form,
+    format_board,
+    parse_board,
+    solves_puzzle,
+)
+from config import load_config
+from solvers.metrics import SolverResult
+
+
+CACHE_FILENAME = "solution_cache.sqlite3"
+DEFAULT_MAX_ENTRIES = 100_000
+DEFAULT_MEMORY_CAPACITY = 4096
+# Lookups queue their last_used updates and write them with the next put,
+# or once this many are queued, instead of committing on every hit.
+TOUCH_BATCH_SIZE = 256
+# Bump a solver's version when a change could make its earlier answers wrong;
+# entries written under the old version then stop matching.
+SOLVER_VERSIONS = {
+    "naive": 1,
+    "csp": 1,
+    "sat": 1,
+    "smt": 1,
+    "dlx": 1,
+    "bitmask": 1,
+    "z3": 1,
+}
+
+
+def cache_path() -> Path:
+    return Path(load_config()["paths"]["benchmark_results_dir"]) / CACHE_FILENAME
+
+
+class SolutionCache:
+    """On-disk solutions keyed by canonical form, shared by symmetric puzzles.
+
+    A solution is stored in the canonical coordinates of its puzzle and mapped
+    back through the transform of whichever variant is looked up. Entries are
+    keyed by solver name and version. Once there are more than `max_entries`,
+    the least recently used are evicted down to 90% of it in one go, so a
+    full cache does not evict on every put. Nothing consults the cache unless
+    it is passed in, so benchmark timings never see it.
+    """
+
+    def __init__(
+        self,
+        path: str | Path | None = None,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ):
+        if max_entries < 1:
+            raise ValueError("Cache must hold at least one entry")
+        self.path = Path(cache_path() if path is None else path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS solutions (
+                puzzle_hash TEXT NOT NULL,
+                solver TEXT NOT NULL,
+                version INTEGER NOT NULL,
+                solution BLOB NOT NULL,
+                last_used INTEGER NOT NULL,
+                PRIMARY KEY (puzzle_hash, solver, version)
+            )
+            """
+        )
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS solutions_last_used ON solutions (last_used)"
+        )
+        self.connection.commit()
+        self._count = self._stored_count()
+        # rowid -> last_used not yet written
+        self._touched: dict[int, int] = {}
+
+    def __enter__(self) -> "SolutionCache":
+        return self
+
+    def __exit__(self, *_exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._stored_count()
+
+    def close(self) -> None:
+        with self._lock:
+            self._write_touches()
+            self.connection.commit()
+            self.connection.close()
+
+    def get(self, puzzle: str | list[int], solver: str | None = None) -> str | None:
+        """Cached solution of `puzzle`, or None; `solver=None` accepts any solver."""
+        key = _cache_key(puzzle)
+        if key is None:
+            return None
+        puzzle_hash, transform = key
+        with self._lock:
+            if solver is None:
+                row = self.connection.execute(
+                    "SELECT rowid, solution FROM solutions WHERE puzzle_hash = ? "
+                    "ORDER BY last_used DESC LIMIT 1",
+                    (puzzle_hash,),
+                ).fetchone()
+            else:
+                row = self.connection.execute(
+                    "SELECT rowid, solution FROM solutions "
+                    "WHERE puzzle_hash = ? AND solver = ? AND version = ?",
+                    (puzzle_hash, solver, SOLVER_VERSIONS.get(solver, 1)),
+                ).fetchone()
+            if row is None:
+                return None
+
+            solution = transform.invert(list(row[1]))
+            # A hash collision or a corrupted row must never reach the caller.
+            if not solves_puzzle(parse_board(puzzle), solution):
+                return None
+            self._touched[row[0]] = time.time_ns()
+            if len(self._touched) >= TOUCH_BATCH_SIZE:
+                self._write_touches()
+                self.connection.commit()
+        return format_board(solution)
+
+    def put(self, puzzle: str | list[int], solution: str | list[int], solver: str) -> None:
+        key = _cache_key(puzzle)
+        if key is None:
+            return
+        puzzle_hash, transform = key
+        entry = (
+            puzzle_hash,
+            solver,
+            SOLVER_VERSIONS.get(solver, 1),
+            bytes(transform.apply(solution)),
+            time.time_ns(),
+        )
+        with self._lock:
+            self._write_touches()
+            inserted = self.connection.execute(
+                "INSERT OR IGNORE INTO solutions "
+                "(puzzle_hash, solver, version, solution, last_used) VALUES (?, ?, ?, ?, ?)",
+                entry,
+            ).rowcount
+            if inserted:
+                self._count += 1
+            else:
+                self.connection.execute(
+                    "UPDATE solutions SET solution = ?, last_used = ? "
+                    "WHERE puzzle_hash = ? AND solver = ? AND version = ?",
+                    (entry[3], entry[4], *entry[:3]),
+                )
+            if self._count > self.max_entries:
+                self._evict()
+            self.connection.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self.connection.execute("DELETE FROM solutions")
+            self.connection.commit()
+            self._count = 0
+            self._touched.clear()
+
+    def _write_touches(self) -> None:
+        if self._touched:
+            self.connection.executemany(
+                "UPDATE solutions SET last_used = ? WHERE rowid = ?",
+                [(last_used, rowid) for rowid, last_used in self._touched.items()],
+            )
+            self._touched.clear()
+
+    def _evict(self) -> None:
+        # Other processes may share the file, so trim against the real count;
+        # trimming to 90% means this runs once per tenth of the capacity.
+        self._count = self._stored_count()
+        excess = self._count - (self.max_entries - self.max_entries // 10)
+        if excess > 0:
+            self._count -= self.connection.execute(
+                "DELETE FROM solutions WHERE rowid IN "
+                "(SELECT rowid FROM solutions ORDER BY last_used LIMIT ?)",
+                (excess,),
+            ).rowcount
+
+    def _stored_count(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM solutions").fetchone()[0]
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class MemoryCache:
+    """Thread-safe in-process LRU of solutions, keyed on the parsed board.
+
+    Lookups only parse the board, so repeated hot puzzles cost a dict hit.
+    Entries expire `ttl_seconds` after they were stored, and the least
+    recently used are evicted past `capacity`. A `backing` cache, such as a
+    `SolutionCache`, is consulted on a miss and written through on `put`.
+    It has the same `get`/`put` interface, so either can be handed to
+    `solve_with_timeout`.
+    """
+
+    def __init__(
+        self,
+        capacity: int = DEFAULT_MEMORY_CAPACITY,
+        ttl_seconds: float | None = None,
+        backing: "SolutionCache | None" = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if capacity < 1:
+            raise ValueError("Cache must hold at least one entry")
+        if ttl_seconds is not None and ttl_seconds <= 0:
+            raise ValueError("Cache TTL must be positive")
+        self.capacity = capacity
+        self.ttl_seconds = ttl_seconds
+        self.backing = backing
+        self._clock = clock
+        self._lock = threading.Lock()
+        # board -> (expires_at, {solver: solution})
+        self._entries: OrderedDict[tuple[int, ...], tuple[float | None, dict]] = OrderedDict()
+        self._stats = CacheStats()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return replace(self._stats)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def get(self, puzzle: str | list[int], solver: str | None = None) -> str | None:
+        """Cached solution of `puzzle`, or None; `solver=None` accepts any solver."""
+        key = _board_key(puzzle)
+        if key is None:
+            return None
+        with self._lock:
+            solutions = self._live_solutions(key)
+            if solver is None:
+                solution = next(iter(solutions.values()), None)
+            else:
+                solution = solutions.get(solver)
+            if solution is not None:
+                self._entries.move_to_end(key)
+                self._stats.hits += 1
+                return solution
+            self._stats.misses += 1
+
+        if self.backing is None:
+            return None
+        solution = self.backing.get(puzzle, solver)
+        # The backing cache does not say which solver an any-solver hit came
+        # from, so only hits for a named solver are kept here.
+        if solution is not None and solver is not None:
+            self._store(key, solution, solver)
+        return solution
+
+    def put(self, puzzle: str | list[int], solution: str | list[int], solver: str) -> None:
+        key = _board_key(puzzle)
+        if key is None:
+            return
+        if not isinstance(solution, str):
+            solution = format_board(solution)
+        self._store(key, solution, solver)
+        if self.backing is not None:
+            self.backing.put(puzzle, solution, solver)
+
+    def _live_solutions(self, key: tuple[int, ...]) -> dict:
+        entry = self._entries.get(key)
+        if entry is None:
+            return {}
+        expires_at, solutions = entry
+        if expires_at is not None and expires_at <= self._clock():
+            del self._entries[key]
+            self._stats.expirations += 1
+            return {}
+        return solutions
+
+    def _store(self, key: tuple[int, ...], solution: str, solver: str) -> None:
+        expires_at = None if self.ttl_seconds is None else self._clock() + self.ttl_seconds
+        with self._lock:
+            solutions = dict(self._live_solutions(key))
+            solutions[solver] = solution
+            self._entries[key] = (expires_at, solutions)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+                self._stats.evictions += 1
+
+
+def memoize(
+    solver_fn: Callable[[str | list[int]], SolverResult],
+    cache: "MemoryCache | SolutionCache",
+    solver_name: str | None = None,
+) -> Callable[[str | list[int]], SolverResult]:
+    """Wrap a `solve_*` function so boards already in `cache` skip the solver.
+
+    `solver_name` keys the entries and defaults to the function name without
+    its `solve_` prefix, e.g. "csp" for `solve_csp`.
+    """
+    name = solver_name or solver_fn.__name__.removeprefix("solve_")
+
+    @wraps(solver_fn)
+    def solve(board: str | list[int]) -> SolverResult:
+        start = time.perf_counter()
+        solution = cache.get(board, name)
+        if solution is not None:
+            return SolverResult(
+                solution=solution,
+                status="solved",
+                runtime_seconds=time.perf_counter() - start,
+                cached=True,
+            )
+        result = solver_fn(board)
+        if result.solved:
+            cache.put(board, result.solution, name)
+        return result
+
+    return solve
+
+
+def _board_key(puzzle: str | list[int]) -> tuple[int, ...] | None:
+    try:
+        values = parse_board(puzzle)
+    except ValueError:
+        return None
+    return tuple(values) if values else None
+
+
+def _cache_key(puzzle: str | list[int]) -> tuple[str, BoardTransform] | None:
+    try:
+        values = parse_board(puzzle)
+    except ValueError:
+        return None
+    # A complete board needs no solver, and complete grids are the slowest
+    # boards to canonicalize.
+    if not values or 0 not in values:
+        return None
+    return _canonical_key(tuple(values))
+
+
+@lru_cache(maxsize=256)
+def _canonical_key(values: tuple[int, ...]) -> tuple[str, BoardTransform]:
+    """Hash and transform of a board; a get followed by a put canonicalizes once."""
+    canonical, transform = canonical_form(list(values))
+    return hashlib.blake2b(bytes(canonical), digest_size=16).hexdigest(), transform
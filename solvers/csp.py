@@ -1,46 +1,49 @@
+from functools import lru_cache
 import time
 
 import board_utils
 from solvers.metrics import SolverResult
 
 
+@lru_cache(maxsize=None)
+def board_geometry(size: int) -> tuple[list, list, list, list]:
+    """Cell indices of each row, column and box, and the peers of each cell."""
+    _size, box_size = board_utils.validate_size(size)
+    rows = [[] for _ in range(size)]
+    cols = [[] for _ in range(size)]
+    boxes = [[] for _ in range(size)]
+    for cell in range(size * size):
+        row, col = divmod(cell, size)
+        rows[row].append(cell)
+        cols[col].append(cell)
+        boxes[(row // box_size) * box_size + col // box_size].append(cell)
+
+    peers = []
+    for cell in range(size * size):
+        row, col = divmod(cell, size)
+        box = (row // box_size) * box_size + col // box_size
+        peers.append((set(rows[row]) | set(cols[col]) | set(boxes[box])) - {cell})
+    return rows, cols, boxes, peers
+
+
 class CSPSolver:
     # Constructor and Setup
     def __init__(self, board):
         """Initialize a Sudoku board along with helper structures."""
         self.board = board_utils.parse_board(board)
         self.size, self.box_size = board_utils.board_size(self.board)
-        self.rows = [[] for _ in range(self.size)]
-        self.cols = [[] for _ in range(self.size)]
-        self.boxes = [[] for _ in range(self.size)]
-        self.peers = [set() for _ in range(self.size * self.size)]
+        # Houses and peers depend only on the size, so every board of that
+        # size shares one read-only copy.
+        self.rows, self.cols, self.boxes, self.peers = board_geometry(self.size)
         self.candidates = [set() for _ in range(self.size * self.size)]
         self.unassigned = set()
         self.assignments = 0
         self.backtracks = 0
         self.recursive_calls = 0
 
-        self.build_houses()
-        self.build_peers()
         self.build_candidates()
         self.build_unassigned()
 
-    def build_houses(self):
-        """Creates lists of cell indices for each row, column, and box."""
-        for cell in range(self.size * self.size):
-            row, col, box = self.index_to_coordinates(cell)
-            self.rows[row].append(cell)
-            self.cols[col].append(cell)
-            self.boxes[box].append(cell)
-
-    def build_peers(self):
-        """Creates for each cell a set of indices of neighboring cells in the same row, column, or box."""
-        for cell in range(self.size * self.size):
-            row, col, box = self.index_to_coordinates(cell)
-            self.peers[cell] = (
-                set(self.rows[row]) | set(self.cols[col]) | set(self.boxes[box])
-            ) - {cell}
-
     def build_candidates(self):
         """Creates a set of possible candidates for each cell if not already assigned."""
         digits = set(range(1, self.size + 1))
@@ -46,6 +46,7 @@ class DancingLinks:
             prev = col
 
         self.solution: list[Node] = []
+        self.first_solution: list[Node] | None = None
 
     def add_row(self, row_data: tuple[int, int, int], col_indices: list[int]) -> None:
         first: Node | None = None
@@ -155,6 +156,49 @@ class DancingLinks:
         self.uncover(col)
         return False
 
+    def count(self, limit: int) -> int:
+        """Like search, but keeps going until `limit` solutions are found.
+
+        The first solution's rows are kept in `first_solution`.
+        """
+        self.recursive_calls += 1
+
+        if self.header.right == self.header:
+            if self.first_solution is None:
+                self.first_solution = list(self.solution)
+            return 1
+
+        col = self.choose_column()
+        if col is None or col.size == 0:
+            return 0
+
+        self.cover(col)
+
+        found = 0
+        row = col.down
+        while row != col and found < limit:
+            self.solution.append(row)
+            self.assignments += 1
+
+            node = row.right
+            while node != row:
+                self.cover(node.column)
+                node = node.right
+
+            found += self.count(limit - found)
+
+            self.solution.pop()
+            self.backtracks += 1
+            node = row.left
+            while node != row:
+                self.uncover(node.column)
+                node = node.left
+
+            row = row.down
+
+        self.uncover(col)
+        return found
+
 
 def sudoku_exact_cover_columns(n: int) -> list[str]:
     cols: list[str] = []
@@ -220,6 +264,57 @@ def build_dlx(board: str | list[int]) -> tuple[DancingLinks, list[int], int, int
     return dlx, values, n, box
 
 
+def cover_givens(dlx: DancingLinks, values: list[int], n: int) -> bool:
+    """Select the row of every given; False if a given conflicts with an earlier one."""
+    for index, value in enumerate(values):
+        if value == 0:
+            continue
+        r, c = divmod(index, n)
+        given = (r, c, value)
+        col = dlx.columns[index]
+
+        target_node = None
+        row = col.down
+        while row != col:
+            if row.row_data == given:
+                target_node = row
+                break
+            row = row.down
+
+        if target_node is None:
+            return False
+
+        dlx.solution.append(target_node)
+        dlx.assignments += 1
+        node = target_node
+        while True:
+            dlx.cover(node.column)
+            node = node.right
+            if node == target_node:
+                break
+
+    return True
+
+
+def count_dlx_solutions(
+    board: str | list[int],
+    limit: int = 2,
+) -> tuple[int, list[int] | None]:
+    """Count solutions up to `limit`, returning the count and the first solution."""
+    dlx, values, n, _box = build_dlx(board)
+    if not cover_givens(dlx, values, n):
+        return 0, None
+    count = dlx.count(limit)
+    if dlx.first_solution is None:
+        return count, None
+
+    solved = [0] * (n * n)
+    for row_node in dlx.first_solution:
+        r, c, value = row_node.row_data
+        solved[r * n + c] = value
+    return count, solved
+
+
 def solve_dlx(board: str | list[int]) -> SolverResult:
     start = time.perf_counter()
     setup_seconds = None
@@ -248,47 +343,18 @@ def solve_dlx(board: str | list[int]) -> SolverResult:
             error=str(exc),
         )
 
-    givens: list[tuple[int, int, int]] = []
-    for r in range(n):
-        for c in range(n):
-            value = values[r * n + c]
-            if value != 0:
-                givens.append((r, c, value))
-
-    for given in givens:
-        r, c, value = given
-        cell_col_idx = r * n + c
-        col = dlx.columns[cell_col_idx]
-
-        target_node = None
-        row = col.down
-        while row != col:
-            if row.row_data == given:
-                target_node = row
-                break
-            row = row.down
-
-        if target_node is None:
-            return SolverResult(
-                solution=None,
-                status="failed",
-                runtime_seconds=time.perf_counter() - start,
-                setup_seconds=setup_seconds,
-                solve_seconds=solve_seconds,
-                backtracks=dlx.backtracks,
-                assignments=dlx.assignments,
-                recursive_calls=dlx.recursive_calls,
-                error="Given could not be matched in exact-cover matrix.",
-            )
-
-        dlx.solution.append(target_node)
-        dlx.assignments += 1
-        node = target_node
-        while True:
-            dlx.cover(node.column)
-            node = node.right
-            if node == target_node:
-                break
+    if not cover_givens(dlx, values, n):
+        return SolverResult(
+            solution=None,
+            status="failed",
+            runtime_seconds=time.perf_counter() - start,
+            setup_seconds=setup_seconds,
+            solve_seconds=solve_seconds,
+            backtracks=dlx.backtracks,
+            assignments=dlx.assignments,
+            recursive_calls=dlx.recursive_calls,
+            error="Given could not be matched in exact-cover matrix.",
+        )
 
     solve_start = time.perf_counter()
     solved = dlx.search()
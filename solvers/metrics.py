@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+import sys
 from typing import Literal
 
 
@@ -16,7 +17,21 @@ class SolverResult:
     assignments: int | None = None
     recursive_calls: int | None = None
     error: str | None = None
+    peak_rss_bytes: int | None = None
+    tracemalloc_peak_bytes: int | None = None
+    cached: bool = False
 
     @property
     def solved(self) -> bool:
         return self.status == "solved" and self.solution is not None
+
+
+def peak_rss_bytes() -> int | None:
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes.
+    return peak if sys.platform == "darwin" else peak * 1024
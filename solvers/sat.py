@@ -1,17 +1,18 @@
+from functools import lru_cache
 import time
+from typing import TYPE_CHECKING
 
-from pysat.card import CardEnc, EncType
-from pysat.formula import CNF, IDPool
-from pysat.solvers import Solver
-
-from board_utils import board_size, format_board, parse_board
+from board_utils import board_size, format_board, parse_board, solves_puzzle, validate_size
 from solvers.metrics import SolverResult
 
+if TYPE_CHECKING:
+    from pysat.formula import IDPool
+
 
 DEFAULT_SOLVER = "cadical153"
 
 
-def encode_sudoku_cnf(board: str | list[int]) -> tuple[CNF, IDPool, int]:
+def encode_sudoku_cnf(board: str | list[int]) -> tuple[list[list[int]], "IDPool", int]:
     """Encode an NxN Sudoku into CNF.
 
     This version supports boards such as 4x4, 9x9, 16x16, 25x25, and 100x100
@@ -19,11 +20,33 @@ def encode_sudoku_cnf(board: str | list[int]) -> tuple[CNF, IDPool, int]:
 
     Uses sequential-counter cardinality constraints instead of pairwise
     at-most-one clauses so the SAT model stays much smaller on large boards.
+    The rule clauses only depend on N and are built once per size; the
+    returned pool is shared between boards and must only be read. Clauses
+    come back as a plain list, which PySAT solvers accept directly and which
+    is far cheaper to build than a `CNF` object.
     """
     values = parse_board(board)
-    n, box = board_size(values)
+    n, _box = board_size(values)
+    rules, vpool = sudoku_rules_cnf(n)
 
-    cnf = CNF()
+    # Givens.
+    givens = []
+    for index, given in enumerate(values):
+        if given != 0:
+            r, c = divmod(index, n)
+            givens.append([vpool.id(("x", r, c, given))])
+
+    return rules + givens, vpool, n
+
+
+@lru_cache(maxsize=None)
+def sudoku_rules_cnf(n: int) -> tuple[list[list[int]], "IDPool"]:
+    """Clauses shared by every NxN Sudoku, and the pool naming their variables."""
+    from pysat.card import CardEnc, EncType
+    from pysat.formula import IDPool
+
+    _n, box = validate_size(n)
+    clauses: list[list[int]] = []
     vpool = IDPool()
 
     def var(r: int, c: int, value: int) -> int:
@@ -36,7 +59,7 @@ def encode_sudoku_cnf(board: str | list[int]) -> tuple[CNF, IDPool, int]:
             vpool=vpool,
             encoding=EncType.seqcounter,
         )
-        cnf.extend(enc.clauses)
+        clauses.extend(enc.clauses)
 
     # Each cell gets exactly one value.
     for r in range(n):
@@ -65,13 +88,115 @@ def encode_sudoku_cnf(board: str | list[int]) -> tuple[CNF, IDPool, int]:
                     ]
                 )
 
-    # Givens.
-    for index, given in enumerate(values):
-        if given != 0:
-            r, c = divmod(index, n)
-            cnf.append([var(r, c, given)])
+    return clauses, vpool
 
-    return cnf, vpool, n
+
+def decode_model(model: list[int], vpool: "IDPool", n: int) -> list[int]:
+    true_vars = {lit for lit in model if lit > 0}
+
+    solved: list[int] = []
+    for r in range(n):
+        for c in range(n):
+            found = None
+            for value in range(1, n + 1):
+                if vpool.id(("x", r, c, value)) in true_vars:
+                    found = value
+                    break
+            if found is None:
+                raise RuntimeError(f"Model missing assignment for cell ({r}, {c})")
+            solved.append(found)
+    return solved
+
+
+class SatSolutionCounter:
+    """Enumerate solutions of one board on a single live PySAT solver.
+
+    After each model a clause blocking that assignment of the non-given
+    cells is added and the same solver is asked again, so clauses learned
+    while finding earlier solutions are reused. Givens are unit clauses
+    already, so leaving them out keeps the blocking clauses short.
+    """
+
+    def __init__(self, board: str | list[int], solver_name: str = DEFAULT_SOLVER):
+        from pysat.solvers import Solver
+
+        values = parse_board(board)
+        cnf, self.vpool, self.n = encode_sudoku_cnf(values)
+        self.values = values
+        self.free_cells = [index for index, value in enumerate(values) if value == 0]
+        self.solutions: list[list[int]] = []
+        self.exhausted = False
+        self.solver = Solver(name=solver_name, bootstrap_with=cnf)
+
+    def __enter__(self) -> "SatSolutionCounter":
+        return self
+
+    def __exit__(self, *_exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.solver.delete()
+
+    def block(self, solution: list[int]) -> None:
+        """Rule out `solution`, e.g. a stored one, for every later search."""
+        if not self.free_cells:
+            self.exhausted = True
+            return
+        n = self.n
+        self.solver.add_clause(
+            [
+                -self.vpool.id(("x", cell // n, cell % n, solution[cell]))
+                for cell in self.free_cells
+            ]
+        )
+
+    def add_known(self, solution: list[int]) -> None:
+        """Count a solution found elsewhere and block it without searching for it.
+
+        Raises ValueError if `solution` does not solve the board, since
+        counting it would make a puzzle with no other solution look unique.
+        """
+        solution = parse_board(solution)
+        if not solves_puzzle(self.values, solution):
+            raise ValueError("Known solution does not solve the board")
+        self.solutions.append(solution)
+        self.block(solution)
+
+    def next_solution(self) -> list[int] | None:
+        if self.exhausted or not self.solver.solve():
+            self.exhausted = True
+            return None
+        solved = decode_model(self.solver.get_model(), self.vpool, self.n)
+        self.solutions.append(solved)
+        self.block(solved)
+        return solved
+
+    def count(self, limit: int = 2) -> int:
+        """Number of solutions, counting no further than `limit`."""
+        while len(self.solutions) < limit and self.next_solution() is not None:
+            pass
+        return min(len(self.solutions), limit)
+
+    def is_unique(self) -> bool:
+        return self.count(2) == 1
+
+
+def count_sat_solutions(
+    board: str | list[int],
+    limit: int = 2,
+    solver_name: str = DEFAULT_SOLVER,
+    known: list[int] | None = None,
+) -> tuple[int, list[int] | None]:
+    """Count solutions up to `limit`, returning the count and the first solution.
+
+    A `known` solution is counted without a search, so a uniqueness check of
+    a puzzle with a stored solution needs a single (UNSAT) solve.
+    """
+    with SatSolutionCounter(board, solver_name) as counter:
+        if known is not None:
+            counter.add_known(known)
+        count = counter.count(limit)
+        return count, counter.solutions[0] if counter.solutions else None
 
 
 def solve_sudoku(
@@ -86,13 +211,12 @@ def solve_sudoku(
     solve_seconds = None
 
     try:
+        from pysat.solvers import Solver
+
         setup_start = time.perf_counter()
         cnf, vpool, n = encode_sudoku_cnf(board)
         setup_seconds = time.perf_counter() - setup_start
 
-        def var(r: int, c: int, value: int) -> int:
-            return vpool.id(("x", r, c, value))
-
         solve_start = time.perf_counter()
         with Solver(name=solver_name, bootstrap_with=cnf) as solver:
             sat_result = solver.solve()
@@ -109,22 +233,8 @@ def solve_sudoku(
                 error="Sudoku is UNSAT.",
             )
 
-        true_vars = {lit for lit in model if lit > 0}
-
-        solved: list[int] = []
-        for r in range(n):
-            for c in range(n):
-                found = None
-                for value in range(1, n + 1):
-                    if var(r, c, value) in true_vars:
-                        found = value
-                        break
-                if found is None:
-                    raise RuntimeError(f"Model missing assignment for cell ({r}, {c})")
-                solved.append(found)
-
         return SolverResult(
-            solution=format_board(solved),
+            solution=format_board(decode_model(model, vpool, n)),
             status="solved",
             runtime_seconds=time.perf_counter() - start,
             setup_seconds=setup_seconds,
@@ -1,7 +1,5 @@
 import time
 
-from z3 import sat
-
 from board_utils import format_board
 from generator import build_z3_sudoku_solver
 from solvers.metrics import SolverResult
@@ -13,6 +11,8 @@ def solve_smt(board: str | list[int]) -> SolverResult:
     solve_seconds = None
 
     try:
+        from z3 import sat
+
         setup_start = time.perf_counter()
         solver, cells, _values, n, _box = build_z3_sudoku_solver(board)
         setup_seconds = time.perf_counter() - setup_start
@@ -1,7 +1,8 @@
 from collections.abc import Iterator
 from contextlib import contextmanager
 from pathlib import Path
-from unittest.mock import patch
+
+from config import override_config
 
 
 def write_config(
@@ -57,5 +58,5 @@ def temporary_config(
         solver_timeout_seconds=solver_timeout_seconds,
         clue_percent_ranges=clue_percent_ranges,
     )
-    with patch("config.CONFIG_PATH", config_path):
+    with override_config(config_path):
         yield config_path
@@ -0,0 +1,89 @@
+import os
+import time
+import unittest
+from unittest.mock import patch
+
+from benchmark import solve_many
+from generator import generate_puzzle
+from solvers.csp import solve_csp
+
+
+PUZZLES = [generate_puzzle(4, 6, seed=seed).puzzle for seed in range(8)]
+SLOW = "slow"
+CRASH = "crash"
+
+
+def flaky_solver(puzzle):
+    if puzzle == SLOW:
+        time.sleep(10)
+    if puzzle == CRASH:
+        os._exit(3)
+    return solve_csp(puzzle)
+
+
+class SolveManyTests(unittest.TestCase):
+    def test_results_match_serial_solves_in_input_order(self):
+        expected = [solve_csp(puzzle).solution for puzzle in PUZZLES]
+
+        inline = [result.solution for result in solve_many(PUZZLES)]
+        pooled = [result.solution for result in solve_many(PUZZLES, solver="csp", jobs=2)]
+
+        self.assertEqual(inline, expected)
+        self.assertEqual(pooled, expected)
+
+    def test_unordered_results_carry_their_input_index(self):
+        results = dict(solve_many(PUZZLES, jobs=2, ordered=False, with_index=True))
+
+        self.assertEqual(sorted(results), list(range(len(PUZZLES))))
+        for index, result in results.items():
+            self.assertEqual(result.solution, solve_csp(PUZZLES[index]).solution)
+
+    def test_timeout_and_crash_replace_the_worker(self):
+        puzzles = [PUZZLES[0], SLOW, PUZZLES[1], CRASH, PUZZLES[2]]
+
+        results = list(solve_many(puzzles, solver=flaky_solver, jobs=1, timeout=0.5))
+
+        self.assertEqual(
+            [result.status for result in results],
+            ["solved", "timeout", "solved", "error", "solved"],
+        )
+        self.assertIn("Timed out", results[1].error)
+        self.assertIn("exited with code 3", results[3].error)
+
+    def test_heartbeat_runs_while_waiting_on_a_slow_solve(self):
+        beats = []
+
+        with patch("benchmark.batch.HEARTBEAT_SECONDS", 0.05):
+            results = list(
+                solve_many(
+                    [SLOW],
+                    solver=flaky_solver,
+                    timeout=0.5,
+                    heartbeat=lambda: beats.append(1),
+                )
+            )
+
+        self.assertEqual(results[0].status, "timeout")
+        self.assertGreaterEqual(len(beats), 5)
+
+    def test_input_is_consumed_only_as_workers_free_up(self):
+        consumed = []
+
+        def puzzles():
+            for index in range(1000):
+                consumed.append(index)
+                yield PUZZLES[index % len(PUZZLES)]
+
+        results = solve_many(puzzles(), jobs=2)
+        next(results)
+        results.close()
+
+        self.assertLess(len(consumed), 20)
+
+    def test_rejects_unknown_solver(self):
+        with self.assertRaises(ValueError):
+            solve_many(PUZZLES, solver="nope")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,16 +1,18 @@
 import contextlib
 import csv
 import io
+import json
 from pathlib import Path
 import tempfile
 import time
 import unittest
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
+from benchmark import history as history_module
 from benchmark import runner as benchmark_module
 from benchmark import visualization as benchmark_visualization
 from generator import generate_dataset_records, write_dataset_records
-from solvers.metrics import SolverResult
+from solvers.metrics import SolverResult, peak_rss_bytes
 from tests.config_helpers import temporary_config
 
 
@@ -60,7 +62,7 @@ class BenchmarkTests(unittest.TestCase):
                 runtime_seconds=0.001,
             )
 
-        with patch("benchmark.runner.read_dataset", return_value=[record]):
+        with patch("benchmark.runner.iter_dataset", return_value=iter([record])):
             with patch(
                 "benchmark.runner.SOLVERS",
                 {"naive": fake_solver},
@@ -90,13 +92,17 @@ class BenchmarkTests(unittest.TestCase):
                     )
 
                 output = io.StringIO()
+                scratch = Path(root) / "scratch"
+                scratch.mkdir()
                 with patch(
                     "benchmark.runner.SOLVERS",
                     {"fake": fake_solver},
-                ):
+                ), patch("tempfile.tempdir", str(scratch)):
                     with contextlib.redirect_stdout(output):
                         result = benchmark_module.benchmark_dataset(path, 4, write_csv=False)
+                leftovers = list(scratch.iterdir())
 
+        self.assertEqual(leftovers, [])
         self.assertIn("Puzzles Tested: 1", output.getvalue())
         self.assertIn("fake=0.0010s", output.getvalue())
         self.assertEqual(result["puzzle_index"].nunique(), 1)
@@ -238,6 +244,283 @@ class BenchmarkTests(unittest.TestCase):
         self.assertEqual(summary_rows[0]["solver"], "fake")
         self.assertEqual(summary_rows[0]["solved"], "1")
         self.assertEqual(summary_rows[0]["tested"], "1")
+        self.assertIn("Run recorded in benchmark history as #1", output.getvalue())
+
+    def test_parallel_benchmark_keeps_order_and_marks_run_contended(self):
+        records = generate_dataset_records(4, "easy", 6, seed=123, verify=False)
+
+        with tempfile.TemporaryDirectory() as root:
+            with temporary_config(
+                root,
+                datasets_dir=root,
+                benchmark_results_dir=Path(root) / "results",
+            ):
+                path = write_dataset_records(records, size=4, difficulty="easy")
+                with contextlib.redirect_stdout(io.StringIO()):
+                    result = benchmark_module.benchmark_dataset(
+                        path,
+                        4,
+                        write_csv=True,
+                        solver_names=["csp"],
+                        jobs=2,
+                    )
+                connection = history_module.connect_history()
+                host = json.loads(connection.execute("SELECT host FROM runs").fetchone()[0])
+                connection.close()
+
+        self.assertEqual(result["puzzle_index"].tolist(), list(range(1, 7)))
+        self.assertEqual(set(result["status"]), {"solved"})
+        self.assertEqual((host["jobs"], host["contended"]), (2, True))
+
+    def test_benchmark_dataset_streams_rows_before_run_finishes(self):
+        records = generate_dataset_records(4, "easy", 2, seed=123, verify=False)
+
+        with tempfile.TemporaryDirectory() as root:
+            with temporary_config(
+                root,
+                datasets_dir=root,
+                benchmark_results_dir=Path(root) / "results",
+            ):
+                dataset_path_for_test = write_dataset_records(records, 4, "easy")
+                csv_path, _summary_path = benchmark_module.result_paths(
+                    dataset_path_for_test
+                )
+                calls = []
+
+                def interrupting_solver(puzzle):
+                    calls.append(puzzle)
+                    if len(calls) == 2:
+                        raise KeyboardInterrupt
+                    return SolverResult(
+                        solution=records[0]["solution"],
+                        status="solved",
+                        runtime_seconds=0.001,
+                    )
+
+                with patch(
+                    "benchmark.runner.solve_with_timeout",
+                    side_effect=lambda fn, puzzle, **_kwargs: fn(puzzle),
+                ):
+                    with patch("benchmark.runner.SOLVERS", {"fake": interrupting_solver}):
+                        with contextlib.redirect_stdout(io.StringIO()):
+                            with self.assertRaises(KeyboardInterrupt):
+                                benchmark_module.benchmark_dataset(
+                                    dataset_path_for_test,
+                                    4,
+                                    write_csv=True,
+                                )
+
+                with open(csv_path, newline="", encoding="utf-8") as f:
+                    rows = list(csv.DictReader(f))
+
+        self.assertEqual([row["puzzle_index"] for row in rows], ["1"])
+        self.assertEqual(rows[0]["solver"], "fake")
+
+    def test_benchmark_dataset_resume_skips_completed_pairs(self):
+        records = generate_dataset_records(4, "easy", 2, seed=123, verify=False)
+
+        with tempfile.TemporaryDirectory() as root:
+            with temporary_config(
+                root,
+                datasets_dir=root,
+                benchmark_results_dir=Path(root) / "results",
+            ):
+                dataset_path_for_test = write_dataset_records(records, 4, "easy")
+                csv_path, _summary_path = benchmark_module.result_paths(
+                    dataset_path_for_test
+                )
+                solved = []
+
+                def fake_solver(puzzle):
+                    solved.append(puzzle)
+                    return SolverResult(
+                        solution=records[0]["solution"],
+                        status="solved",
+                        runtime_seconds=0.001,
+                    )
+
+                with patch("benchmark.runner.SOLVERS", {"fake": fake_solver}):
+                    with patch(
+                        "benchmark.runner.solve_with_timeout",
+                        side_effect=lambda fn, puzzle, **_kwargs: fn(puzzle),
+                    ):
+                        with contextlib.redirect_stdout(io.StringIO()):
+                            benchmark_module.benchmark_dataset(
+                                dataset_path_for_test,
+                                4,
+                                write_csv=True,
+                            )
+                        with open(csv_path, encoding="utf-8") as f:
+                            lines = f.readlines()
+                        # Simulate a crash after the first row and midway
+                        # through writing the second.
+                        csv_path.write_text(
+                            "".join(lines[:2]) + lines[2][:10],
+                            encoding="utf-8",
+                        )
+                        solved.clear()
+
+                        output = io.StringIO()
+                        with contextlib.redirect_stdout(output):
+                            result = benchmark_module.benchmark_dataset(
+                                dataset_path_for_test,
+                                4,
+                                write_csv=True,
+                                resume=True,
+                            )
+
+                with open(csv_path, newline="", encoding="utf-8") as f:
+                    rows = list(csv.DictReader(f))
+
+        self.assertEqual(solved, [records[1]["puzzle"]])
+        self.assertIn("fake=DONE", output.getvalue())
+        self.assertEqual([row["puzzle_index"] for row in rows], ["1", "2"])
+        self.assertEqual(result["puzzle_index"].tolist(), [1, 2])
+        self.assertTrue(result["solution_found"].all())
+
+    def test_run_child_closes_pipe_when_start_fails(self):
+        receiver, sender = MagicMock(), MagicMock()
+        context = MagicMock()
+        context.Pipe.return_value = (receiver, sender)
+        context.Process.return_value.start.side_effect = OSError("fork failed")
+
+        with self.assertRaises(OSError):
+            benchmark_module._run_child(context, crashing_solver, (), 1)
+
+        receiver.close.assert_called_once_with()
+        sender.close.assert_called_once_with()
+
+    def test_solve_with_timeout_can_measure_memory(self):
+        from solvers.csp import solve_csp
+
+        puzzle = "1 0 3 0 0 4 0 2 2 0 4 0 0 3 0 1"
+        plain = benchmark_module.solve_with_timeout(solve_csp, puzzle)
+        measured = benchmark_module.solve_with_timeout(
+            solve_csp,
+            puzzle,
+            measure_memory=True,
+        )
+
+        self.assertIsNone(plain.tracemalloc_peak_bytes)
+        self.assertTrue(measured.solved)
+        self.assertGreater(measured.tracemalloc_peak_bytes, 0)
+        # Growth over the solve alone, not the parent's high-water mark.
+        self.assertGreaterEqual(measured.peak_rss_bytes, 0)
+        self.assertLess(measured.peak_rss_bytes, peak_rss_bytes())
+
+    def test_summary_reports_memory_averages(self):
+        rows = [
+            {
+                "puzzle_index": index,
+                "solver_name": "csp",
+                "result": SolverResult(
+                    solution="1234",
+                    status="solved",
+                    runtime_seconds=0.001,
+                    peak_rss_bytes=rss_mb * 1024 * 1024,
+                    tracemalloc_peak_bytes=1024 * 1024,
+                ),
+            }
+            for index, rss_mb in ((1, 10), (2, 30))
+        ]
+        table = benchmark_module.results_dataframe(rows)
+        summary = benchmark_module.summary_dataframe(table)
+
+        self.assertEqual(summary["peak_rss_avg_mb"].tolist(), [20.0])
+        self.assertEqual(summary["peak_rss_max_mb"].tolist(), [30.0])
+        self.assertEqual(summary["tracemalloc_peak_avg_mb"].tolist(), [1.0])
+
+    def test_benchmark_dataset_profiles_sampled_solves(self):
+        from solvers.csp import solve_csp
+
+        records = generate_dataset_records(4, "easy", 3, seed=123, verify=False)
+
+        with tempfile.TemporaryDirectory() as root:
+            with temporary_config(
+                root,
+                datasets_dir=root,
+                benchmark_results_dir=Path(root) / "results",
+            ):
+                dataset_path_for_test = write_dataset_records(records, 4, "easy")
+                profiles = Path(root) / "results" / "data" / "4x4_easy_3_profiles"
+                profiles.mkdir(parents=True)
+                # Left by an earlier run over a longer dataset.
+                (profiles / "csp_000009.pstats").write_bytes(b"stale")
+                output = io.StringIO()
+                with patch(
+                    "benchmark.runner.SOLVERS",
+                    {"csp": solve_csp, "dlx": solve_csp},
+                ):
+                    with contextlib.redirect_stdout(output):
+                        benchmark_module.benchmark_dataset(
+                            dataset_path_for_test,
+                            4,
+                            profile_solvers=["csp"],
+                            profile_every=2,
+                        )
+
+                names = sorted(path.name for path in profiles.iterdir())
+                collapsed = (profiles / "csp_combined.collapsed").read_text(
+                    encoding="utf-8"
+                )
+
+        self.assertEqual(
+            names,
+            [
+                "csp_000001.collapsed",
+                "csp_000001.pstats",
+                "csp_000003.collapsed",
+                "csp_000003.pstats",
+                "csp_combined.collapsed",
+                "csp_combined.pstats",
+            ],
+        )
+        self.assertIn("Top 10 functions for csp", output.getvalue())
+        self.assertIn("solve_csp", collapsed)
+        self.assertIn("(assign)", collapsed)
+
+    def test_benchmark_dataset_can_run_one_shard(self):
+        from generator import write_sharded_dataset
+
+        records = generate_dataset_records(4, "easy", 5, seed=123, verify=False)
+
+        with tempfile.TemporaryDirectory() as root:
+            with temporary_config(
+                root,
+                datasets_dir=root,
+                benchmark_results_dir=Path(root) / "results",
+            ):
+                directory = write_sharded_dataset(records, 4, "easy", shards=2)
+                solved = []
+
+                def fake_solver(puzzle):
+                    solved.append(puzzle)
+                    return SolverResult(
+                        solution=records[0]["solution"],
+                        status="solved",
+                        runtime_seconds=0.001,
+                    )
+
+                with patch("benchmark.runner.SOLVERS", {"fake": fake_solver}):
+                    with patch(
+                        "benchmark.runner.solve_with_timeout",
+                        side_effect=lambda fn, puzzle, **_kwargs: fn(puzzle),
+                    ):
+                        with contextlib.redirect_stdout(io.StringIO()):
+                            result = benchmark_module.benchmark_dataset(
+                                directory,
+                                4,
+                                write_csv=True,
+                                shard=1,
+                            )
+
+            csv_path = (
+                Path(root) / "results" / "data" / "4x4_easy_5_shard00001_results.csv"
+            )
+            self.assertTrue(csv_path.exists())
+
+        self.assertEqual(solved, [record["puzzle"] for record in records[3:]])
+        self.assertEqual(result["puzzle_index"].tolist(), [4, 5])
 
     def test_visualization_menu_uses_returned_benchmark_data(self):
         result = benchmark_module.results_dataframe(
@@ -293,6 +576,8 @@ class BenchmarkTests(unittest.TestCase):
             4,
             write_csv=False,
             solver_names=["csp"],
+            resume=False,
+            measure_memory=False,
         )
         self.assertIs(result, results_table)
 
@@ -301,7 +586,7 @@ class BenchmarkTests(unittest.TestCase):
 
         results_table = object()
 
-        with patch("builtins.input", side_effect=["4", "5"]):
+        with patch("builtins.input", side_effect=["4", "6"]):
             with patch("main.os.system"):
                 with patch("main.benchmark_menu", return_value=results_table):
                     with patch("main.visualization_menu") as visualization:
@@ -310,5 +595,110 @@ class BenchmarkTests(unittest.TestCase):
         visualization.assert_called_once_with(results_table)
 
 
+def write_results_csv(path, runtimes, solver="csp", size=9, status="solved"):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=history_module.CSV_FIELDS)
+        writer.writeheader()
+        for index, runtime in enumerate(runtimes, start=1):
+            writer.writerow(
+                {
+                    "size": size,
+                    "puzzle_index": index,
+                    "solver": solver,
+                    "status": status,
+                    "runtime_seconds": runtime,
+                    "solution_found": status == "solved",
+                }
+            )
+
+
+class BenchmarkHistoryTests(unittest.TestCase):
+    def test_record_run_stores_metadata_and_rows(self):
+        with tempfile.TemporaryDirectory() as root:
+            with temporary_config(root, benchmark_results_dir=root):
+                csv_path = Path(root) / "results.csv"
+                write_results_csv(csv_path, [0.1, 0.2])
+                run_id = history_module.record_run(
+                    csv_path,
+                    "data/datasets/9x9_easy_2.jsonl",
+                    solver_names=["csp"],
+                    variant="baseline",
+                )
+                runs = history_module.list_runs()
+
+            self.assertTrue((Path(root) / history_module.HISTORY_FILENAME).exists())
+
+        self.assertEqual(run_id, 1)
+        self.assertEqual(runs[0]["dataset"], "9x9_easy_2.jsonl")
+        self.assertEqual(runs[0]["solvers"], "csp")
+        self.assertEqual(runs[0]["variant"], "baseline")
+
+    def test_compare_runs_flags_significant_slowdown_only(self):
+        with tempfile.TemporaryDirectory() as root:
+            with temporary_config(root, benchmark_results_dir=root):
+                baseline_csv = Path(root) / "baseline.csv"
+                slower_csv = Path(root) / "slower.csv"
+                noisy_csv = Path(root) / "noisy.csv"
+                write_results_csv(baseline_csv, [0.010 + i * 0.0001 for i in range(30)])
+                write_results_csv(slower_csv, [0.020 + i * 0.0001 for i in range(30)])
+                write_results_csv(noisy_csv, [0.010 + i * 0.0001 for i in range(29, -1, -1)])
+                baseline = history_module.record_run(baseline_csv, "9x9_easy_30.jsonl")
+                slower = history_module.record_run(slower_csv, "9x9_easy_30.jsonl")
+                noisy = history_module.record_run(noisy_csv, "9x9_easy_30.jsonl")
+
+                regressed = history_module.compare_runs(baseline, slower)
+                unchanged = history_module.compare_runs(baseline, noisy)
+
+        self.assertEqual(len(regressed), 1)
+        self.assertEqual((regressed[0].solver, regressed[0].size), ("csp", 9))
+        self.assertTrue(regressed[0].regressed)
+        self.assertLess(regressed[0].p_value, 0.001)
+        self.assertFalse(unchanged[0].regressed)
+
+    def test_compare_runs_counts_timeouts_apart_from_runtimes(self):
+        with tempfile.TemporaryDirectory() as root:
+            with temporary_config(root, benchmark_results_dir=root):
+                baseline_csv = Path(root) / "baseline.csv"
+                candidate_csv = Path(root) / "candidate.csv"
+                write_results_csv(baseline_csv, [0.010] * 5)
+                write_results_csv(candidate_csv, [5.0] * 3, status="timeout")
+                with open(candidate_csv, "a", newline="", encoding="utf-8") as f:
+                    csv.DictWriter(f, fieldnames=history_module.CSV_FIELDS).writerows(
+                        {"size": 9, "solver": "csp", "status": "solved", "runtime_seconds": 0.010}
+                        for _ in range(2)
+                    )
+                baseline = history_module.record_run(baseline_csv, "9x9_easy_5.jsonl")
+                candidate = history_module.record_run(candidate_csv, "9x9_easy_5.jsonl")
+
+                (comparison,) = history_module.compare_runs(baseline, candidate)
+
+        self.assertEqual((comparison.baseline_samples, comparison.candidate_samples), (5, 2))
+        self.assertEqual((comparison.baseline_timeouts, comparison.candidate_timeouts), (0, 3))
+        self.assertEqual(comparison.candidate_median_s, 0.010)
+
+    def test_compare_runs_refuses_mixed_contention_unless_allowed(self):
+        with tempfile.TemporaryDirectory() as root:
+            with temporary_config(root, benchmark_results_dir=root):
+                csv_path = Path(root) / "results.csv"
+                write_results_csv(csv_path, [0.010] * 5)
+                isolated = history_module.record_run(csv_path, "9x9_easy_5.jsonl")
+                contended = history_module.record_run(csv_path, "9x9_easy_5.jsonl", jobs=2)
+
+                with self.assertRaisesRegex(ValueError, "contended"):
+                    history_module.compare_runs(isolated, contended)
+                allowed = history_module.compare_runs(
+                    isolated, contended, allow_host_mismatch=True
+                )
+
+        self.assertEqual(len(allowed), 1)
+
+    def test_mann_whitney_handles_identical_samples(self):
+        self.assertEqual(history_module.mann_whitney_greater([1.0] * 5, [1.0] * 5), 1.0)
+        self.assertGreater(
+            history_module.mann_whitney_greater([1.0, 2.0], [1.0, 2.0]),
+            0.05,
+        )
+
+
 if __name__ == "__main__":
     unittest.main()
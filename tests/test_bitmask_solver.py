@@ -0,0 +1,52 @@
+import random
+import unittest
+
+from board_utils import parse_board
+from generator import generate_pattern_solution, verify_puzzle
+from solvers.bitmask import count_solutions, dig_unique_puzzle, solve_bitmask
+
+
+SOLVED_4X4 = "1 2 3 4 3 4 1 2 2 1 4 3 4 3 2 1"
+
+
+class BitmaskSolverTests(unittest.TestCase):
+    def test_solves_4x4_puzzle(self):
+        result = solve_bitmask("1 0 3 0 0 4 0 2 2 0 4 0 0 3 0 1")
+
+        self.assertTrue(result.solved)
+        self.assertEqual(result.solution, SOLVED_4X4)
+
+    def test_counts_solutions_up_to_limit(self):
+        self.assertEqual(count_solutions(SOLVED_4X4), 1)
+        self.assertEqual(count_solutions([0] * 16), 2)
+        self.assertEqual(count_solutions([0] * 16, limit=1000), 288)
+
+    def test_contradictory_givens_have_no_solution(self):
+        puzzle = parse_board(SOLVED_4X4)
+        puzzle[1] = puzzle[0]
+
+        self.assertEqual(count_solutions(puzzle), 0)
+        self.assertEqual(solve_bitmask(puzzle).status, "failed")
+
+    def test_solves_36x36_without_recursion_limit(self):
+        solution = parse_board(generate_pattern_solution(36, seed=5))
+        puzzle = solution.copy()
+        for index in range(0, len(puzzle), 5):
+            puzzle[index] = 0
+
+        result = solve_bitmask(puzzle)
+
+        self.assertEqual(parse_board(result.solution), solution)
+
+    def test_dug_puzzles_are_unique(self):
+        for seed in range(3):
+            solution = parse_board(generate_pattern_solution(9, seed=seed))
+            puzzle = dig_unique_puzzle(solution, 0, random.Random(seed))
+
+            self.assertLess(sum(1 for value in puzzle if value), 40)
+            self.assertEqual(count_solutions(puzzle), 1)
+            self.assertTrue(verify_puzzle(puzzle, mode="unique").valid)
+
+
+if __name__ == "__main__":
+    unittest.main()
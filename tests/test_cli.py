@@ -0,0 +1,173 @@
+import contextlib
+import io
+import json
+from pathlib import Path
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import cli
+from config import load_config
+from generator import read_dataset
+from tests.config_helpers import temporary_config
+
+
+class CliTests(unittest.TestCase):
+    def test_generate_and_verify_write_requested_outputs(self):
+        with tempfile.TemporaryDirectory() as root:
+            dataset = Path(root) / "out" / "4x4_easy_3.jsonl"
+            summary = Path(root) / "summary.json"
+            with contextlib.redirect_stdout(io.StringIO()):
+                generated = cli.main(
+                    [
+                        "generate",
+                        "--size",
+                        "4",
+                        "--difficulty",
+                        "easy",
+                        "--count",
+                        "3",
+                        "--seed",
+                        "7",
+                        "--output",
+                        str(dataset),
+                    ]
+                )
+                verified = cli.main(
+                    ["verify", str(dataset), "--mode", "unique", "--output", str(summary)]
+                )
+
+            records = read_dataset(dataset, expected_size=4)
+            written = json.loads(summary.read_text(encoding="utf-8"))
+
+        self.assertEqual(generated, 0)
+        self.assertEqual(verified, 0)
+        self.assertEqual(len(records), 3)
+        self.assertEqual(written["mode"], "unique")
+        self.assertEqual(written["total"], 3)
+
+    def test_bench_passes_every_option_through(self):
+        with patch("benchmark.benchmark_dataset", return_value=object()) as run:
+            status = cli.main(
+                [
+                    "bench",
+                    "data/datasets/9x9_easy_10.jsonl",
+                    "--solver",
+                    "csp",
+                    "--solver",
+                    "dlx",
+                    "--jobs",
+                    "4",
+                    "--timeout",
+                    "2.5",
+                    "--csv",
+                    "--results-dir",
+                    "out",
+                    "--resume",
+                    "--variant",
+                    "nightly",
+                    "--memory",
+                    "--profile",
+                    "csp",
+                    "--profile-every",
+                    "10",
+                ]
+            )
+
+        self.assertEqual(status, 0)
+        run.assert_called_once_with(
+            Path("data/datasets/9x9_easy_10.jsonl"),
+            9,
+            write_csv=True,
+            solver_names=["csp", "dlx"],
+            resume=True,
+            variant="nightly",
+            measure_memory=True,
+            profile_solvers=["csp"],
+            profile_every=10,
+            jobs=4,
+            timeout_seconds=2.5,
+            results_dir=Path("out"),
+            shard=None,
+        )
+
+    def test_solve_prints_json_result(self):
+        output = io.StringIO()
+        with tempfile.TemporaryDirectory() as root:
+            with temporary_config(root):
+                with contextlib.redirect_stdout(output):
+                    status = cli.main(
+                        ["solve", "1 0 3 0 0 4 0 2 2 0 4 0 0 3 0 1", "--json"]
+                    )
+
+        result = json.loads(output.getvalue())
+        self.assertEqual(status, 0)
+        self.assertEqual(result["status"], "solved")
+        self.assertEqual(result["solution"], "1 2 3 4 3 4 1 2 2 1 4 3 4 3 2 1")
+
+    def test_stream_solves_raw_and_record_lines_in_order(self):
+        puzzle = "1 0 3 0 0 4 0 2 2 0 4 0 0 3 0 1"
+        lines = [
+            puzzle,
+            "",
+            json.dumps({"id": 7, "puzzle": puzzle.replace(" ", "")}),
+            "not a puzzle",
+        ]
+        output = io.StringIO()
+        error = io.StringIO()
+        with patch("sys.stdin", io.StringIO("\n".join(lines) + "\n")):
+            with contextlib.redirect_stdout(output), contextlib.redirect_stderr(error):
+                status = cli.main(["stream", "--jobs", "2", "--ordered"])
+
+        results = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual(status, 1)
+        self.assertEqual([result["index"] for result in results], [0, 1, 2])
+        self.assertEqual([result["id"] for result in results], [None, 7, None])
+        self.assertEqual(
+            [result["status"] for result in results],
+            ["solved", "solved", "error"],
+        )
+        self.assertIn("3 puzzles (2 solved)", error.getvalue())
+
+    def test_stream_defaults_to_configured_timeout(self):
+        with tempfile.TemporaryDirectory() as root:
+            with temporary_config(root):
+                with patch("sys.stdin", io.StringIO("")):
+                    with patch("benchmark.solve_many", return_value=iter([])) as solve_many:
+                        with contextlib.redirect_stderr(io.StringIO()):
+                            cli.main(["stream"])
+                expected = load_config()["benchmark"]["solver_timeout_seconds"]
+
+        self.assertEqual(solve_many.call_args.kwargs["timeout"], expected)
+
+    def test_invalid_arguments_are_rejected(self):
+        for argv in (
+            ["generate", "--size", "10", "--difficulty", "easy", "--count", "1"],
+            ["bench", "x.jsonl", "--jobs", "0"],
+            [
+                "generate",
+                "--size",
+                "4",
+                "--difficulty",
+                "easy",
+                "--count",
+                "1",
+                "--verify",
+                "--unique",
+            ],
+        ):
+            with contextlib.redirect_stderr(io.StringIO()):
+                with self.assertRaises(SystemExit):
+                    cli.main(argv)
+
+    def test_unparseable_dataset_name_reports_error(self):
+        error = io.StringIO()
+        with contextlib.redirect_stderr(error):
+            status = cli.main(["bench", "results.jsonl"])
+
+        self.assertEqual(status, 2)
+        self.assertIn("Cannot determine dataset size", error.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,10 @@
 from pathlib import Path
 import tempfile
 import unittest
+from unittest.mock import patch
 
-from config import load_config
+import config as config_module
+from config import load_config, override_config, reload_config
 from tests.config_helpers import write_config
 
 
@@ -77,5 +79,57 @@ class ConfigTests(unittest.TestCase):
                 load_config(Path(root) / "config.toml")
 
 
+class ConfigCacheTests(unittest.TestCase):
+    def test_load_config_reuses_parsed_config_until_file_changes(self):
+        with tempfile.TemporaryDirectory() as root:
+            config_path = write_config(
+                root,
+                datasets_dir=Path(root) / "datasets",
+                benchmark_results_dir=Path(root) / "results",
+            )
+            with patch("config.tomllib.load", wraps=config_module.tomllib.load) as parse:
+                first = load_config(config_path)
+                second = load_config(config_path)
+                write_config(
+                    root,
+                    datasets_dir=Path(root) / "datasets",
+                    benchmark_results_dir=Path(root) / "results",
+                    solver_timeout_seconds=125,
+                )
+                changed = load_config(config_path)
+
+        self.assertIs(first, second)
+        self.assertEqual(parse.call_count, 2)
+        self.assertEqual(changed["benchmark"]["solver_timeout_seconds"], 125.0)
+
+    def test_reload_config_forces_a_fresh_read(self):
+        with tempfile.TemporaryDirectory() as root:
+            config_path = write_config(
+                root,
+                datasets_dir=Path(root) / "datasets",
+                benchmark_results_dir=Path(root) / "results",
+            )
+            first = load_config(config_path)
+            reloaded = reload_config(config_path)
+
+        self.assertIsNot(first, reloaded)
+        self.assertEqual(first, reloaded)
+
+    def test_override_config_changes_default_path_temporarily(self):
+        default_path = config_module.CONFIG_PATH
+        with tempfile.TemporaryDirectory() as root:
+            config_path = write_config(
+                root,
+                datasets_dir=Path(root) / "datasets",
+                benchmark_results_dir=Path(root) / "results",
+            )
+            with override_config(config_path):
+                overridden = load_config()
+
+        self.assertEqual(overridden["paths"]["datasets_dir"], str(Path(root) / "datasets"))
+        self.assertEqual(config_module.CONFIG_PATH, default_path)
+        self.assertEqual(load_config()["paths"]["datasets_dir"], "data/datasets")
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,40 @@
+from concurrent.futures import ThreadPoolExecutor
+import unittest
+
+from parallel import bounded_map
+
+
+def square(value):
+    return value * value
+
+
+class BoundedMapTests(unittest.TestCase):
+    def test_results_keep_input_order(self):
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            pairs = list(bounded_map(executor, square, range(20), 4))
+
+        self.assertEqual(pairs, [(value, value * value) for value in range(20)])
+        self.assertEqual(list(bounded_map(None, square, [3, 1], 1)), [(3, 9), (1, 1)])
+
+    def test_input_is_read_only_as_results_are_taken(self):
+        consumed = []
+
+        def items():
+            for value in range(100):
+                consumed.append(value)
+                yield value
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            results = bounded_map(executor, square, items(), 3)
+            next(results)
+
+            self.assertEqual(len(consumed), 3)
+            results.close()
+
+    def test_in_flight_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            next(bounded_map(None, square, [1], 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
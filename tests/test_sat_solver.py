@@ -0,0 +1,49 @@
+import unittest
+
+from board_utils import parse_board
+from solvers.sat import SatSolutionCounter, count_sat_solutions
+
+
+PUZZLE_4X4 = "1 0 3 0 0 4 0 2 2 0 4 0 0 3 0 1"
+SOLVED_4X4 = "1 2 3 4 3 4 1 2 2 1 4 3 4 3 2 1"
+
+
+class SatSolutionCounterTests(unittest.TestCase):
+    def test_counts_solutions_up_to_limit(self):
+        self.assertEqual(count_sat_solutions(PUZZLE_4X4), (1, parse_board(SOLVED_4X4)))
+        self.assertEqual(count_sat_solutions([0] * 16)[0], 2)
+        self.assertEqual(count_sat_solutions([0] * 16, limit=1000)[0], 288)
+
+    def test_contradictory_givens_have_no_solution(self):
+        puzzle = parse_board(SOLVED_4X4)
+        puzzle[1] = puzzle[0]
+
+        self.assertEqual(count_sat_solutions(puzzle), (0, None))
+
+    def test_solved_board_is_unique(self):
+        with SatSolutionCounter(SOLVED_4X4) as counter:
+            self.assertTrue(counter.is_unique())
+
+    def test_known_solution_is_counted_without_search(self):
+        solution = parse_board(SOLVED_4X4)
+
+        self.assertEqual(count_sat_solutions(PUZZLE_4X4, known=solution)[0], 1)
+        self.assertEqual(count_sat_solutions([0] * 16, known=solution)[0], 2)
+
+    def test_wrong_known_solution_is_rejected(self):
+        wrong = parse_board("2 1 4 3 4 3 2 1 1 2 3 4 3 4 1 2")
+
+        with self.assertRaises(ValueError):
+            count_sat_solutions(PUZZLE_4X4, known=wrong)
+        with self.assertRaises(ValueError):
+            count_sat_solutions(PUZZLE_4X4, known=[1] * 16)
+
+    def test_counter_continues_after_earlier_count(self):
+        with SatSolutionCounter([0] * 16) as counter:
+            self.assertEqual(counter.count(2), 2)
+            self.assertEqual(counter.count(5), 5)
+            self.assertEqual(len({tuple(s) for s in counter.solutions}), 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
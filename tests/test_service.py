@@ -0,0 +1,186 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import http.client
+import json
+import socket
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from generator import generate_puzzle
+from service import SolveService
+
+
+PUZZLE_4X4 = "1 0 3 0 0 4 0 2 2 0 4 0 0 3 0 1"
+# Takes the naive backtracking solver minutes.
+HARD_FOR_NAIVE = "000000000000003085001020000000507000004000100090000000500000073002010000000040009"
+
+
+class SolveServiceTests(unittest.TestCase):
+    def setUp(self):
+        self.start_service(jobs=2, batch_wait=0.01)
+
+    def start_service(self, **options):
+        """Run a service on an ephemeral port in a background thread."""
+        self.service = SolveService(**options)
+        started = threading.Event()
+        state = {}
+
+        async def run():
+            state["loop"] = asyncio.get_running_loop()
+            state["stop"] = asyncio.Event()
+            self.address = await self.service.start("127.0.0.1", 0)
+            started.set()
+            await state["stop"].wait()
+            await self.service.close()
+
+        thread = threading.Thread(target=asyncio.run, args=(run(),))
+        thread.start()
+        self.assertTrue(started.wait(10))
+
+        def shutdown():
+            state["loop"].call_soon_threadsafe(state["stop"].set)
+            thread.join(10)
+
+        self.addCleanup(shutdown)
+
+    def request(self, method, path, payload=None):
+        connection = http.client.HTTPConnection(*self.address, timeout=10)
+        try:
+            body = None if payload is None else json.dumps(payload)
+            connection.request(method, path, body=body)
+            response = connection.getresponse()
+            return response.status, json.loads(response.read())
+        finally:
+            connection.close()
+
+    def test_solve_uses_cache_for_repeated_puzzles(self):
+        status, first = self.request("POST", "/solve", {"puzzle": PUZZLE_4X4})
+        _, second = self.request("POST", "/solve", {"puzzle": PUZZLE_4X4, "solver": "csp"})
+
+        self.assertEqual(status, 200)
+        self.assertEqual(first["solution"], "1 2 3 4 3 4 1 2 2 1 4 3 4 3 2 1")
+        self.assertFalse(first["cached"])
+        self.assertTrue(second["cached"])
+        metrics = self.request("GET", "/metrics")[1]
+        self.assertEqual(metrics["cache"]["hits"], 1)
+        self.assertEqual(metrics["latency_seconds"]["solve"]["count"], 2)
+
+    def test_verify_and_count_solutions(self):
+        generated = generate_puzzle(9, 30, seed=5, unique=True)
+
+        _, verified = self.request(
+            "POST",
+            "/verify",
+            {"puzzle": generated.puzzle, "mode": "unique", "backend": "sat"},
+        )
+        _, counted = self.request("POST", "/count-solutions", {"puzzle": "0" * 16, "limit": 3})
+
+        self.assertTrue(verified["valid"])
+        self.assertEqual(verified["solution"], generated.solution)
+        self.assertEqual(counted["count"], 3)
+
+    def test_concurrent_requests_are_batched(self):
+        puzzles = [generate_puzzle(9, 30, seed=seed).puzzle for seed in range(40)]
+
+        def solve(puzzle):
+            return self.request("POST", "/solve", {"puzzle": puzzle})
+
+        with ThreadPoolExecutor(max_workers=20) as executor:
+            responses = list(executor.map(solve, puzzles))
+
+        self.assertTrue(all(status == 200 for status, _ in responses))
+        self.assertTrue(all(body["status"] == "solved" for _, body in responses))
+        metrics = self.request("GET", "/metrics")[1]
+        self.assertEqual(metrics["requests"]["solve"], 40)
+        self.assertLess(metrics["batches"], 40)
+        self.assertEqual(metrics["queue_depth"], 0)
+
+    def test_connection_close_gets_prompt_eof(self):
+        body = json.dumps({"puzzle": PUZZLE_4X4}).encode()
+        request = (
+            b"POST /solve HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n"
+            + f"Content-Length: {len(body)}\r\n\r\n".encode()
+            + body
+        )
+        with socket.create_connection(self.address, timeout=5) as client:
+            client.sendall(request)
+            start = time.perf_counter()
+            response = b""
+            while chunk := client.recv(4096):
+                response += chunk
+
+        self.assertTrue(response.startswith(b"HTTP/1.1 200"))
+        self.assertLess(time.perf_counter() - start, 2)
+
+    def test_overrunning_request_does_not_block_the_worker(self):
+        self.start_service(jobs=1)
+
+        slow = {"puzzle": HARD_FOR_NAIVE, "solver": "naive", "timeout": 0.5}
+        status, _ = self.request("POST", "/solve", slow)
+        self.assertEqual(status, 504)
+        status, body = self.request("POST", "/solve", {"puzzle": PUZZLE_4X4, "timeout": 2})
+
+        self.assertEqual(status, 200)
+        self.assertEqual(body["status"], "solved")
+        self.assertEqual(self.request("GET", "/metrics")[1]["workers_replaced"], 1)
+
+    def test_malformed_requests_get_400(self):
+        cases = [
+            ("/solve", {"puzzle": PUZZLE_4X4, "solver": ["csp"]}),
+            ("/solve", {"puzzle": [None]}),
+            ("/solve", {"puzzle": "12"}),
+            ("/solve", {"puzzle": ""}),
+            ("/solve", {"puzzle": PUZZLE_4X4, "timeout": float("nan")}),
+            ("/verify", {"puzzle": PUZZLE_4X4, "mode": {"unique": True}}),
+            ("/verify", {"puzzle": PUZZLE_4X4, "solution": [None]}),
+            ("/count-solutions", {"puzzle": PUZZLE_4X4, "backend": ["sat"]}),
+        ]
+        for path, payload in cases:
+            with self.subTest(path=path, payload=payload):
+                status, body = self.request("POST", path, payload)
+                self.assertEqual(status, 400)
+                self.assertIn("error", body)
+
+        with socket.create_connection(self.address, timeout=5) as client:
+            client.sendall(b"POST /solve HTTP/1.1\r\nContent-Length: -5\r\n\r\n")
+            self.assertTrue(client.recv(4096).startswith(b"HTTP/1.1 400"))
+
+    def test_oversized_or_too_many_headers_get_431(self):
+        requests = {
+            "long header": b"GET /health HTTP/1.1\r\nX-Big: " + b"a" * 70_000 + b"\r\n\r\n",
+            "many headers": b"GET /health HTTP/1.1\r\n"
+            + b"".join(f"X-{index}: 1\r\n".encode() for index in range(101))
+            + b"\r\n",
+        }
+        for name, request in requests.items():
+            with self.subTest(name):
+                with socket.create_connection(self.address, timeout=5) as client:
+                    client.sendall(request)
+                    self.assertTrue(client.recv(4096).startswith(b"HTTP/1.1 431"))
+
+        self.assertEqual(self.request("GET", "/health")[0], 200)
+
+    def test_unexpected_error_gets_500(self):
+        with patch.object(self.service, "_route", side_effect=RuntimeError("boom")):
+            status, body = self.request("POST", "/solve", {"puzzle": PUZZLE_4X4})
+
+        self.assertEqual(status, 500)
+        self.assertIn("boom", body["error"])
+
+    def test_errors_and_deadlines(self):
+        self.assertEqual(self.request("GET", "/nope")[0], 404)
+        self.assertEqual(self.request("GET", "/solve")[0], 405)
+        self.assertEqual(self.request("POST", "/solve", {"puzzle": 5})[0], 400)
+        unknown_solver = {"puzzle": PUZZLE_4X4, "solver": "x"}
+        self.assertEqual(self.request("POST", "/solve", unknown_solver)[0], 400)
+
+        status, body = self.request("POST", "/solve", {"puzzle": "0" * 81, "timeout": 0.001})
+        self.assertEqual(status, 504)
+        self.assertIn("Deadline", body["error"])
+        self.assertEqual(self.request("GET", "/metrics")[1]["deadline_exceeded"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,212 @@
+from concurrent.futures import ThreadPoolExecutor
+import contextlib
+import io
+from pathlib import Path
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from benchmark import solve_with_timeout
+from board_utils import BoardTransform, format_board, parse_board, solves_puzzle
+from generator import generate_puzzle, verify_puzzle
+from solvers.cache import MemoryCache, SolutionCache, memoize
+from solvers.csp import solve_csp
+from solvers.metrics import SolverResult
+from tests.config_helpers import temporary_config
+
+
+PUZZLE_4X4 = "1 0 3 0 0 4 0 2 2 0 4 0 0 3 0 1"
+VARIANT = BoardTransform(
+    transpose=True,
+    rows=(3, 4, 5, 0, 1, 2, 6, 7, 8),
+    cols=(2, 1, 0, 3, 4, 5, 8, 7, 6),
+    digits=(0, 9, 8, 7, 6, 5, 4, 3, 2, 1),
+)
+
+
+class SolutionCacheTests(unittest.TestCase):
+    def setUp(self):
+        root = tempfile.TemporaryDirectory()
+        self.addCleanup(root.cleanup)
+        self.path = Path(root.name) / "cache.sqlite3"
+
+    def test_symmetric_variant_reuses_entry(self):
+        generated = generate_puzzle(9, 30, seed=1)
+        variant = format_board(VARIANT.apply(generated.puzzle))
+
+        with SolutionCache(self.path) as cache:
+            cache.put(generated.puzzle, generated.solution, "csp")
+            solution = cache.get(variant, "csp")
+
+        self.assertEqual(solution, format_board(VARIANT.apply(generated.solution)))
+        self.assertTrue(solves_puzzle(parse_board(variant), parse_board(solution)))
+
+    def test_entries_are_keyed_by_solver_and_version(self):
+        generated = generate_puzzle(9, 30, seed=2)
+
+        with SolutionCache(self.path) as cache:
+            cache.put(generated.puzzle, generated.solution, "csp")
+
+            self.assertIsNone(cache.get(generated.puzzle, "dlx"))
+            self.assertIsNotNone(cache.get(generated.puzzle))
+            with patch.dict("solvers.cache.SOLVER_VERSIONS", {"csp": 2}):
+                self.assertIsNone(cache.get(generated.puzzle, "csp"))
+
+    def test_least_recently_used_entry_is_evicted(self):
+        generated = [generate_puzzle(9, 30, seed=seed) for seed in range(3)]
+
+        with SolutionCache(self.path, max_entries=2) as cache:
+            cache.put(generated[0].puzzle, generated[0].solution, "csp")
+            cache.put(generated[1].puzzle, generated[1].solution, "csp")
+            cache.get(generated[0].puzzle, "csp")
+            cache.put(generated[2].puzzle, generated[2].solution, "csp")
+
+            self.assertEqual(len(cache), 2)
+            self.assertIsNotNone(cache.get(generated[0].puzzle, "csp"))
+            self.assertIsNone(cache.get(generated[1].puzzle, "csp"))
+
+        with SolutionCache(self.path) as reopened:
+            self.assertEqual(len(reopened), 2)
+
+    def test_hits_and_full_puts_stay_cheap(self):
+        generated = [generate_puzzle(4, 6, seed=seed) for seed in range(40)]
+        puzzles = list({record.puzzle: record for record in generated}.values())[:11]
+        statements = []
+
+        with SolutionCache(self.path, max_entries=10) as cache:
+            cache.connection.set_trace_callback(statements.append)
+            for record in puzzles[:10]:
+                cache.put(record.puzzle, record.solution, "csp")
+            cache.get(puzzles[0].puzzle, "csp")
+            cache.get(puzzles[1].puzzle, "csp")
+            lookups = list(statements)
+            cache.put(puzzles[10].puzzle, puzzles[10].solution, "csp")
+
+            self.assertFalse([sql for sql in lookups if sql.startswith("UPDATE")])
+            self.assertEqual(sum("COUNT(*)" in sql for sql in statements), 1)
+            self.assertEqual(len(cache), 9)
+            self.assertIsNotNone(cache.get(puzzles[0].puzzle, "csp"))
+            self.assertIsNone(cache.get(puzzles[2].puzzle, "csp"))
+
+    def test_solve_with_timeout_uses_cache_only_when_given(self):
+        with SolutionCache(self.path) as cache:
+            first = solve_with_timeout(solve_csp, PUZZLE_4X4, cache=cache)
+            second = solve_with_timeout(solve_csp, PUZZLE_4X4, cache=cache)
+        uncached = solve_with_timeout(solve_csp, PUZZLE_4X4)
+
+        self.assertFalse(first.cached)
+        self.assertTrue(second.cached)
+        self.assertEqual(second.solution, first.solution)
+        self.assertFalse(uncached.cached)
+
+    def test_verification_fills_and_reuses_cache(self):
+        generated = generate_puzzle(9, 30, seed=3)
+
+        with SolutionCache(self.path) as cache:
+            verify_puzzle(generated.puzzle, backend="bitmask", cache=cache)
+            self.assertIsNotNone(cache.get(generated.puzzle, "bitmask"))
+            with patch("generator.verification._run_backend") as run:
+                result = verify_puzzle(generated.puzzle, cache=cache)
+
+        run.assert_not_called()
+        self.assertTrue(result.valid)
+
+
+class MemoryCacheTests(unittest.TestCase):
+    def test_lru_eviction_and_counters(self):
+        cache = MemoryCache(capacity=2)
+        boards = [[value] + [0] * 15 for value in (1, 2, 3)]
+        for board in boards[:2]:
+            cache.put(board, PUZZLE_4X4, "csp")
+        cache.get(boards[0], "csp")
+        cache.put(boards[2], PUZZLE_4X4, "csp")
+
+        self.assertIsNotNone(cache.get(format_board(boards[0]), "csp"))
+        self.assertIsNone(cache.get(boards[1], "csp"))
+        self.assertIsNone(cache.get(boards[0], "dlx"))
+        stats = cache.stats()
+        self.assertEqual((stats.hits, stats.misses, stats.evictions), (2, 2, 1))
+        self.assertEqual(stats.hit_rate, 0.5)
+
+    def test_entries_expire_after_ttl(self):
+        now = [0.0]
+        cache = MemoryCache(ttl_seconds=10, clock=lambda: now[0])
+        cache.put(PUZZLE_4X4, "solution", "csp")
+
+        now[0] = 9.0
+        self.assertEqual(cache.get(PUZZLE_4X4), "solution")
+        now[0] = 10.0
+        self.assertIsNone(cache.get(PUZZLE_4X4))
+        self.assertEqual(cache.stats().expirations, 1)
+        self.assertEqual(len(cache), 0)
+
+    def test_concurrent_use_keeps_counts_consistent(self):
+        cache = MemoryCache(capacity=8)
+        boards = [[value % 4 + 1] + [0] * 15 for value in range(400)]
+
+        def touch(board):
+            if cache.get(board, "csp") is None:
+                cache.put(board, PUZZLE_4X4, "csp")
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(touch, boards))
+
+        stats = cache.stats()
+        self.assertEqual(stats.hits + stats.misses, 400)
+        self.assertEqual(len(cache), 4)
+
+    def test_misses_fall_through_to_backing_cache(self):
+        with tempfile.TemporaryDirectory() as root:
+            with SolutionCache(Path(root) / "cache.sqlite3") as disk:
+                generated = generate_puzzle(9, 30, seed=4)
+                disk.put(generated.puzzle, generated.solution, "csp")
+                cache = MemoryCache(backing=disk)
+
+                self.assertEqual(cache.get(generated.puzzle, "csp"), generated.solution)
+                self.assertEqual(cache.get(generated.puzzle, "csp"), generated.solution)
+                self.assertEqual((cache.stats().hits, cache.stats().misses), (1, 1))
+
+    def test_any_solver_backing_hit_is_not_stored_without_a_solver(self):
+        with tempfile.TemporaryDirectory() as root:
+            with SolutionCache(Path(root) / "cache.sqlite3") as disk:
+                generated = generate_puzzle(9, 30, seed=4)
+                disk.put(generated.puzzle, generated.solution, "csp")
+                cache = MemoryCache(backing=disk)
+
+                self.assertEqual(cache.get(generated.puzzle), generated.solution)
+                self.assertEqual(len(cache), 0)
+                self.assertEqual(cache.get(generated.puzzle, "csp"), generated.solution)
+                self.assertEqual(len(cache), 1)
+
+    def test_menu_closes_disk_cache_on_quit(self):
+        import main
+
+        with tempfile.TemporaryDirectory() as root:
+            with temporary_config(root, benchmark_results_dir=root):
+                with patch("builtins.input", side_effect=["1", PUZZLE_4X4, "6"]):
+                    with patch("os.system"), patch.object(
+                        SolutionCache, "close", autospec=True, side_effect=SolutionCache.close
+                    ) as close:
+                        with contextlib.redirect_stdout(io.StringIO()):
+                            main.main()
+
+        close.assert_called_once()
+
+    def test_memoized_solver_runs_once_per_board(self):
+        calls = []
+
+        def solve_fake(board):
+            calls.append(board)
+            return SolverResult(solution=PUZZLE_4X4, status="solved", runtime_seconds=1.0)
+
+        solve = memoize(solve_fake, MemoryCache())
+        first = solve(PUZZLE_4X4)
+        second = solve(PUZZLE_4X4.replace(" ", ""))
+
+        self.assertEqual(len(calls), 1)
+        self.assertFalse(first.cached)
+        self.assertTrue(second.cached)
+
+
+if __name__ == "__main__":
+    unittest.main()
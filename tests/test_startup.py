@@ -0,0 +1,72 @@
+import json
+from pathlib import Path
+import subprocess
+import sys
+import unittest
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+HEAVY_MODULES = {"matplotlib", "numpy", "pandas", "pysat", "z3"}
+# Cold import of main.py measures ~0.1s; the budget leaves room for slow CI
+# hosts while still catching a heavy dependency creeping back in (~0.8s).
+MAIN_IMPORT_BUDGET_SECONDS = 0.5
+
+
+def run_python(*args: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *args],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def import_times(module: str) -> dict[str, int]:
+    """Return cumulative import time in microseconds per module from -X importtime."""
+    stderr = run_python("-X", "importtime", "-c", f"import {module}").stderr
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _self, cumulative, name = line.removeprefix("import time:").split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+class StartupTests(unittest.TestCase):
+    def test_importing_main_skips_heavy_dependencies(self):
+        times = import_times("main")
+        loaded = {name.split(".")[0] for name in times}
+
+        self.assertEqual(loaded & HEAVY_MODULES, set())
+        self.assertLess(times["main"] / 1_000_000, MAIN_IMPORT_BUDGET_SECONDS)
+
+    def test_csp_solve_skips_heavy_dependencies(self):
+        code = (
+            "import json, sys\n"
+            "import main\n"
+            "puzzle = '1 0 3 0 0 4 0 2 2 0 4 0 0 3 0 1'\n"
+            "result = main.solve_with_timeout(main.solve_csp, puzzle)\n"
+            "assert result.solved, result\n"
+            "print(json.dumps(sorted({name.split('.')[0] for name in sys.modules})))\n"
+        )
+        loaded = set(json.loads(run_python("-c", code).stdout))
+
+        self.assertEqual(loaded & HEAVY_MODULES, set())
+
+    def test_cli_parser_skips_heavy_dependencies(self):
+        code = (
+            "import json, sys\n"
+            "import cli\n"
+            "cli.build_parser()\n"
+            "print(json.dumps(sorted({name.split('.')[0] for name in sys.modules})))\n"
+        )
+        loaded = set(json.loads(run_python("-c", code).stdout))
+
+        self.assertEqual(loaded & HEAVY_MODULES, set())
+
+
+if __name__ == "__main__":
+    unittest.main()
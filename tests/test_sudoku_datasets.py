@@ -7,23 +7,41 @@ import tempfile
 import unittest
 from unittest.mock import Mock, patch
 
+from board_utils import BoardTransform, canonical_hash, format_board, parse_board
 from cli_helpers import prompt_size
 import generator.verification as verification_module
 from generator import (
+    BinaryDataset,
     DIFFICULTY_PERCENT_RANGES,
+    binary_to_jsonl,
     clue_count,
     dataset_path,
     dataset_size_from_path,
+    dataset_stem,
+    dedupe_dataset,
     expand_difficulties,
     generation as generation_module,
     generate_dataset_records,
+    generate_effort_records,
     generate_puzzle,
+    iter_dataset,
+    jsonl_to_binary,
     list_datasets,
     prompt_difficulty,
+    puzzle_effort,
     read_dataset,
+    read_manifest,
+    record_seed,
+    shard_paths,
     verify_dataset_records,
+    verify_puzzle,
+    verify_manifest,
     write_dataset_records,
+    write_manifest,
+    write_shard,
+    write_sharded_dataset,
 )
+from generator.shards import file_sha256
 from tests.config_helpers import temporary_config
 
 
@@ -59,6 +77,146 @@ class SudokuDatasetTests(unittest.TestCase):
             [record["target_clues"] for record in second],
         )
 
+    def test_parallel_generation_matches_serial_output(self):
+        serial = generate_dataset_records(4, "mixed", 9, seed=123, verify=False)
+        parallel = generate_dataset_records(4, "mixed", 9, seed=123, jobs=3)
+
+        self.assertEqual(parallel, serial)
+        self.assertEqual([record["id"] for record in parallel], list(range(1, 10)))
+
+    def test_deduped_generation_keeps_distinct_puzzles(self):
+        records = generate_dataset_records(4, "hard", 40, seed=3, dedupe=True)
+
+        hashes = {canonical_hash(record["puzzle"]) for record in records}
+        self.assertEqual(len(hashes), 40)
+        self.assertEqual([record["id"] for record in records], list(range(1, 41)))
+        # The first 40 candidates include a symmetric duplicate, so later ones fill in.
+        first_seeds = {record_seed(3, index) for index in range(1, 41)}
+        self.assertFalse({record["seed"] for record in records} <= first_seeds)
+
+    def test_mixed_dedupe_refill_continues_the_difficulty_cycle(self):
+        with patch.object(
+            generation_module,
+            "_generate_records",
+            wraps=generation_module._generate_records,
+        ) as generate:
+            records = generate_dataset_records(4, "mixed", 30, seed=3, dedupe=True)
+
+        self.assertEqual(len(records), 30)
+        self.assertGreater(generate.call_count, 1)
+        names = list(DIFFICULTY_PERCENT_RANGES)
+        for call in generate.call_args_list[1:]:
+            difficulties, first_index = call.args[1], call.args[2]
+            expected = [
+                names[(index - 1) % len(names)]
+                for index in range(first_index, first_index + len(difficulties))
+            ]
+            self.assertEqual(difficulties, expected)
+
+    def test_dedupe_dataset_drops_symmetric_copies(self):
+        records = generate_dataset_records(9, "medium", 3, seed=11)
+        transform = BoardTransform(
+            transpose=True,
+            rows=(3, 4, 5, 0, 1, 2, 6, 7, 8),
+            cols=(2, 1, 0, 3, 4, 5, 8, 7, 6),
+            digits=(0, 9, 8, 7, 6, 5, 4, 3, 2, 1),
+        )
+        copy = dict(records[0], id=4)
+        copy["puzzle"] = format_board(transform.apply(copy["puzzle"]))
+        copy["solution"] = format_board(transform.apply(copy["solution"]))
+
+        with tempfile.TemporaryDirectory() as root:
+            source = write_dataset_records(
+                records + [copy],
+                9,
+                "medium",
+                path=Path(root) / "9x9_medium_4.jsonl.gz",
+            )
+            summary = dedupe_dataset(source)
+            kept = read_dataset(summary.path)
+
+        self.assertEqual(summary.path.name, "9x9_medium_4_dedup.jsonl.gz")
+        self.assertEqual((summary.kept, summary.dropped), (3, 1))
+        self.assertEqual([record["puzzle"] for record in kept], [r["puzzle"] for r in records])
+
+    def test_dedupe_sharded_dataset_writes_jsonl(self):
+        records = generate_dataset_records(4, "easy", 4, seed=123, verify=False)
+
+        with tempfile.TemporaryDirectory() as root:
+            source = write_sharded_dataset(
+                records + records[:1], 4, "easy", shards=2, path=Path(root) / "4x4_easy_5"
+            )
+            summary = dedupe_dataset(source)
+            kept = read_dataset(summary.path)
+
+        self.assertEqual(summary.path.name, "4x4_easy_5_dedup.jsonl")
+        self.assertEqual(summary.dropped, 1)
+        self.assertEqual(len(kept), summary.kept)
+
+    def test_unique_generation_marks_records_unique(self):
+        records = generate_dataset_records(9, "hard", 3, seed=123, unique=True)
+
+        for record in records:
+            self.assertTrue(record["unique"])
+            self.assertEqual(record["verification_mode"], "unique")
+            self.assertGreaterEqual(record["actual_clues"], record["target_clues"])
+            self.assertTrue(verify_puzzle(record["puzzle"], mode="unique").valid)
+
+    def test_effort_generation_keeps_only_puzzles_in_band(self):
+        records = generate_effort_records(
+            9,
+            "hard",
+            3,
+            (1, 10_000),
+            metric="bitmask_backtracks",
+            seed=5,
+            unique=True,
+            batch_size=8,
+        )
+        parallel = generate_effort_records(
+            9,
+            "hard",
+            3,
+            (1, 10_000),
+            metric="bitmask_backtracks",
+            seed=5,
+            unique=True,
+            batch_size=8,
+            jobs=2,
+        )
+
+        self.assertEqual(parallel, records)
+        self.assertEqual([record["id"] for record in records], [1, 2, 3])
+        for record in records:
+            self.assertGreaterEqual(record["effort"], 1)
+            self.assertEqual(
+                puzzle_effort(record["puzzle"], "bitmask_backtracks"),
+                record["effort"],
+            )
+
+    def test_effort_generation_honours_verify(self):
+        derived = generate_effort_records(4, "easy", 2, (0, 10_000), seed=1)
+        verified = generate_effort_records(4, "easy", 2, (0, 10_000), seed=1, verify=True)
+
+        self.assertEqual({record["verification_mode"] for record in derived}, {"derived"})
+        self.assertEqual({record["verification_mode"] for record in verified}, {"solvable"})
+        self.assertEqual(
+            [record["puzzle"] for record in verified],
+            [record["puzzle"] for record in derived],
+        )
+
+    def test_effort_generation_reports_an_unreachable_band(self):
+        with self.assertRaisesRegex(RuntimeError, "Only 0 of 1 puzzles"):
+            generate_effort_records(4, "easy", 1, (50, 60), seed=1, max_candidates=5)
+
+    def test_record_seeds_depend_only_on_seed_and_index(self):
+        short = generate_dataset_records(9, "easy", 2, seed=123, verify=False)
+        long = generate_dataset_records(9, "easy", 5, seed=123, verify=False)
+
+        self.assertEqual(long[:2], short)
+        self.assertEqual(short[1]["seed"], record_seed(123, 2))
+        self.assertEqual(len({record["seed"] for record in long}), 5)
+
     def test_dataset_generation_randomizes_clue_percent_per_puzzle(self):
         records = generate_dataset_records(9, "easy", 5, seed=123, verify=False)
 
@@ -111,6 +269,42 @@ class SudokuDatasetTests(unittest.TestCase):
                 with self.assertRaises(ValueError):
                     read_dataset(path, expected_size=9)
 
+    def test_iter_dataset_streams_records_with_selected_validation(self):
+        records = generate_dataset_records(4, "easy", 2, seed=123, verify=False)
+        broken = dict(records[1], puzzle="1 2 3 4 5 0 0 0 0 0 0 0 0 0 0 0 0")
+
+        with tempfile.TemporaryDirectory() as root:
+            with temporary_config(root, datasets_dir=root):
+                path = write_dataset_records([records[0], broken], 4, "easy")
+
+                stream = iter_dataset(path, expected_size=4, validate="length")
+                first = next(stream)
+                with self.assertRaisesRegex(ValueError, "Record 2 puzzle length"):
+                    next(stream)
+                unchecked = list(iter_dataset(path, expected_size=9, validate="none"))
+                with self.assertRaisesRegex(ValueError, "Unsupported dataset validation"):
+                    next(iter_dataset(path, validate="cheap"))
+
+        self.assertEqual(first["puzzle"], records[0]["puzzle"])
+        self.assertEqual(len(unchecked), 2)
+
+    def test_iter_dataset_can_return_parsed_boards(self):
+        records = generate_dataset_records(16, "easy", 1, seed=123, verify=False)
+
+        with tempfile.TemporaryDirectory() as root:
+            with temporary_config(root, datasets_dir=root):
+                path = write_dataset_records(records, 16, "easy")
+                for validate in ("none", "length", "full"):
+                    loaded = next(
+                        iter_dataset(path, validate=validate, parse_boards=True)
+                    )
+
+                    self.assertEqual(loaded["puzzle"], parse_board(records[0]["puzzle"]))
+                    self.assertEqual(
+                        loaded["solution"],
+                        parse_board(records[0]["solution"]),
+                    )
+
     def test_dataset_path_uses_stable_size_and_difficulty(self):
         self.assertEqual(
             dataset_path(9, "medium", 100),
@@ -183,6 +377,171 @@ class SudokuDatasetTests(unittest.TestCase):
         self.assertEqual(len(record["solution"].split()), 36 * 36)
 
 
+class CompressedDatasetTests(unittest.TestCase):
+    def test_compressed_roundtrip_for_each_codec(self):
+        records = generate_dataset_records(9, "easy", 4, seed=123, verify=False)
+
+        for codec in ("gz", "bz2", "xz"):
+            with tempfile.TemporaryDirectory() as root:
+                with temporary_config(root, datasets_dir=root):
+                    path = write_dataset_records(records, 9, "easy", compression=codec)
+                    loaded = read_dataset(path, expected_size=9)
+                    streamed = next(iter_dataset(path, expected_size=9))
+                    listed = list_datasets(9)
+                    plain = write_dataset_records(records, 9, "easy")
+
+                    self.assertEqual(path.name, f"9x9_easy_4.jsonl.{codec}")
+                    self.assertLess(path.stat().st_size, plain.stat().st_size)
+
+            self.assertEqual(loaded, records)
+            self.assertEqual(streamed, records[0])
+            self.assertEqual(listed, [path])
+            self.assertEqual(dataset_size_from_path(path), 9)
+            self.assertEqual(dataset_stem(path), "9x9_easy_4")
+
+    def test_unknown_compression_is_rejected(self):
+        with tempfile.TemporaryDirectory() as root:
+            with temporary_config(root, datasets_dir=root):
+                with self.assertRaisesRegex(ValueError, "Unsupported dataset compression"):
+                    dataset_path(9, "easy", 1, compression="zip")
+
+
+class BinaryDatasetTests(unittest.TestCase):
+    def test_binary_roundtrip_preserves_records_for_nibble_and_byte_sizes(self):
+        for size in (9, 16):
+            records = generate_dataset_records(size, "mixed", 3, seed=123, verify=False)
+
+            with tempfile.TemporaryDirectory() as root:
+                with temporary_config(root, datasets_dir=root):
+                    path = write_dataset_records(
+                        records,
+                        size,
+                        "mixed",
+                        path=Path(root) / f"{size}x{size}_mixed_3.sdkb",
+                    )
+                    loaded = read_dataset(path, expected_size=size)
+                    listed = list_datasets(size)
+
+            self.assertEqual(loaded, records)
+            self.assertEqual(listed, [path])
+            self.assertEqual(dataset_size_from_path(path), size)
+
+    def test_binary_dataset_fetches_any_record_directly(self):
+        records = generate_dataset_records(9, "easy", 5, seed=123, verify=False)
+
+        with tempfile.TemporaryDirectory() as root:
+            path = Path(root) / "9x9_easy_5.sdkb"
+            with temporary_config(root, datasets_dir=root):
+                write_dataset_records(records, 9, "easy", path=path)
+            with BinaryDataset(path) as dataset:
+                self.assertEqual(len(dataset), 5)
+                self.assertEqual(dataset[3], records[3])
+                self.assertEqual(dataset[-1]["id"], 5)
+                self.assertEqual(
+                    dataset.puzzle_values(2),
+                    parse_board(records[2]["puzzle"]),
+                )
+                with self.assertRaises(IndexError):
+                    dataset[5]
+            # 9x9 boards pack two cells per byte.
+            self.assertLess(path.stat().st_size, 5 * 2 * 41 + 5 * 300)
+
+    def test_jsonl_binary_converters_roundtrip(self):
+        records = generate_dataset_records(4, "easy", 2, seed=123, verify=False)
+
+        with tempfile.TemporaryDirectory() as root:
+            with temporary_config(root, datasets_dir=root):
+                jsonl_path = write_dataset_records(records, 4, "easy")
+                binary_path = jsonl_to_binary(jsonl_path)
+                restored = binary_to_jsonl(binary_path, Path(root) / "restored.jsonl")
+
+                self.assertEqual(binary_path.name, "4x4_easy_2.sdkb")
+                self.assertEqual(
+                    restored.read_text(encoding="utf-8"),
+                    jsonl_path.read_text(encoding="utf-8"),
+                )
+
+    def test_binary_reader_rejects_other_files(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = Path(root) / "4x4_easy_1.sdkb"
+            path.write_bytes(b"not a dataset at all, just some bytes")
+            with self.assertRaisesRegex(ValueError, "Not a binary dataset"):
+                BinaryDataset(path)
+
+
+class ShardedDatasetTests(unittest.TestCase):
+    def test_sharded_dataset_roundtrip_and_listing(self):
+        records = generate_dataset_records(4, "easy", 5, seed=123, verify=False)
+
+        with tempfile.TemporaryDirectory() as root:
+            with temporary_config(root, datasets_dir=root):
+                directory = write_sharded_dataset(records, 4, "easy", shards=2)
+                manifest = read_manifest(directory)
+                loaded = read_dataset(directory, expected_size=4)
+                listed = list_datasets(4)
+                mismatches = verify_manifest(directory)
+
+        self.assertEqual(directory.name, "4x4_easy_5")
+        self.assertEqual(dataset_size_from_path(directory), 4)
+        self.assertEqual(manifest["count"], 5)
+        self.assertEqual([entry["count"] for entry in manifest["shards"]], [3, 2])
+        self.assertEqual(loaded, records)
+        self.assertEqual(listed, [directory])
+        self.assertEqual(mismatches, [])
+
+    def test_sharded_dataset_streams_records_and_hashes_each_shard(self):
+        records = generate_dataset_records(4, "easy", 5, seed=123, verify=False)
+
+        with tempfile.TemporaryDirectory() as root:
+            with temporary_config(root, datasets_dir=root):
+                directory = write_sharded_dataset(
+                    iter(records),
+                    4,
+                    "easy",
+                    shards=3,
+                    suffix=".jsonl.gz",
+                    count=5,
+                )
+                manifest = read_manifest(directory)
+                hashes = [file_sha256(path) for path in shard_paths(directory)]
+                loaded = read_dataset(directory, expected_size=4)
+
+                with self.assertRaisesRegex(ValueError, "More than 4 records"):
+                    write_sharded_dataset(
+                        iter(records), 4, "easy", shards=2, path=Path(root) / "x", count=4
+                    )
+
+        self.assertEqual([entry["count"] for entry in manifest["shards"]], [2, 2, 1])
+        self.assertEqual([entry["sha256"] for entry in manifest["shards"]], hashes)
+        self.assertEqual(loaded, records)
+
+    def test_independently_written_shards_share_one_manifest(self):
+        records = generate_dataset_records(4, "easy", 4, seed=123, verify=False)
+
+        with tempfile.TemporaryDirectory() as root:
+            with temporary_config(root, datasets_dir=root):
+                directory = Path(root) / "4x4_easy_4"
+                entries = [
+                    write_shard(directory, 1, records[2:], 4, "easy", suffix=".sdkb"),
+                    write_shard(directory, 0, records[:2], 4, "easy"),
+                ]
+                write_manifest(directory, 4, "easy", entries)
+                paths = shard_paths(directory)
+                loaded = read_dataset(directory)
+
+                corrupted = bytearray(paths[1].read_bytes())
+                corrupted[-1] ^= 0xFF
+                paths[1].write_bytes(bytes(corrupted))
+                mismatches = verify_manifest(directory)
+
+        self.assertEqual(
+            [path.name for path in paths],
+            ["shard-00000.jsonl", "shard-00001.sdkb"],
+        )
+        self.assertEqual(loaded, records)
+        self.assertEqual(mismatches, ["shard-00001.sdkb: checksum mismatch"])
+
+
 class SudokuGenerationPolicyTests(unittest.TestCase):
     def test_generate_puzzle_only_verifies_solvability_when_requested(self):
         verify = Mock()
@@ -221,13 +580,67 @@ class SudokuGenerationPolicyTests(unittest.TestCase):
         self.assertEqual(generated.verification.mode, "derived")
         self.assertIsNone(generated.verification.solution_count)
 
+    def test_parallel_verification_matches_serial_summary(self):
+        records = generate_dataset_records(4, "easy", 6, seed=123, verify=False)
+        records[1]["puzzle"] = "1 1 0 0 0 0 0 0 0 0 0 0 0 0 0 0"
+        records[4]["puzzle"] = "2 2 0 0 0 0 0 0 0 0 0 0 0 0 0 0"
+        progress = []
+
+        serial = verify_dataset_records(records, chunk_size=2)
+        parallel = verify_dataset_records(
+            records,
+            jobs=2,
+            chunk_size=2,
+            progress=lambda *update: progress.append(update[:2]),
+        )
+
+        self.assertEqual(parallel.total, 6)
+        self.assertEqual(parallel.invalid_count, 2)
+        self.assertEqual(parallel.failures, serial.failures)
+        self.assertEqual([failure.record_number for failure in parallel.failures], [2, 5])
+        self.assertEqual(progress, [(2, 1), (4, 1), (6, 2)])
+        self.assertFalse(parallel.stopped_early)
+        self.assertGreater(parallel.puzzles_per_second, 0)
+
+    def test_dataset_verification_records_backend_time(self):
+        records = generate_dataset_records(4, "easy", 3, seed=123, unique=True)
+
+        summary = verify_dataset_records(
+            records,
+            mode="unique",
+            backend="bitmask",
+            cross_check="dlx",
+        )
+
+        self.assertEqual(summary.valid_count, 3)
+        self.assertEqual(summary.backend, "bitmask")
+        self.assertEqual(summary.cross_check, "dlx")
+        self.assertEqual(set(summary.backend_seconds), {"bitmask", "dlx"})
+
+    def test_verification_can_stop_after_max_failures(self):
+        records = generate_dataset_records(4, "easy", 5, seed=123, verify=False)
+        with patch(
+            "generator.verification.verify_puzzle",
+            return_value=SimpleNamespace(valid=False, error="bad", backend_seconds={}),
+        ) as verify:
+            summary = verify_dataset_records(records, max_failures=2, stop_early=True)
+
+        self.assertTrue(summary.stopped_early)
+        self.assertEqual(summary.total, 2)
+        self.assertEqual(summary.invalid_count, 2)
+        self.assertEqual(verify.call_count, 2)
+
     def test_verify_dataset_records_uses_selected_mode(self):
         records = generate_dataset_records(4, "easy", 2, seed=123, verify=False)
         with patch(
             "generator.verification.verify_puzzle",
             side_effect=[
-                SimpleNamespace(valid=True, error=None),
-                SimpleNamespace(valid=False, error="Sudoku has multiple solutions."),
+                SimpleNamespace(valid=True, error=None, backend_seconds={}),
+                SimpleNamespace(
+                    valid=False,
+                    error="Sudoku has multiple solutions.",
+                    backend_seconds={},
+                ),
             ],
         ) as verify:
             summary = verify_dataset_records(records, mode="unique")
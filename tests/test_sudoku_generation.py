@@ -1,7 +1,22 @@
+import random
 import unittest
+from unittest.mock import patch
 
-from generator import generate_pattern_solution, generate_puzzle, verify_puzzle
-from board_utils import parse_board
+from generator import (
+    generate_pattern_solution,
+    generate_puzzle,
+    generate_random_solution,
+    verify_puzzle,
+)
+from generator import verification as verification_module
+from board_utils import (
+    BoardTransform,
+    canonical_form,
+    canonical_hash,
+    is_complete_solution,
+    parse_board,
+    solves_puzzle,
+)
 
 
 SOLVED_4X4 = "1 2 3 4 3 4 1 2 2 1 4 3 4 3 2 1"
@@ -46,6 +61,157 @@ class SudokuVerifierTests(unittest.TestCase):
         self.assertFalse(bad_value.valid)
         self.assertIn("out of range", bad_value.error)
 
+    def test_stored_solution_proves_solvable_without_z3(self):
+        puzzle = "1 0 3 0 0 4 0 2 2 0 4 0 0 3 0 1"
+        with patch(
+            "generator.verification.build_z3_sudoku_solver",
+            side_effect=AssertionError("z3 should not run"),
+        ):
+            result = verify_puzzle(puzzle, solution=SOLVED_4X4)
+
+        self.assertTrue(result.valid)
+        self.assertEqual(result.solution, SOLVED_4X4)
+
+    def test_mismatched_stored_solution_falls_back_to_solver(self):
+        wrong = "2 1 4 3 4 3 2 1 1 2 3 4 3 4 1 2"
+
+        result = verify_puzzle("1 0 3 0 0 4 0 2 2 0 4 0 0 3 0 1", solution=wrong)
+
+        self.assertTrue(result.valid)
+        self.assertEqual(result.solution, SOLVED_4X4)
+
+    def test_unique_mode_with_stored_solution_still_finds_second_solution(self):
+        result = verify_puzzle([0] * 16, mode="unique", solution=SOLVED_4X4)
+
+        self.assertFalse(result.valid)
+        self.assertEqual(result.solution_count, 2)
+
+    def test_backends_agree_on_solvable_unique_and_unsat_boards(self):
+        boards = {
+            "1 0 3 0 0 4 0 2 2 0 4 0 0 3 0 1": (True, 1),
+            " ".join(["0"] * 16): (False, 2),
+            "1 1 0 0 0 0 0 0 0 0 0 0 0 0 0 0": (False, 0),
+        }
+        for backend in ("z3", "sat", "dlx", "bitmask"):
+            for board, (valid, count) in boards.items():
+                result = verify_puzzle(board, mode="unique", backend=backend)
+
+                self.assertEqual((result.valid, result.solution_count), (valid, count))
+                self.assertEqual(result.backend, backend)
+                self.assertEqual(list(result.backend_seconds), [backend])
+
+    def test_cross_check_flags_disagreeing_backends(self):
+        puzzle = "1 0 3 0 0 4 0 2 2 0 4 0 0 3 0 1"
+        agreed = verify_puzzle(puzzle, mode="unique", backend="bitmask", cross_check="dlx")
+        with patch.dict(
+            "generator.verification.SOLUTION_COUNTERS",
+            {"dlx": lambda board, limit: (2, None)},
+        ):
+            disagreed = verify_puzzle(
+                puzzle,
+                mode="unique",
+                backend="bitmask",
+                cross_check="dlx",
+            )
+
+        self.assertTrue(agreed.valid)
+        self.assertEqual(set(agreed.backend_seconds), {"bitmask", "dlx"})
+        self.assertFalse(disagreed.valid)
+        self.assertIn("Backends disagree", disagreed.error)
+
+    def test_cross_check_runs_despite_stored_solution(self):
+        puzzle = "1 0 3 0 0 4 0 2 2 0 4 0 0 3 0 1"
+        with patch(
+            "generator.verification._run_backend",
+            wraps=verification_module._run_backend,
+        ) as run:
+            result = verify_puzzle(
+                puzzle,
+                solution=SOLVED_4X4,
+                backend="bitmask",
+                cross_check="dlx",
+            )
+
+        self.assertEqual([call.args[0] for call in run.call_args_list], ["bitmask", "dlx"])
+        self.assertTrue(result.valid)
+        self.assertEqual(set(result.backend_seconds), {"bitmask", "dlx"})
+
+    def test_cross_check_ignores_stored_solution(self):
+        unsolvable = "1 1 0 0 0 0 0 0 0 0 0 0 0 0 0 0"
+        # A valid grid that slipped past the stored-solution check.
+        with patch(
+            "generator.verification.stored_solution",
+            return_value=parse_board(SOLVED_4X4),
+        ), patch(
+            "generator.verification._run_backend",
+            wraps=verification_module._run_backend,
+        ) as run:
+            result = verify_puzzle(
+                unsolvable,
+                solution=SOLVED_4X4,
+                backend="z3",
+                cross_check="sat",
+            )
+
+        known_args = [call.args[3] for call in run.call_args_list]
+        self.assertEqual(known_args, [parse_board(SOLVED_4X4), None])
+        self.assertFalse(result.valid)
+        self.assertIn("Backends disagree", result.error)
+        self.assertIn("sat found 0", result.error)
+
+    def test_unknown_backend_is_reported(self):
+        result = verify_puzzle(SOLVED_4X4, backend="magic")
+
+        self.assertFalse(result.valid)
+        self.assertIn("Unsupported verification backend", result.error)
+
+    def test_solution_checks(self):
+        solved = parse_board(SOLVED_9X9)
+        swapped = solved.copy()
+        swapped[0], swapped[1] = swapped[1], swapped[0]
+
+        self.assertTrue(is_complete_solution(solved))
+        self.assertFalse(is_complete_solution(swapped))
+        self.assertTrue(solves_puzzle([1] + [0] * 80, solved))
+        self.assertFalse(solves_puzzle([2] + [0] * 80, solved))
+        self.assertFalse(solves_puzzle([0] * 16, solved))
+
+
+class CanonicalFormTests(unittest.TestCase):
+    def test_symmetric_variants_share_canonical_form(self):
+        puzzle = parse_board(generate_puzzle(9, 30, seed=5).puzzle)
+        variant = BoardTransform(
+            transpose=True,
+            rows=(5, 3, 4, 0, 2, 1, 8, 6, 7),
+            cols=(7, 8, 6, 1, 0, 2, 3, 5, 4),
+            digits=(0, 4, 9, 1, 7, 2, 8, 3, 6, 5),
+        ).apply(puzzle)
+
+        self.assertNotEqual(variant, puzzle)
+        self.assertEqual(canonical_form(variant)[0], canonical_form(puzzle)[0])
+        self.assertEqual(canonical_hash(variant), canonical_hash(puzzle))
+
+    def test_transform_maps_canonical_solution_back(self):
+        generated = generate_puzzle(9, 30, seed=6)
+        canonical, transform = canonical_form(generated.puzzle)
+
+        self.assertEqual(transform.apply(generated.puzzle), canonical)
+        canonical_solution = transform.apply(generated.solution)
+        self.assertEqual(transform.invert(canonical_solution), parse_board(generated.solution))
+
+    def test_distinct_puzzles_hash_differently(self):
+        same_digit = [1] + [0] * 5 + [1] + [0] * 9
+        two_digits = [1, 2] + [0] * 14
+
+        self.assertNotEqual(canonical_hash(same_digit), canonical_hash(two_digits))
+        self.assertEqual(canonical_hash([0] * 16), canonical_hash("0" * 16))
+
+    def test_symmetric_solved_grid(self):
+        canonical, transform = canonical_form(SOLVED_9X9)
+
+        self.assertTrue(is_complete_solution(canonical))
+        self.assertEqual(transform.apply(SOLVED_9X9), canonical)
+
 
 class SudokuGeneratorTests(unittest.TestCase):
     def test_generate_4x4_pattern_solution(self):
@@ -65,6 +231,42 @@ class SudokuGeneratorTests(unittest.TestCase):
         self.assertTrue(generated.verification.valid)
         self.assertEqual(generated.verification.mode, "derived")
 
+    def test_random_solutions_are_valid_and_seeded(self):
+        for size in (4, 9, 16, 25):
+            solution = generate_random_solution(size, seed=7)
+            values = parse_board(solution)
+
+            self.assertTrue(is_complete_solution(values))
+            self.assertTrue(solves_puzzle([0] * (size * size), values))
+            self.assertEqual(generate_random_solution(size, seed=7), solution)
+            if size <= 9:
+                self.assertTrue(verify_puzzle(solution, mode="unique").valid)
+
+    def test_random_solutions_differ_between_seeds(self):
+        solutions = {generate_random_solution(9, seed=seed) for seed in range(5)}
+
+        self.assertEqual(len(solutions), 5)
+
+    def test_generate_puzzle_from_random_grid(self):
+        generated = generate_puzzle(size=9, clues=30, seed=3, solution_method="random")
+
+        self.assertEqual(generated.actual_clues, 30)
+        self.assertEqual(generated.solution, generate_random_solution(9, seed=3))
+
+    def test_dig_order_does_not_reuse_the_grid_stream(self):
+        generated = generate_puzzle(size=9, clues=40, seed=8)
+        shared_stream = list(range(81))
+        random.Random(8).shuffle(shared_stream)
+
+        removed = {index for index, value in enumerate(parse_board(generated.puzzle)) if not value}
+        self.assertEqual(len(removed), 41)
+        self.assertNotEqual(removed, set(shared_stream[:41]))
+        self.assertEqual(generate_puzzle(size=9, clues=40, seed=8), generated)
+
+    def test_unique_and_verify_cannot_be_combined(self):
+        with self.assertRaises(ValueError):
+            generate_puzzle(size=4, clues=6, seed=1, verify=True, unique=True)
+
     def test_generate_9x9_smoke(self):
         generated = generate_puzzle(size=9, clues=80, seed=123)
 